@@ -0,0 +1,5 @@
+"""Offline performance benchmarks for the quantlab signal engine.
+
+Run from the repository root:
+    PYTHONPATH=src python -m benchmarks.run --preset quick --out outputs/bench.json
+"""
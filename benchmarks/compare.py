@@ -0,0 +1,69 @@
+"""Compare two benchmark JSON files (e.g. main vs. a feature branch).
+
+Usage:
+    python -m benchmarks.compare outputs/bench_base.json outputs/bench_head.json --fail-above 1.25
+
+Ratios are head/base of ``seconds_best``; values above 1.0 are slowdowns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+
+def _index(payload: dict[str, Any]) -> dict[tuple[str, str], dict[str, Any]]:
+    return {(row["benchmark"], row["case"]): row for row in payload.get("results", [])}
+
+
+def compare(base: dict[str, Any], head: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return one row per (benchmark, case) present in both payloads."""
+    base_rows = _index(base)
+    head_rows = _index(head)
+    rows = []
+    for key in sorted(base_rows.keys() & head_rows.keys()):
+        b, h = base_rows[key], head_rows[key]
+        ratio = h["seconds_best"] / b["seconds_best"] if b["seconds_best"] > 0 else float("nan")
+        rows.append(
+            {
+                "benchmark": key[0],
+                "case": key[1],
+                "base_seconds": b["seconds_best"],
+                "head_seconds": h["seconds_best"],
+                "time_ratio": ratio,
+                "base_peak_memory_bytes": b.get("peak_memory_bytes"),
+                "head_peak_memory_bytes": h.get("peak_memory_bytes"),
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", help="Baseline JSON (e.g. from main)")
+    parser.add_argument("head", help="Candidate JSON")
+    parser.add_argument("--fail-above", type=float, help="Exit non-zero when any time ratio exceeds this value")
+    args = parser.parse_args(argv)
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    head = json.loads(Path(args.head).read_text(encoding="utf-8"))
+    rows = compare(base, head)
+
+    print(f"{'benchmark':<45} {'case':>9} {'base ms':>11} {'head ms':>11} {'ratio':>7}")
+    for row in rows:
+        print(
+            f"{row['benchmark']:<45} {row['case']:>9} "
+            f"{row['base_seconds'] * 1e3:>11.3f} {row['head_seconds'] * 1e3:>11.3f} {row['time_ratio']:>7.2f}"
+        )
+
+    if args.fail_above is not None:
+        regressions = [r for r in rows if r["time_ratio"] > args.fail_above]
+        if regressions:
+            names = ", ".join(f"{r['benchmark']}[{r['case']}]" for r in regressions)
+            raise SystemExit(f"Regressions above {args.fail_above:.2f}x: {names}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""Benchmark runner: times core quantlab functions and emits JSON.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.run --preset quick --out outputs/bench.json
+    PYTHONPATH=src python -m benchmarks.run --case 100k --only indicators.
+
+Each result reports the best/median wall time over ``--repeat`` runs, the
+throughput in bars per second, and the peak traced memory of one extra run.
+Compare two result files with ``python -m benchmarks.compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from quantlab.backtest import compute_strategy_returns, generate_positions_from_signals, summarize_performance
+from quantlab.cache import frame_digest
+from quantlab.indicators import atr, atr_array, ema, ema_array
+from quantlab.integrity import scan_frames
+from quantlab.portfolio import run_portfolio_backtest
+from quantlab.replay import StreamingRule
+from quantlab.report import build_reports
+from quantlab.robustness import bootstrap_metrics
+from quantlab.screener import Screener
+from quantlab.ml_bridge import build_feature_frame, build_label_matrix, iter_walk_forward_windows
+from quantlab.rules import CompiledRule, RuleParams, ablation_study, evaluate_rulesets, make_signal
+from quantlab.stats import MomentSketch, TDigest, autocorr, log_returns
+from quantlab.tracker import PerformanceTracker
+
+from .synthetic import synthetic_universe
+
+Universe = dict[str, pd.DataFrame]
+
+
+@dataclass(frozen=True)
+class Case:
+    """One input shape: ``n_symbols`` frames of ``n_bars`` rows each."""
+
+    name: str
+    n_bars: int
+    n_symbols: int
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A named workload.
+
+    ``prepare`` receives the universe and returns a zero-argument callable; any
+    setup done inside ``prepare`` is excluded from the timing.
+    """
+
+    name: str
+    prepare: Callable[[Universe], Callable[[], Any]]
+    min_bars: int = 2
+    max_bars: int | None = None
+
+
+CASES: dict[str, Case] = {
+    case.name: case
+    for case in [
+        Case("1k", 1_000, 1),
+        Case("100k", 100_000, 1),
+        Case("5M", 5_000_000, 1),
+        Case("1k_x10", 1_000, 10),
+        Case("1k_x100", 1_000, 100),
+        Case("1k_x1000", 1_000, 1_000),
+    ]
+}
+
+PRESETS: dict[str, list[str]] = {
+    "quick": ["1k", "1k_x10"],
+    "standard": ["1k", "100k", "1k_x100"],
+    "full": ["1k", "100k", "5M", "1k_x100", "1k_x1000"],
+}
+
+
+def _each(universe: Universe, fn: Callable[[pd.DataFrame], Any]) -> Callable[[], Any]:
+    frames = list(universe.values())
+
+    def run() -> None:
+        for df in frames:
+            fn(df)
+
+    return run
+
+
+def _with_signal_column(universe: Universe) -> list[pd.DataFrame]:
+    """Attach a BUY/SELL/HOLD column derived from EMA crosses (setup only)."""
+    out = []
+    for df in universe.values():
+        diff = ema(df["Close"], 12) - ema(df["Close"], 26)
+        prev = diff.shift(1)
+        signal = pd.Series("HOLD", index=df.index, dtype="object")
+        signal[(prev <= 0) & (diff > 0)] = "BUY"
+        signal[(prev >= 0) & (diff < 0)] = "SELL"
+        out.append(df.assign(signal=signal))
+    return out
+
+
+def _stack(universe: Universe, column: str) -> np.ndarray:
+    return np.column_stack([df[column].to_numpy(dtype=float) for df in universe.values()])
+
+
+def _prepare_ema_array(universe: Universe) -> Callable[[], Any]:
+    # All symbols as columns of one 2D array, written into a reused buffer.
+    close = _stack(universe, "Close")
+    out = np.empty_like(close)
+    return lambda: ema_array(close, 12, out=out)
+
+
+def _prepare_atr_array(universe: Universe) -> Callable[[], Any]:
+    high, low, close = (_stack(universe, c) for c in ("High", "Low", "Close"))
+    out = np.empty_like(close)
+    return lambda: atr_array(high, low, close, 14, out=out)
+
+
+def _prepare_rulesets(universe: Universe) -> Callable[[], Any]:
+    # Primary + two shadows sharing EMA26/ATR14: measures the shared-indicator path.
+    rules = [
+        CompiledRule(),
+        CompiledRule(RuleParams(ema_fast=8, ema_slow=26), name="fast8"),
+        CompiledRule(RuleParams(atr_threshold_quantile=0.75), name="q75"),
+    ]
+    return _each(universe, lambda df: evaluate_rulesets(df, rules))
+
+
+def _prepare_positions(universe: Universe) -> Callable[[], Any]:
+    frames = _with_signal_column(universe)
+    return lambda: [generate_positions_from_signals(df) for df in frames]
+
+
+def _prepare_strategy_returns(universe: Universe) -> Callable[[], Any]:
+    frames = _with_signal_column(universe)
+    positions = [generate_positions_from_signals(df) for df in frames]
+    return lambda: [compute_strategy_returns(df, pos) for df, pos in zip(frames, positions)]
+
+
+def _prepare_summarize(universe: Universe) -> Callable[[], Any]:
+    returns = [df["Close"].pct_change() for df in universe.values()]
+    return lambda: [summarize_performance(r) for r in returns]
+
+
+def _prepare_portfolio(universe: Universe) -> Callable[[], Any]:
+    # Equal-weight long/short on the EMA12/26 sign, 10bp costs, 1% rebalance band.
+    close = pd.DataFrame({symbol: df["Close"] for symbol, df in universe.items()})
+    weights = np.sign(ema_array(close.to_numpy(), 12) - ema_array(close.to_numpy(), 26)) / close.shape[1]
+    return lambda: run_portfolio_backtest(close, weights, rebalance_threshold=0.01, cost_bps=10)
+
+
+def _prepare_bootstrap(universe: Universe) -> Callable[[], Any]:
+    returns = [df["Close"].pct_change().to_numpy() for df in universe.values()]
+    return lambda: [bootstrap_metrics(r, n_samples=200, seed=0) for r in returns]
+
+
+def _label_matrix(df: pd.DataFrame) -> Any:
+    methods = ("next_day_direction", "return_threshold", "return_quantile", "rolling_quantile")
+    return build_label_matrix(df, (1, 5, 10, 20), methods)
+
+
+def _prepare_walk_forward(universe: Universe) -> Callable[[], Any]:
+    indexes = [df.index for df in universe.values()]
+    return lambda: [list(iter_walk_forward_windows(idx)) for idx in indexes]
+
+
+def _prepare_autocorr(universe: Universe) -> Callable[[], Any]:
+    returns = [log_returns(df["Close"]) for df in universe.values()]
+    return lambda: [autocorr(r, max_lag=20) for r in returns]
+
+
+def _prepare_sketches(universe: Universe) -> Callable[[], Any]:
+    # Chunked log returns of every symbol into moment sketches plus one pooled t-digest.
+    returns = np.column_stack([np.log(df["Close"].to_numpy()) for df in universe.values()])
+    chunks = np.array_split(np.diff(returns, axis=0), max(1, len(returns) // 10_000))
+
+    def run() -> None:
+        moments, digest = MomentSketch(returns.shape[1]), TDigest()
+        for chunk in chunks:
+            moments.update(chunk)
+            digest.update(chunk)
+        moments.summary()
+        digest.quantile([0.01, 0.5, 0.99])
+
+    return run
+
+
+def _prepare_streaming_rule(universe: Universe) -> Callable[[], Any]:
+    bars = [list(zip(*(df[c].to_numpy().tolist() for c in ("High", "Low", "Close")))) for df in universe.values()]
+
+    def run() -> None:
+        for rows in bars:
+            step = StreamingRule().update
+            for high, low, close in rows:
+                step(high, low, close)
+
+    return run
+
+
+def _prepare_screener(universe: Universe) -> Callable[[], Any]:
+    screener = Screener(capacity=len(universe))
+    for symbol, df in universe.items():
+        screener.update_from_frame(symbol, df)
+    return lambda: screener.screen("active and ema_diff / atr > 0.1", rank_by="ema_diff_over_atr", top=20)
+
+
+def _prepare_tracker(universe: Universe) -> Callable[[], Any]:
+    # Live path: one update per bar across every symbol's stream.
+    returns = np.column_stack([df["Close"].pct_change().to_numpy() for df in universe.values()])
+
+    def run() -> None:
+        tracker = PerformanceTracker(returns.shape[1])
+        for row in returns:
+            tracker.update(row)
+
+    return run
+
+
+BENCHMARKS: list[Benchmark] = [
+    Benchmark("indicators.ema", lambda u: _each(u, lambda df: ema(df["Close"], 12))),
+    Benchmark("indicators.atr", lambda u: _each(u, lambda df: atr(df, 14))),
+    Benchmark("indicators.ema_array[2d]", _prepare_ema_array),
+    Benchmark("indicators.atr_array[2d]", _prepare_atr_array),
+    Benchmark("integrity.scan_frames", lambda u: lambda: scan_frames(u)),
+    Benchmark("rules.make_signal", lambda u: _each(u, make_signal), min_bars=120),
+    Benchmark("rules.evaluate_rulesets[3]", _prepare_rulesets, min_bars=120),
+    Benchmark("replay.StreamingRule.update", _prepare_streaming_rule, max_bars=1_000_000),
+    Benchmark("rules.ablation_study[6]", lambda u: lambda: ablation_study(u), min_bars=120),
+    Benchmark("backtest.generate_positions_from_signals", _prepare_positions),
+    Benchmark("backtest.compute_strategy_returns", _prepare_strategy_returns),
+    Benchmark("backtest.summarize_performance", _prepare_summarize),
+    Benchmark("portfolio.run_portfolio_backtest", _prepare_portfolio),
+    Benchmark("report.build_reports", lambda u: lambda: build_reports(u), min_bars=120),
+    Benchmark("screener.screen", _prepare_screener, min_bars=120),
+    Benchmark("tracker.PerformanceTracker.update[per-bar]", _prepare_tracker, max_bars=100_000),
+    Benchmark("robustness.bootstrap_metrics[200]", _prepare_bootstrap, min_bars=20, max_bars=100_000),
+    Benchmark("ml_bridge.build_feature_frame", lambda u: _each(u, build_feature_frame)),
+    Benchmark("ml_bridge.build_label_matrix[4x4]", lambda u: _each(u, _label_matrix)),
+    # Each window scans the whole index, so multi-million-row cases take minutes.
+    Benchmark("ml_bridge.iter_walk_forward_windows", _prepare_walk_forward, max_bars=1_000_000),
+    Benchmark("stats.autocorr", _prepare_autocorr),
+    Benchmark("stats.MomentSketch+TDigest[chunked]", _prepare_sketches, min_bars=2),
+    Benchmark("cache.frame_digest", lambda u: _each(u, frame_digest)),
+]
+
+
+def _time_runs(fn: Callable[[], Any], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated by one call (NumPy buffers are traced as well)."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def run_case(case: Case, benchmarks: list[Benchmark], *, repeat: int, seed: int) -> list[dict[str, Any]]:
+    applicable = [
+        b
+        for b in benchmarks
+        if case.n_bars >= b.min_bars and (b.max_bars is None or case.n_bars <= b.max_bars)
+    ]
+    if not applicable:
+        return []
+
+    universe = synthetic_universe(case.n_symbols, case.n_bars, seed=seed)
+    items = case.n_bars * case.n_symbols
+    results = []
+    for bench in applicable:
+        fn = bench.prepare(universe)
+        fn()  # warm-up: first-call imports and caches are not what we measure
+        timings = _time_runs(fn, repeat)
+        best = min(timings)
+        results.append(
+            {
+                "benchmark": bench.name,
+                "case": case.name,
+                "n_bars": case.n_bars,
+                "n_symbols": case.n_symbols,
+                "repeat": repeat,
+                "seconds_best": best,
+                "seconds_median": statistics.median(timings),
+                "bars_per_second": items / best if best > 0 else None,
+                "peak_memory_bytes": _peak_memory(fn),
+            }
+        )
+        print(
+            f"{bench.name:<45} {case.name:>9} {best * 1e3:>11.3f} ms {items / best if best else 0:>14,.0f} bars/s",
+            file=sys.stderr,
+        )
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def environment_info() -> dict[str, Any]:
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run quantlab performance benchmarks")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick", help="Case preset (default: quick)")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Explicit case(s); overrides --preset")
+    parser.add_argument("--only", action="append", default=[], help="Run benchmarks whose name starts with this prefix")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed (default: 0)")
+    parser.add_argument("--out", help="Write JSON results here (default: stdout)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.repeat < 1:
+        raise SystemExit("--repeat must be >= 1")
+
+    benchmarks = [b for b in BENCHMARKS if not args.only or any(b.name.startswith(p) for p in args.only)]
+    case_names = args.case or PRESETS[args.preset]
+
+    results: list[dict[str, Any]] = []
+    for name in case_names:
+        results.extend(run_case(CASES[name], benchmarks, repeat=args.repeat, seed=args.seed))
+
+    payload = {
+        "meta": {**environment_info(), "preset": None if args.case else args.preset, "seed": args.seed},
+        "cases": [asdict(CASES[name]) for name in case_names],
+        "results": results,
+    }
+    raw = json.dumps(payload, indent=2)
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(raw, encoding="utf-8")
+        print(f"Wrote {out_path}", file=sys.stderr)
+    else:
+        print(raw)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Deterministic synthetic OHLCV generators for benchmarks.
+
+Everything here is seeded, so the same (n_bars, n_symbols, seed) always yields
+bit-identical frames and timings stay comparable across commits.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Daily bars overflow pandas' Timestamp range (year 2262) long before 5M rows,
+# so larger cases switch to finer frequencies.
+_FREQ_BY_MAX_BARS = [
+    (20_000, "B"),
+    (500_000, "h"),
+    (None, "min"),
+]
+
+
+def default_freq(n_bars: int) -> str:
+    """Pick a bar frequency whose date range fits the requested length."""
+    for limit, freq in _FREQ_BY_MAX_BARS:
+        if limit is None or n_bars <= limit:
+            return freq
+    raise AssertionError("unreachable")
+
+
+def synthetic_ohlcv(
+    n_bars: int,
+    *,
+    seed: int = 0,
+    start: str = "2000-01-03",
+    freq: str | None = None,
+    start_price: float = 100.0,
+    daily_vol: float = 0.012,
+) -> pd.DataFrame:
+    """Generate one geometric-random-walk OHLCV frame.
+
+    High/Low straddle Open/Close by a random fraction so the True Range is
+    always well defined and ATR behaves like real data.
+    """
+    if n_bars < 2:
+        raise ValueError("n_bars must be >= 2")
+
+    rng = np.random.default_rng(seed)
+    log_ret = rng.normal(0.0002, daily_vol, size=n_bars)
+    close = start_price * np.exp(np.cumsum(log_ret))
+    open_ = np.empty_like(close)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+
+    wick = np.abs(rng.normal(0.0, daily_vol / 2.0, size=(2, n_bars)))
+    high = np.maximum(open_, close) * (1.0 + wick[0])
+    low = np.minimum(open_, close) * (1.0 - wick[1])
+    volume = rng.integers(100_000, 2_000_000, size=n_bars).astype(float)
+
+    index = pd.date_range(start, periods=n_bars, freq=freq or default_freq(n_bars))
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def synthetic_universe(
+    n_symbols: int,
+    n_bars: int,
+    *,
+    seed: int = 0,
+    freq: str | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Generate ``n_symbols`` independent frames on a shared index.
+
+    Symbol ``i`` uses ``seed + i`` so adding symbols never changes existing ones.
+    """
+    return {
+        f"SYN{i:04d}": synthetic_ohlcv(n_bars, seed=seed + i, freq=freq)
+        for i in range(n_symbols)
+    }
@@ -1,32 +1,59 @@
 """quantlab package for visualization-first signal research."""
 
+from .config import EngineConfig, load_engine_config
 from .contract import Metrics, SignalReport, SymbolSignal
 from .data import fetch_ohlc
-from .indicators import atr, ema
+from .indicators import atr, atr_array, ema, ema_array, true_range_array
+from .integrity import IntegrityConfig, scan_frames
 from .io import from_json, to_json
-from .ml_bridge import build_feature_frame, build_labels, iter_walk_forward_windows, make_ml_table
+from .ml_bridge import build_feature_frame, build_label_matrix, build_labels, iter_walk_forward_windows, make_ml_table
 from .plot import plot_atr_regime, plot_cross_points, plot_price_ema
-from .rules import make_signal
-from .stats import autocorr, log_returns, rolling_volatility
+from .portfolio import PortfolioResult, run_portfolio_backtest
+from .resample import BarAggregator, aggregate_timeframes, periods_per_year
+from .rules import Ablation, CompiledRule, RuleParams, ablation_study, compile_rule, evaluate_rulesets, make_signal
+from .stats import MomentSketch, TDigest, autocorr, log_returns, rolling_volatility
+from .tracker import PerformanceTracker
 
 __all__ = [
     "Metrics",
     "SignalReport",
     "SymbolSignal",
     "fetch_ohlc",
+    "IntegrityConfig",
+    "scan_frames",
     "ema",
     "atr",
+    "ema_array",
+    "atr_array",
+    "true_range_array",
     "make_signal",
+    "RuleParams",
+    "CompiledRule",
+    "compile_rule",
+    "evaluate_rulesets",
+    "Ablation",
+    "ablation_study",
+    "EngineConfig",
+    "load_engine_config",
     "to_json",
     "from_json",
     "plot_price_ema",
     "plot_atr_regime",
     "plot_cross_points",
+    "PortfolioResult",
+    "run_portfolio_backtest",
+    "BarAggregator",
+    "aggregate_timeframes",
+    "periods_per_year",
     "log_returns",
     "autocorr",
     "rolling_volatility",
+    "MomentSketch",
+    "TDigest",
+    "PerformanceTracker",
     "build_feature_frame",
     "build_labels",
+    "build_label_matrix",
     "make_ml_table",
     "iter_walk_forward_windows",
 ]
@@ -0,0 +1,323 @@
+"""Append-only archive of every run's signals, partitioned by month.
+
+Each CLI run overwrites its output JSON, so yesterday's signals are gone and
+rebuilding them means re-running `make_signal` on historical prefixes.
+`SignalArchive` keeps them instead:
+
+- every `append` writes one new columnar part per month of ``as_of``
+  (``<root>/<YYYY-MM>/part-<seq>.npz``: one NumPy array per field, symbols
+  and rulesets as fixed-width strings, signals as int8); existing parts are
+  never rewritten;
+- ``index.json`` lists the parts with their row count, ``as_of`` range,
+  symbols and rulesets, so a query only opens the parts that can match;
+- rerunning the same day appends again, and queries keep the latest write
+  per ``(symbol, ruleset, as_of)``.
+
+With one archived row per bar (a daily run after the close),
+`recent_activity` gives the strategy report's ``signal_frequency_20d`` and
+``turnover_20d`` from the archive alone.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rules import DEFAULT_RULESET
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+SIGNAL_CODES = {"BUY": 1, "SELL": -1, "HOLD": 0}
+_SIGNAL_NAMES = np.array(["SELL", "HOLD", "BUY"])  # code + 1
+_FLOAT_FIELDS = ("last_close", "pct_change_1d", "atr", "atr_thresh", "ema_diff")
+COLUMNS = ("symbol", "ruleset", "as_of", "signal", "active", *_FLOAT_FIELDS)
+
+
+def _timestamp_ns(value: Any) -> int:
+    """``as_of`` as int64 nanoseconds; tz-aware values are stored in UTC."""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.as_unit("ns").value)
+
+
+def _payload_rows(payload: Mapping[str, Any], ruleset: str | None) -> Iterator[dict[str, Any]]:
+    """Archive rows of a bundle payload (every ruleset) or a single-symbol `SignalReport` dict."""
+    if "symbols" in payload:
+        primary = str(payload.get("ruleset", ruleset or DEFAULT_RULESET))
+        for row in payload["symbols"]:
+            shared = {"symbol": row["symbol"], "as_of": row["as_of"], **{k: row[k] for k in _FLOAT_FIELDS[:2]}}
+            variants = row.get("rulesets") or {primary: row}
+            for name, variant in variants.items():
+                yield {**shared, "ruleset": name, **_signal_fields(variant)}
+    else:
+        signal = payload["signal"]
+        yield {
+            "symbol": signal["symbol"],
+            "ruleset": ruleset or DEFAULT_RULESET,
+            "as_of": payload["as_of"],
+            **{k: signal[k] for k in _FLOAT_FIELDS[:2]},
+            **_signal_fields(signal),
+        }
+
+
+def _signal_fields(data: Mapping[str, Any]) -> dict[str, Any]:
+    metrics = data["metrics"]
+    return {
+        "signal": data["signal"],
+        "active": bool(data["active"]),
+        **{k: metrics[k] for k in _FLOAT_FIELDS[2:]},
+    }
+
+
+class SignalArchive:
+    """Partitioned, append-only store of per-symbol signals and metrics.
+
+    Parameters
+    ----------
+    root:
+        Archive directory (created on the first append). One writer at a
+        time; readers may run concurrently since parts are immutable and
+        the index is replaced atomically.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._index: dict[str, Any] | None = None
+
+    def __repr__(self) -> str:
+        parts = self.parts
+        return f"SignalArchive({str(self.root)!r}, parts={len(parts)}, rows={sum(p['rows'] for p in parts)})"
+
+    @property
+    def parts(self) -> list[dict[str, Any]]:
+        """Index entries in append order."""
+        if self._index is None:
+            path = self.root / INDEX_FILE
+            if path.exists():
+                self._index = json.loads(path.read_text(encoding="utf-8"))
+                if self._index.get("version") != INDEX_VERSION:
+                    raise ValueError(f"unsupported archive index version in {path}")
+            else:
+                self._index = {"version": INDEX_VERSION, "parts": []}
+        return self._index["parts"]
+
+    def append(self, rows: Iterable[Mapping[str, Any]], *, generated_at: str | None = None) -> int:
+        """Append rows with the `COLUMNS` fields; returns the number of rows written."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        missing = [c for c in COLUMNS if c not in rows[0]]
+        if missing:
+            raise ValueError(f"archive rows are missing fields: {missing}")
+        unknown = {row["signal"] for row in rows} - set(SIGNAL_CODES)
+        if unknown:
+            raise ValueError(f"unknown signals: {sorted(unknown)}")
+
+        as_of = np.array([_timestamp_ns(row["as_of"]) for row in rows], dtype=np.int64)
+        columns = {
+            "symbol": np.array([str(row["symbol"]) for row in rows]),
+            "ruleset": np.array([str(row["ruleset"]) for row in rows]),
+            "as_of": as_of,
+            "signal": np.array([SIGNAL_CODES[row["signal"]] for row in rows], dtype=np.int8),
+            "active": np.array([bool(row["active"]) for row in rows]),
+            **{f: np.array([float(row[f]) for row in rows]) for f in _FLOAT_FIELDS},
+        }
+        months = pd.to_datetime(as_of).strftime("%Y-%m").to_numpy()
+        parts = self.parts
+        for month in np.unique(months):
+            take = months == month
+            file = f"{month}/part-{len(parts):06d}.npz"
+            path = self.root / file
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp.npz")
+            np.savez_compressed(tmp, **{name: values[take] for name, values in columns.items()})
+            os.replace(tmp, path)
+            stamps = as_of[take]
+            parts.append(
+                {
+                    "file": file,
+                    "rows": int(take.sum()),
+                    "as_of_min": int(stamps.min()),
+                    "as_of_max": int(stamps.max()),
+                    "symbols": sorted(set(columns["symbol"][take].tolist())),
+                    "rulesets": sorted(set(columns["ruleset"][take].tolist())),
+                    "generated_at": generated_at,
+                }
+            )
+        self._write_index()
+        return len(rows)
+
+    def append_payload(self, payload: Mapping[str, Any], *, ruleset: str | None = None) -> int:
+        """Append a CLI output payload: a bundle (all rulesets) or a single-symbol report.
+
+        ``ruleset`` names the single-symbol report's ruleset (bundles carry their own).
+        """
+        return self.append(_payload_rows(payload, ruleset), generated_at=payload.get("generated_at"))
+
+    def _write_index(self) -> None:
+        path = self.root / INDEX_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _load(self, parts: Sequence[dict[str, Any]]) -> pd.DataFrame:
+        """Rows of ``parts`` plus their append sequence ``_seq`` (for latest-write-wins)."""
+        seq = {p["file"]: i for i, p in enumerate(self.parts)}
+        frames = []
+        for part in parts:
+            with np.load(self.root / part["file"], allow_pickle=False) as data:
+                frame = pd.DataFrame({name: data[name] for name in COLUMNS})
+            frames.append(frame.assign(_seq=seq[part["file"]]))
+        if not frames:
+            return pd.DataFrame({name: np.empty(0) for name in (*COLUMNS, "_seq")})
+        return pd.concat(frames, ignore_index=True)
+
+    def _finish(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """Latest write per (symbol, ruleset, as_of), sorted, with readable types."""
+        out = raw.sort_values("_seq", kind="stable").drop_duplicates(["symbol", "ruleset", "as_of"], keep="last")
+        out = out.drop(columns="_seq").sort_values(["symbol", "ruleset", "as_of"], kind="stable")
+        out = out.reset_index(drop=True)
+        out["as_of"] = pd.to_datetime(out["as_of"].to_numpy(dtype=np.int64))
+        out["signal"] = _SIGNAL_NAMES[out["signal"].to_numpy(dtype=np.int64) + 1]
+        out["active"] = out["active"].astype(bool)
+        return out
+
+    def query(
+        self,
+        symbols: str | Sequence[str] | None = None,
+        *,
+        start: Any = None,
+        end: Any = None,
+        day: Any = None,
+        signals: str | Sequence[str] | None = None,
+        ruleset: str | None = None,
+    ) -> pd.DataFrame:
+        """Archived rows filtered by symbol, ``as_of`` range (inclusive), signal and ruleset.
+
+        ``day`` selects one calendar date, e.g. every BUY on a date with
+        ``query(day="2026-02-10", signals="BUY")``. Only parts whose index
+        entry overlaps the range and symbols are read.
+        """
+        if day is not None:
+            if start is not None or end is not None:
+                raise ValueError("pass either day or start/end")
+            start = pd.Timestamp(day).normalize()
+            end = start + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+        lo = _timestamp_ns(start) if start is not None else None
+        hi = _timestamp_ns(end) if end is not None else None
+        wanted = {symbols} if isinstance(symbols, str) else set(symbols) if symbols is not None else None
+        parts = [
+            p
+            for p in self.parts
+            if (lo is None or p["as_of_max"] >= lo)
+            and (hi is None or p["as_of_min"] <= hi)
+            and (wanted is None or not wanted.isdisjoint(p["symbols"]))
+        ]
+        raw = self._load(parts)
+        keep = np.ones(len(raw), dtype=bool)
+        if wanted is not None:
+            keep &= raw["symbol"].isin(wanted).to_numpy()
+        if ruleset is not None:
+            keep &= (raw["ruleset"] == ruleset).to_numpy()
+        if lo is not None:
+            keep &= (raw["as_of"] >= lo).to_numpy()
+        if hi is not None:
+            keep &= (raw["as_of"] <= hi).to_numpy()
+        out = self._finish(raw[keep])
+        if signals is not None:
+            signals = [signals] if isinstance(signals, str) else list(signals)
+            out = out[out["signal"].isin(signals)].reset_index(drop=True)
+        return out
+
+    def tail(
+        self,
+        symbols: str | Sequence[str] | None = None,
+        n: int = 20,
+        *,
+        ruleset: str | None = None,
+    ) -> pd.DataFrame:
+        """The latest ``n`` archived bars per (symbol, ruleset).
+
+        Parts are read newest first. A part is skipped once every
+        (symbol, ruleset) pair it lists already has ``n`` bars newer than
+        it, and reading stops when all pairs do, so the cost follows ``n``
+        (plus the parts holding symbols or rulesets that stopped early), not
+        the archive size.
+        """
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        parts = self.parts
+        if symbols is None:
+            wanted = {s for p in parts for s in p["symbols"]}
+        else:
+            wanted = {symbols} if isinstance(symbols, str) else set(symbols)
+        candidates = [
+            p
+            for p in parts
+            if not wanted.isdisjoint(p["symbols"])
+            and (ruleset is None or "rulesets" not in p or ruleset in p["rulesets"])
+        ]
+        # Index entries written before "rulesets" was recorded cannot bound the pairs: read everything.
+        can_skip = all("rulesets" in p for p in candidates)
+        listed = {
+            id(p): [
+                (s, r)
+                for s in wanted.intersection(p["symbols"])
+                for r in p.get("rulesets", ())
+                if ruleset is None or r == ruleset
+            ]
+            for p in candidates
+        }
+        pairs = {pair for part_pairs in listed.values() for pair in part_pairs}
+        seen: dict[tuple[str, str], np.ndarray] = {pair: np.empty(0, dtype=np.int64) for pair in pairs}
+        done: set[tuple[str, str]] = set()  # pairs with n bars newer than every part still to come
+        frames = []
+        for part in sorted(candidates, key=lambda p: p["as_of_max"], reverse=True):
+            if can_skip:
+                for pair in listed[id(part)]:
+                    if pair not in done and np.count_nonzero(np.unique(seen[pair]) > part["as_of_max"]) >= n:
+                        done.add(pair)
+                if len(done) == len(pairs):
+                    break
+                if done.issuperset(listed[id(part)]):
+                    continue
+            frame = self._load([part])
+            frame = frame[frame["symbol"].isin(wanted)]
+            if ruleset is not None:
+                frame = frame[frame["ruleset"] == ruleset]
+            if can_skip:
+                for pair, stamps in frame.groupby(["symbol", "ruleset"])["as_of"]:
+                    seen[pair] = np.concatenate([seen[pair], stamps.to_numpy(dtype=np.int64)])
+            frames.append(frame)
+        out = self._finish(pd.concat(frames, ignore_index=True) if frames else self._load([]))
+        return out.groupby(["symbol", "ruleset"], sort=False).tail(n).reset_index(drop=True)
+
+    def recent_activity(self, window: int = 20, *, ruleset: str | None = None) -> pd.DataFrame:
+        """Signal frequency and turnover over each symbol's last ``window`` archived bars.
+
+        ``signal_frequency`` counts BUY/SELL rows. ``turnover`` sums the
+        changes of the long/flat weight ``ema_diff > 0`` (the strategy of
+        `report.build_reports`), using one extra bar before the window.
+        With one row per bar these equal the report's
+        ``signal_frequency_20d`` and ``turnover_20d`` (for ``window=20``).
+        """
+        rows = self.tail(n=window + 1, ruleset=ruleset)
+        keys = [rows["symbol"], rows["ruleset"]]
+        weight = (rows["ema_diff"] > 0).astype(float)
+        dw = weight.groupby(keys).diff().abs()
+        in_window = rows.groupby(["symbol", "ruleset"]).cumcount(ascending=False) < window
+        recent = rows.assign(event=rows["signal"] != "HOLD", dw=dw)[in_window.to_numpy()]
+        out = recent.groupby(["symbol", "ruleset"]).agg(
+            n_bars=("as_of", "size"),
+            as_of=("as_of", "last"),
+            signal_frequency=("event", "sum"),
+            turnover=("dw", "sum"),
+        )
+        out["signal_frequency"] = out["signal_frequency"].astype(int)
+        return out
@@ -55,11 +55,13 @@ def compute_strategy_returns(df: pd.DataFrame, positions: pd.Series) -> pd.Serie
     return strategy_returns
 
 
-def summarize_performance(returns: pd.Series) -> pd.Series:
+def summarize_performance(returns: pd.Series, *, periods_per_year: float = 252.0) -> pd.Series:
     """Summarize key performance metrics for a return stream.
 
     The output is deterministic and intended for quick side-by-side comparisons
-    in ablation and parameter sweep notebooks.
+    in ablation and parameter sweep notebooks. ``periods_per_year`` annualizes
+    ``sharpe_like``: 252 for daily bars, see `quantlab.resample.periods_per_year`
+    for intraday intervals.
     """
     clean = pd.Series(returns, copy=False).dropna().astype(float)
     if clean.empty:
@@ -89,7 +91,7 @@ def summarize_performance(returns: pd.Series) -> pd.Series:
     expectancy = p_win * avg_win + p_loss * avg_loss
 
     std = float(clean.std(ddof=0))
-    sharpe_like = float((clean.mean() / std) * np.sqrt(252.0)) if std > 0 else np.nan
+    sharpe_like = float((clean.mean() / std) * np.sqrt(periods_per_year)) if std > 0 else np.nan
 
     equity = (1.0 + clean).cumprod()
     running_peak = equity.cummax()
@@ -109,3 +111,60 @@ def summarize_performance(returns: pd.Series) -> pd.Series:
             "max_drawdown": float(drawdown.min()),
         }
     )
+
+
+def summarize_performance_batch(returns: np.ndarray, *, periods_per_year: float = 252.0) -> pd.DataFrame:
+    """`summarize_performance` for many return streams at once.
+
+    ``returns`` is a 2D array with one stream per row (a 1D array is one
+    row). NaNs are skipped exactly like ``dropna`` in the single-stream
+    version, so row ``i`` of the result equals
+    ``summarize_performance(pd.Series(returns[i]))``. Every metric is a
+    vectorized reduction along axis 1, so bootstrap samples or a whole
+    symbol universe need no Python loop.
+    """
+    r = np.asarray(returns, dtype=float)
+    if r.ndim == 1:
+        r = r[None, :]
+    if r.ndim != 2:
+        raise ValueError("returns must be a 1D or 2D array")
+
+    valid = ~np.isnan(r)
+    x = np.where(valid, r, 0.0)  # a skipped bar is a 0 return for the equity path
+    n = valid.sum(axis=1)
+    wins = x > 0
+    losses = x < 0
+    n_win = wins.sum(axis=1)
+    n_loss = losses.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = x.sum(axis=1) / n
+        std = np.sqrt(np.where(valid, (r - mean[:, None]) ** 2, 0.0).sum(axis=1) / n)
+        p_win = n_win / n
+        p_loss = n_loss / n
+        avg_win = np.where(n_win > 0, np.where(wins, x, 0.0).sum(axis=1) / np.maximum(n_win, 1), 0.0)
+        avg_loss = np.where(n_loss > 0, np.where(losses, x, 0.0).sum(axis=1) / np.maximum(n_loss, 1), 0.0)
+        sharpe_like = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+
+    equity = np.cumprod(1.0 + x, axis=1)
+    running_peak = np.maximum.accumulate(equity, axis=1)
+    max_drawdown = (equity / running_peak - 1.0).min(axis=1, initial=0.0)
+    cum_return = equity[:, -1] - 1.0 if r.shape[1] else np.zeros(r.shape[0])
+
+    out = pd.DataFrame(
+        {
+            "n": n,
+            "mean": mean,
+            "std": std,
+            "hit_rate": p_win,
+            "avg_win": avg_win,
+            "avg_loss": avg_loss,
+            "expectancy": p_win * avg_win + p_loss * avg_loss,
+            "sharpe_like": sharpe_like,
+            "cum_return": cum_return,
+            "max_drawdown": max_drawdown,
+        }
+    )
+    # Empty streams report NaN metrics, as in the single-stream version.
+    out.loc[n == 0, out.columns[1:]] = np.nan
+    return out
@@ -0,0 +1,155 @@
+"""Content-addressed cache of per-symbol rule results.
+
+A result is keyed by a hash of *what it was computed from*: the OHLCV
+bars, the symbol/period/interval, the ruleset name and parameters, and
+`ENGINE_VERSION`. Identical inputs therefore map to the same key on a rerun
+or for a second consumer, and any change in the data or the rule yields a
+new key (stale entries are never returned, they just age out).
+
+The whole series is hashed, not only its latest rows: the recursive EMA
+depends on every earlier bar, so a revised or shifted history changes the
+signal even when the tail is identical. blake2b over the raw column
+buffers is far cheaper than the indicator pass it saves.
+
+Entries live in an in-memory LRU and, optionally, in a size-bounded
+directory of small JSON files evicted oldest-access first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import ENGINE_VERSION, params_hash
+from .contract import Metrics, SymbolSignal
+from .rules import CompiledRule
+
+HASHED_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """blake2b digest of the index and OHLCV columns of ``df``."""
+    h = hashlib.blake2b(digest_size=16)
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        h.update(str(index.tz).encode())
+        h.update(np.ascontiguousarray(index.asi8).tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    for column in HASHED_COLUMNS:
+        if column in df.columns:
+            h.update(column.encode())
+            h.update(np.ascontiguousarray(df[column].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def result_key(data_digest: str, rule: CompiledRule, *, symbol: str, period: str, interval: str) -> str:
+    """Cache key of one (data, rule) evaluation."""
+    parts = [ENGINE_VERSION, params_hash(rule.name, rule.params), symbol, period, interval, data_digest]
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _to_signal(data: dict) -> SymbolSignal:
+    return SymbolSignal(**{**data, "metrics": Metrics(**data["metrics"])})
+
+
+class SignalCache:
+    """Two-level (memory LRU + optional disk) cache of `SymbolSignal` results.
+
+    Parameters
+    ----------
+    directory:
+        Disk cache location; ``None`` keeps the cache in memory only.
+    max_memory_items:
+        In-memory LRU capacity.
+    max_disk_bytes:
+        Disk budget; least recently used files are deleted beyond it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        max_memory_items: int = 4096,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        if max_memory_items < 1 or max_disk_bytes < 1:
+            raise ValueError("cache limits must be positive")
+        self.directory = Path(directory) if directory is not None else None
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, SymbolSignal] = OrderedDict()
+        self._disk_bytes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.directory.glob("*/*.json"))
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> SymbolSignal | None:
+        signal = self._memory.get(key)
+        if signal is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return signal
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                signal = _to_signal(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError, KeyError):
+                signal = None
+            if signal is not None:
+                os.utime(path)  # mtime doubles as the disk LRU clock
+                self._remember(key, signal)
+                self.hits += 1
+                return signal
+        self.misses += 1
+        return None
+
+    def put(self, key: str, signal: SymbolSignal) -> None:
+        self._remember(key, signal)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        raw = json.dumps(asdict(signal), ensure_ascii=False).encode("utf-8")
+        old_size = path.stat().st_size if path.exists() else 0
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, path)
+        self._disk_bytes += len(raw) - old_size
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _remember(self, key: str, signal: SymbolSignal) -> None:
+        self._memory[key] = signal
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until usage is below 90% of the budget."""
+        assert self.directory is not None
+        entries = sorted(
+            ((p.stat().st_mtime_ns, p.stat().st_size, p) for p in self.directory.glob("*/*.json")),
+            key=lambda e: e[0],
+        )
+        target = int(self.max_disk_bytes * 0.9)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._disk_bytes = total
@@ -1,18 +1,35 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
 import json
 from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
+import pandas as pd
+
+from quantlab.archive import SignalArchive
+from quantlab.cache import SignalCache, frame_digest, result_key
+from quantlab.config import DEFAULT_ENGINE_CONFIG, ENGINE_VERSION, EngineConfig, load_engine_config, params_hash
 from quantlab.contract import Metrics, SignalReport, SymbolSignal
 from quantlab.data import fetch_ohlc
+from quantlab.integrity import IntegrityReport, scan_frames
 from quantlab.io import to_json
-from quantlab.rules import make_signal
-
-ENGINE_VERSION = "v0"
+from quantlab.notify import (
+    DEFAULT_NOTIFY_CONFIG,
+    DEFAULT_NOTIFY_STATE,
+    FileSender,
+    NotificationState,
+    StreamSender,
+    dispatch,
+    load_notify_config,
+)
+from quantlab.profiling import StageProfiler, activate, count, scope, stage
+from quantlab.report import ReportConfig, merge_state, refresh_reports, split_state
+from quantlab.resample import aggregate_timeframes, parse_timeframe, signals_by_timeframe
+from quantlab.rules import CompiledRule, compile_rule, evaluate_rulesets, make_signal
 
 
 def jst_now_iso() -> str:
@@ -28,16 +45,163 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--period", default="2y", help="yfinance period (default: 2y)")
     parser.add_argument("--interval", default="1d", help="yfinance interval (default: 1d)")
     parser.add_argument("--out", default="outputs/signals.json", help="Output JSON path")
+    parser.add_argument(
+        "--engine-config",
+        help=f"Engine config YAML (default: {DEFAULT_ENGINE_CONFIG} if present, else built-in defaults)",
+    )
+    parser.add_argument(
+        "--ruleset",
+        action="append",
+        default=[],
+        help="Also evaluate this shadow ruleset from the engine config (repeatable; 'all' = every ruleset)."
+        " Requires --symbols-file",
+    )
+    parser.add_argument(
+        "--timeframes",
+        help="Comma-separated coarser timeframes built from the --interval bars (e.g. 1h,1d)."
+        " Adds a per-symbol 'timeframes' section; requires --symbols-file",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Reuse rule results for unchanged bars across runs (content-addressed cache directory)",
+    )
+    parser.add_argument(
+        "--strategy-report",
+        help="Also write per-symbol strategy reports (docs/05 contract) to this JSON path; an existing"
+        " file from the previous run is updated incrementally. Requires --symbols-file",
+    )
+    parser.add_argument(
+        "--archive",
+        help="Also append this run's per-symbol signals and metrics to an append-only archive directory",
+    )
+    integrity_group = parser.add_argument_group("data integrity")
+    integrity_group.add_argument(
+        "--integrity",
+        choices=["report", "quarantine"],
+        help="Scan every symbol's bars before evaluating them. 'report' adds a per-symbol quality flag;"
+        " 'quarantine' also skips symbols flagged 'fail'. Requires --symbols-file",
+    )
+    integrity_group.add_argument(
+        "--integrity-out",
+        help="Integrity report JSON path (default: <out>.integrity.json)",
+    )
+    notify_group = parser.add_argument_group("notifications")
+    notify_group.add_argument(
+        "--notify",
+        action="store_true",
+        help="Send alerts for this run's signals (filtered by the notify config, deduplicated across reruns)",
+    )
+    notify_group.add_argument(
+        "--notify-config",
+        help=f"Notify config YAML (default: {DEFAULT_NOTIFY_CONFIG} if present, else built-in defaults)",
+    )
+    notify_group.add_argument(
+        "--notify-state",
+        default=str(DEFAULT_NOTIFY_STATE),
+        help=f"Last-sent state file used for deduplication (default: {DEFAULT_NOTIFY_STATE})",
+    )
+    notify_group.add_argument("--notify-out", help="Append alert batches to this JSONL file instead of stdout")
+    profile_group = parser.add_argument_group("profiling")
+    profile_group.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record per-symbol stage timings; prints a table and writes <out>.profile.json",
+    )
+    profile_group.add_argument("--profile-out", help="Profile JSON path (implies --profile)")
+    profile_group.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Track per-symbol peak memory via tracemalloc (implies --profile)",
+    )
+    profile_group.add_argument(
+        "--profile-cprofile",
+        help="Also dump cProfile stats (.pstats) to this path (implies --profile)",
+    )
     return parser
 
 
-def _build_symbol_signal(symbol: str, period: str, interval: str) -> tuple[SymbolSignal, str]:
+def _load_config(args: argparse.Namespace) -> EngineConfig:
+    """Load the engine config once per run; a missing default file means defaults."""
+    if args.engine_config:
+        return load_engine_config(args.engine_config)
+    return load_engine_config(DEFAULT_ENGINE_CONFIG if DEFAULT_ENGINE_CONFIG.exists() else None)
+
+
+def _build_symbol_signal(
+    symbol: str,
+    period: str,
+    interval: str,
+    rule: CompiledRule | None = None,
+    cache: SignalCache | None = None,
+) -> tuple[SymbolSignal, str]:
     """Run the existing data->rule pipeline and return contract + as_of timestamp."""
-    df = fetch_ohlc(symbol, period=period, interval=interval)
-    signal_data = make_signal(df)
-    as_of = str(df.index[-1])
+    signals, as_of, _ = _build_symbol_signals(symbol, period, interval, [rule or compile_rule()], cache=cache)
+    return next(iter(signals.values())), as_of
+
+
+def _build_symbol_signals(
+    symbol: str,
+    period: str,
+    interval: str,
+    rules: Sequence[CompiledRule],
+    timeframes: Sequence[str] = (),
+    cache: SignalCache | None = None,
+    frames: dict[str, pd.DataFrame] | None = None,
+    bars: pd.DataFrame | None = None,
+) -> tuple[dict[str, SymbolSignal], str, dict[str, dict]]:
+    """Fetch once and evaluate every ruleset (and timeframe).
 
-    signal = SymbolSignal(
+    Returns ``({ruleset: contract}, as_of, {timeframe: signal_dict})``; the
+    timeframe bars are aggregated from the single base-interval download.
+    With a ``cache``, rulesets whose (bars, parameters) were seen before are
+    served from it and only the rest are evaluated. When ``frames`` is given
+    the downloaded bars are also stored there (e.g. for strategy reports).
+    Already fetched ``bars`` (e.g. after an integrity scan) skip the download.
+    """
+    with scope(symbol), stage("cli.symbol"):
+        if bars is None:
+            with stage("fetch"):
+                df = fetch_ohlc(symbol, period=period, interval=interval)
+        else:
+            df = bars
+        if frames is not None:
+            frames[symbol] = df
+        timeframe_signals: dict[str, dict] = {}
+        if timeframes:
+            with stage("timeframes"):
+                tf_bars = aggregate_timeframes(df, timeframes)
+                timeframe_signals = signals_by_timeframe(tf_bars, rules[0])
+        cached: dict[str, SymbolSignal] = {}
+        keys: dict[str, str] = {}
+        if cache is not None:
+            with stage("cache"):
+                digest = frame_digest(df)
+                for rule in rules:
+                    keys[rule.name] = result_key(digest, rule, symbol=symbol, period=period, interval=interval)
+                    hit = cache.get(keys[rule.name])
+                    if hit is not None:
+                        cached[rule.name] = hit
+            count("cache.hits", len(cached))
+        pending = [rule for rule in rules if rule.name not in cached]
+        with stage("rules"):
+            if len(pending) == 1:
+                results = {pending[0].name: make_signal(df, pending[0])}
+            elif pending:
+                # Shared indicator pass: cost grows with distinct EMAs/ATRs, not rulesets.
+                results = evaluate_rulesets(df, pending)
+            else:
+                results = {}
+        as_of = str(df.index[-1])
+        computed = {name: _to_symbol_signal(symbol, period, interval, data) for name, data in results.items()}
+        if cache is not None:
+            for name, signal in computed.items():
+                cache.put(keys[name], signal)
+        signals = {rule.name: cached.get(rule.name) or computed[rule.name] for rule in rules}
+        return signals, as_of, timeframe_signals
+
+
+def _to_symbol_signal(symbol: str, period: str, interval: str, signal_data: dict[str, Any]) -> SymbolSignal:
+    return SymbolSignal(
         symbol=symbol,
         period=period,
         interval=interval,
@@ -49,7 +213,6 @@ def _build_symbol_signal(symbol: str, period: str, interval: str) -> tuple[Symbo
         reasons=list(signal_data["reasons"]),
         metrics=Metrics(**signal_data["metrics"]),
     )
-    return signal, as_of
 
 
 def _load_symbols(symbols_file: str) -> list[dict[str, str]]:
@@ -80,44 +243,236 @@ def _load_symbols(symbols_file: str) -> list[dict[str, str]]:
     return symbols
 
 
-def _write_bundled_report(args: argparse.Namespace, out_path: Path) -> None:
+def _write_bundled_report(args: argparse.Namespace, out_path: Path, config: EngineConfig) -> dict[str, Any]:
     symbols = _load_symbols(args.symbols_file)
+    rules = config.compile_rulesets(args.ruleset)
+    timeframes = _parse_timeframes(args.timeframes)
+    cache = SignalCache(args.cache_dir) if args.cache_dir else None
+    frames: dict[str, pd.DataFrame] | None = {} if args.strategy_report else None
     bundled_symbols: list[dict[str, Any]] = []
+    prefetched: dict[str, pd.DataFrame] = {}
+    integrity: IntegrityReport | None = None
+    if args.integrity and symbols:
+        # Fetch everything first so the scan sees the whole universe before any rule runs.
+        for item in symbols:
+            with scope(item["symbol"]), stage("fetch"):
+                prefetched[item["symbol"]] = fetch_ohlc(item["symbol"], period=args.period, interval=args.interval)
+        integrity = _scan_integrity(args, out_path, prefetched)
+    quarantined = integrity.symbols("fail") if integrity is not None and args.integrity == "quarantine" else []
 
     for item in symbols:
-        signal, _ = _build_symbol_signal(item["symbol"], period=args.period, interval=args.interval)
+        if item["symbol"] in quarantined:
+            continue
+        signals, as_of, timeframe_signals = _build_symbol_signals(
+            item["symbol"],
+            args.period,
+            args.interval,
+            rules,
+            timeframes,
+            cache,
+            frames,
+            prefetched.get(item["symbol"]),
+        )
+        signal = signals[config.ruleset]
         # The bundle intentionally nests per-symbol payloads for portfolio-style consumption.
-        bundled_symbols.append({"symbol": signal.symbol, "name": item["name"], **asdict(signal)})
+        row = {"symbol": signal.symbol, "name": item["name"], **asdict(signal), "as_of": as_of}
+        if len(rules) > 1:
+            row["rulesets"] = {name: _ruleset_payload(s) for name, s in signals.items()}
+        if timeframes:
+            row["timeframes"] = timeframe_signals
+        if integrity is not None:
+            row["quality"] = integrity.flags[item["symbol"]]
+        bundled_symbols.append(row)
 
+    timeframe_info: dict[str, Any] = {"period": args.period, "interval": args.interval}
+    if timeframes:
+        timeframe_info["timeframes"] = timeframes
     payload = {
         "generated_at": jst_now_iso(),
-        "timeframe": {"period": args.period, "interval": args.interval},
-        "engine_version": ENGINE_VERSION,
+        "timeframe": timeframe_info,
+        "engine_version": config.stamped_version,
+        "ruleset": config.ruleset,
         "symbols": bundled_symbols,
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    if integrity is not None:
+        payload["integrity"] = {"mode": args.integrity, "flags": integrity.flags, "quarantined": quarantined}
+    if len(rules) > 1:
+        payload["rulesets"] = {
+            rule.name: {
+                "engine_version": f"{config.engine_version}+{params_hash(rule.name, rule.params)}",
+                "parameters": asdict(rule.params),
+            }
+            for rule in rules
+        }
+    with stage("io.bundle_json"):
+        raw = json.dumps(payload, ensure_ascii=False, indent=2)
+    out_path.write_text(raw, encoding="utf-8")
+    if frames is not None:
+        _write_strategy_reports(Path(args.strategy_report), frames, config, payload["generated_at"])
+    return payload
+
+
+def _write_strategy_reports(
+    path: Path,
+    frames: dict[str, pd.DataFrame],
+    config: EngineConfig,
+    generated_at: str,
+) -> None:
+    """Write docs/05 strategy reports, reusing the previous run's state where it still applies.
+
+    The incremental ``state`` sections go to a ``<path stem>.state.json``
+    sidecar so the published file holds only the mobile contract.
+    """
+    state_path = path.with_suffix(".state.json")
+    previous: dict[str, Any] = {}
+    if path.exists():
+        previous = json.loads(path.read_text(encoding="utf-8")).get("reports", {})
+    if state_path.exists():
+        previous = merge_state(previous, json.loads(state_path.read_text(encoding="utf-8")))
+    with stage("report"):
+        reports = refresh_reports(
+            frames,
+            previous,
+            ReportConfig(params=config.parameters),
+            generated_at=generated_at,
+            engine_version=config.stamped_version,
+        )
+    reports, states = split_state(reports)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(states, ensure_ascii=False), encoding="utf-8")
+    payload = {"generated_at": generated_at, "engine_version": config.stamped_version, "reports": reports}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Wrote {path} (state: {state_path})")
+
+
+def _scan_integrity(args: argparse.Namespace, out_path: Path, frames: dict[str, pd.DataFrame]) -> IntegrityReport:
+    """Scan all fetched bars at once and write the per-symbol issue report."""
+    with stage("integrity"):
+        report = scan_frames(frames)
+    path = Path(args.integrity_out) if args.integrity_out else out_path.with_suffix(".integrity.json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    counts = report.summary["flag"].value_counts()
+    print(
+        f"Integrity: {counts.get('ok', 0)} ok, {counts.get('warn', 0)} warn, {counts.get('fail', 0)} fail;"
+        f" wrote {path}"
+    )
+    return report
+
+
+def _send_notifications(args: argparse.Namespace, payload: dict[str, Any]) -> None:
+    if args.notify_config:
+        notify_config = load_notify_config(args.notify_config)
+    else:
+        notify_config = load_notify_config(DEFAULT_NOTIFY_CONFIG if DEFAULT_NOTIFY_CONFIG.exists() else None)
+    sender = FileSender(args.notify_out) if args.notify_out else StreamSender()
+    with stage("notify"):
+        result = dispatch(payload, notify_config, NotificationState.load(args.notify_state), sender)
+    print(
+        f"Notified {len(result.sent)} alert(s) in {result.batches} batch(es);"
+        f" {len(result.duplicates)} duplicate(s) skipped"
+    )
+
+
+def _parse_timeframes(raw: str | None) -> list[str]:
+    if not raw:
+        return []
+    timeframes = [tf.strip() for tf in raw.split(",") if tf.strip()]
+    for tf in timeframes:
+        parse_timeframe(tf)
+    return timeframes
+
+
+def _ruleset_payload(signal: SymbolSignal) -> dict[str, Any]:
+    """Per-ruleset subset of a symbol row (price fields are shared and not repeated)."""
+    return {
+        "signal": signal.signal,
+        "active": signal.active,
+        "reasons": list(signal.reasons),
+        "metrics": asdict(signal.metrics),
+    }
+
+
+def _profile_requested(args: argparse.Namespace) -> bool:
+    return bool(args.profile or args.profile_out or args.profile_memory or args.profile_cprofile)
+
+
+def _write_profile(profiler: StageProfiler, args: argparse.Namespace, out_path: Path) -> Path:
+    profile_path = Path(args.profile_out) if args.profile_out else out_path.with_suffix(".profile.json")
+    profile_path.parent.mkdir(parents=True, exist_ok=True)
+    profile_path.write_text(json.dumps(profiler.to_dict(), indent=2), encoding="utf-8")
+    print(profiler.format_table())
+    return profile_path
 
 
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
+    if args.ruleset and not args.symbols_file:
+        parser.error("--ruleset requires --symbols-file (the single-symbol report has no room for shadows)")
+    if args.timeframes and not args.symbols_file:
+        parser.error("--timeframes requires --symbols-file")
+    if args.strategy_report and not args.symbols_file:
+        parser.error("--strategy-report requires --symbols-file")
+    if args.integrity and not args.symbols_file:
+        parser.error("--integrity requires --symbols-file")
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
+    if not _profile_requested(args):
+        _run(args, out_path)
+        return
+
+    profiler = StageProfiler(trace_memory=args.profile_memory)
+    cprof = cProfile.Profile() if args.profile_cprofile else None
+    with activate(profiler):
+        if cprof is not None:
+            cprof.enable()
+        try:
+            _run(args, out_path)
+        finally:
+            if cprof is not None:
+                cprof.disable()
+
+    profile_path = _write_profile(profiler, args, out_path)
+    print(f"Wrote {profile_path}")
+    if cprof is not None:
+        Path(args.profile_cprofile).parent.mkdir(parents=True, exist_ok=True)
+        cprof.dump_stats(args.profile_cprofile)
+        print(f"Wrote {args.profile_cprofile}")
+
+
+def _run(args: argparse.Namespace, out_path: Path) -> None:
+    config = _load_config(args)
     if args.symbols_file:
-        _write_bundled_report(args, out_path)
+        payload = _write_bundled_report(args, out_path, config)
     else:
-        symbol_signal, as_of = _build_symbol_signal(args.symbol, period=args.period, interval=args.interval)
+        rule = compile_rule(config.parameters, config.ruleset)
+        symbol_signal, as_of = _build_symbol_signal(
+            args.symbol,
+            period=args.period,
+            interval=args.interval,
+            rule=rule,
+            cache=SignalCache(args.cache_dir) if args.cache_dir else None,
+        )
         report = SignalReport(
             generated_at=jst_now_iso(),
-            engine_version=ENGINE_VERSION,
+            engine_version=config.stamped_version,
             as_of=as_of,
             signal=symbol_signal,
         )
-        out_path.write_text(to_json(report), encoding="utf-8")
+        raw = to_json(report)
+        out_path.write_text(raw, encoding="utf-8")
+        payload = json.loads(raw)
 
     print(f"Wrote {out_path}")
+    if args.archive:
+        with stage("archive"):
+            rows = SignalArchive(args.archive).append_payload(payload, ruleset=config.ruleset)
+        print(f"Archived {rows} row(s) to {args.archive}")
+    if args.notify:
+        _send_notifications(args, payload)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""Engine configuration loading (`configs/engine.yaml`).
+
+The config files only use a small YAML subset (nested mappings, scalars and
+inline ``[a, b]`` lists), so we parse that subset here instead of adding a
+PyYAML dependency.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+
+from .rules import DEFAULT_RULESET, CompiledRule, RuleParams, compile_rule
+
+DEFAULT_ENGINE_CONFIG = Path("configs/engine.yaml")
+ENGINE_VERSION = "v0"
+
+
+def _parse_scalar(raw: str) -> Any:
+    value = raw.strip()
+    if not value:
+        return None
+    if value[0] in "\"'" and value[-1] == value[0] and len(value) >= 2:
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        inner = value[1:-1].strip()
+        return [_parse_scalar(part) for part in inner.split(",")] if inner else []
+    lowered = value.lower()
+    if lowered in {"true", "yes", "on"}:
+        return True
+    if lowered in {"false", "no", "off"}:
+        return False
+    if lowered in {"null", "none", "~"}:
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _strip_comment(line: str) -> str:
+    quote = ""
+    for i, ch in enumerate(line):
+        if ch in "\"'":
+            quote = "" if quote == ch else (quote or ch)
+        elif ch == "#" and not quote and (i == 0 or line[i - 1].isspace()):
+            return line[:i]
+    return line
+
+
+def parse_simple_yaml(text: str) -> dict[str, Any]:
+    """Parse the YAML subset used by files under ``configs/``.
+
+    Supported: ``key: value`` pairs, nesting by indentation, inline lists,
+    quoted strings, numbers, booleans and ``#`` comments. Block lists (``- x``)
+    and multi-line strings are rejected with ValueError.
+    """
+    root: dict[str, Any] = {}
+    # Stack of (indent, mapping); the root sits at indent -1.
+    stack: list[tuple[int, dict[str, Any]]] = [(-1, root)]
+
+    for lineno, raw_line in enumerate(text.splitlines(), start=1):
+        line = _strip_comment(raw_line).rstrip()
+        if not line.strip():
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+        content = line.strip()
+        if content.startswith("- ") or ":" not in content:
+            raise ValueError(f"Unsupported YAML on line {lineno}: {raw_line.strip()!r}")
+
+        key, _, rest = content.partition(":")
+        key = key.strip()
+        while indent <= stack[-1][0]:
+            stack.pop()
+        parent = stack[-1][1]
+        if key in parent:
+            raise ValueError(f"Duplicate key {key!r} on line {lineno}")
+
+        if rest.strip():
+            parent[key] = _parse_scalar(rest)
+        else:
+            child: dict[str, Any] = {}
+            parent[key] = child
+            stack.append((indent, child))
+
+    return root
+
+
+def params_hash(ruleset: str, params: RuleParams) -> str:
+    """Short, stable hash of everything that changes one ruleset's output."""
+    canonical = json.dumps(
+        {"ruleset": ruleset, "parameters": asdict(params)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:8]
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """Parsed engine config: which ruleset runs and with which parameters.
+
+    ``rulesets`` holds optional shadow variants (name -> parameters); each
+    variant's YAML entry only lists overrides on top of ``parameters``.
+    """
+
+    engine_version: str = ENGINE_VERSION
+    ruleset: str = DEFAULT_RULESET
+    parameters: RuleParams = field(default_factory=RuleParams)
+    rulesets: dict[str, RuleParams] = field(default_factory=dict)
+
+    @property
+    def config_hash(self) -> str:
+        """Hash of the primary ruleset and its parameters."""
+        return params_hash(self.ruleset, self.parameters)
+
+    @property
+    def stamped_version(self) -> str:
+        """``engine_version`` plus the config hash, e.g. ``v0+1a2b3c4d``."""
+        return f"{self.engine_version}+{self.config_hash}"
+
+    @classmethod
+    def from_mapping(cls, data: dict[str, Any]) -> EngineConfig:
+        params = data.get("parameters") or {}
+        if not isinstance(params, dict):
+            raise ValueError("engine config 'parameters' must be a mapping")
+        base = RuleParams.from_mapping(params)
+        ruleset = str(data.get("ruleset", cls.ruleset))
+
+        variants: dict[str, RuleParams] = {}
+        for name, overrides in (data.get("rulesets") or {}).items():
+            if not isinstance(overrides, dict):
+                raise ValueError(f"engine config ruleset {name!r} must be a mapping of parameter overrides")
+            if name == ruleset:
+                raise ValueError(f"ruleset {name!r} duplicates the primary ruleset name")
+            variants[str(name)] = base.replace(**overrides)
+
+        return cls(
+            engine_version=str(data.get("engine_version", cls.engine_version)),
+            ruleset=ruleset,
+            parameters=base,
+            rulesets=variants,
+        )
+
+    def ruleset_names(self) -> list[str]:
+        """Primary ruleset first, then shadow variants in file order."""
+        return [self.ruleset, *self.rulesets]
+
+    def params_for(self, name: str) -> RuleParams:
+        if name == self.ruleset:
+            return self.parameters
+        try:
+            return self.rulesets[name]
+        except KeyError:
+            raise ValueError(f"Unknown ruleset {name!r}; available: {self.ruleset_names()}") from None
+
+    def compile_rulesets(self, names: Sequence[str] | None = None) -> list[CompiledRule]:
+        """Compile the primary ruleset plus ``names`` (``["all"]`` = every variant).
+
+        The primary ruleset always comes first so callers can treat element 0
+        as the production signal and the rest as shadows.
+        """
+        requested = list(names or [])
+        if "all" in requested:
+            requested = self.ruleset_names()
+        ordered = list(dict.fromkeys([self.ruleset, *requested]))
+        return [compile_rule(self.params_for(name), name) for name in ordered]
+
+
+def load_engine_config(path: str | Path | None = None) -> EngineConfig:
+    """Load an engine config file; ``None`` returns the built-in defaults."""
+    if path is None:
+        return EngineConfig()
+    text = Path(path).read_text(encoding="utf-8")
+    return EngineConfig.from_mapping(parse_simple_yaml(text))
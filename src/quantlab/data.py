@@ -3,6 +3,8 @@ from __future__ import annotations
 import pandas as pd
 import yfinance as yf
 
+from .profiling import count, stage
+
 
 def fetch_ohlc(symbol: str, period: str = "2y", interval: str = "1d") -> pd.DataFrame:
     """Fetch OHLCV data from yfinance and normalize column layout.
@@ -12,17 +14,25 @@ def fetch_ohlc(symbol: str, period: str = "2y", interval: str = "1d") -> pd.Data
     - We flatten to the field level and retain only standard OHLCV columns.
     - dropna() keeps downstream indicators simple and deterministic.
     """
-    df = yf.download(
-        symbol,
-        period=period,
-        interval=interval,
-        auto_adjust=False,
-        progress=False,
-    )
+    with stage("fetch.download"):
+        df = yf.download(
+            symbol,
+            period=period,
+            interval=interval,
+            auto_adjust=False,
+            progress=False,
+        )
 
     if df is None or df.empty:
         raise ValueError(f"Failed to fetch data for {symbol}")
 
+    with stage("fetch.normalize"):
+        out = _normalize_columns(df, symbol)
+    count("fetch.rows", len(out))
+    return out
+
+
+def _normalize_columns(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
     # MultiIndex example: ('Close', '1306.T') -> 'Close'
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
@@ -1,14 +1,194 @@
+"""Indicators on pandas objects, backed by array-native NumPy kernels.
+
+The ``*_array`` functions accept 1D arrays (one symbol) or 2D arrays with one
+column per symbol, and can write into a caller-provided ``out`` buffer so hot
+loops (e.g. per-bar intraday refresh) avoid per-call allocations. The pandas
+functions `ema` and `atr` are thin wrappers over them.
+"""
+
 from __future__ import annotations
 
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rows per block in the blocked EMA scan. Within a block the recursion is a
+# (block x block) lower-triangular matmul; 64 keeps decay**64 well inside
+# float64 range for any sensible span.
+_SCAN_BLOCK = 64
+
+
+def _prepare_out(out: np.ndarray | None, shape: tuple[int, ...]) -> np.ndarray:
+    if out is None:
+        return np.empty(shape, dtype=float)
+    if out.shape != shape or out.dtype != np.float64 or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous float64 array of shape {shape}")
+    return out
+
+
+def _as_2d(a: np.ndarray) -> np.ndarray:
+    """View 1D input as a single column so every kernel handles (rows, symbols)."""
+    if a.ndim == 1:
+        return a[:, None]
+    if a.ndim == 2:
+        return a
+    raise ValueError("expected a 1D or 2D array")
+
+
+@lru_cache(maxsize=32)
+def _scan_kernel(decay: float) -> tuple[np.ndarray, np.ndarray]:
+    """Lower-triangular decay matrix and per-row carry weights for one block."""
+    lag = np.subtract.outer(np.arange(_SCAN_BLOCK), np.arange(_SCAN_BLOCK))
+    kernel = np.where(lag >= 0, decay ** np.maximum(lag, 0), 0.0)
+    carry = decay ** np.arange(1, _SCAN_BLOCK + 1)
+    kernel.setflags(write=False)
+    carry.setflags(write=False)
+    return kernel, carry
+
+
+def _linear_scan(u: np.ndarray, decay: float, state: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Solve ``y[t] = decay * y[t-1] + u[t]`` (y[-1] = state) column-wise.
+
+    Full blocks are solved with one batched matmul; the carry between blocks
+    is itself a linear recurrence, solved recursively on the block ends.
+    ``out`` may alias ``u``.
+    """
+    n, m = u.shape
+    n_blocks = n // _SCAN_BLOCK
+    full = n_blocks * _SCAN_BLOCK
+    state = np.array(state, dtype=float, copy=True)
+
+    if n_blocks:
+        kernel, carry = _scan_kernel(decay)
+        blocks = out[:full].reshape(n_blocks, _SCAN_BLOCK, m)
+        np.matmul(kernel, u[:full].reshape(n_blocks, _SCAN_BLOCK, m), out=blocks)
+
+        ends = blocks[:, -1, :].copy()
+        block_states = _linear_scan(ends, decay**_SCAN_BLOCK, state, ends)
+        entering = np.empty_like(block_states)
+        entering[0] = state
+        entering[1:] = block_states[:-1]
+        blocks += carry[None, :, None] * entering[:, None, :]
+        state = block_states[-1].copy()
+
+    for t in range(full, n):
+        np.multiply(state, decay, out=state)
+        state += u[t]
+        out[t] = state
+    return out
+
+
+def ema_array(values: np.ndarray, span: int, *, out: np.ndarray | None = None) -> np.ndarray:
+    """Recursive EMA (``adjust=False``) over rows of a 1D or 2D array.
+
+    Matches ``Series.ewm(span=span, adjust=False).mean()`` for NaN-free input.
+    Leading NaNs (warm-up, late listings) are handled per column and stay NaN;
+    interior NaNs are not supported and propagate forward.
+    """
+    if span < 1:
+        raise ValueError("span must be >= 1")
+    x = np.asarray(values, dtype=float)
+    result = _prepare_out(out, x.shape)
+    if x.shape[0] == 0:
+        return result
+
+    alpha = 2.0 / (span + 1.0)
+    x2 = _as_2d(x)
+    o2 = _as_2d(result)
+    n, m = x2.shape
+
+    if np.isnan(x2[0]).any():
+        valid = ~np.isnan(x2)
+        first = valid.argmax(axis=0)
+        state = x2[first, np.arange(m)]
+        leading = np.arange(n)[:, None] < first[None, :]
+        np.multiply(np.where(leading, state[None, :], x2), alpha, out=o2)
+        _linear_scan(o2, 1.0 - alpha, state, o2)
+        o2[leading] = np.nan
+        o2[:, ~valid.any(axis=0)] = np.nan
+    else:
+        # With y[-1] = x[0] the recursion reproduces pandas' seed y[0] = x[0].
+        state = x2[0].copy()
+        np.multiply(x2, alpha, out=o2)
+        _linear_scan(o2, 1.0 - alpha, state, o2)
+    return result
+
+
+def true_range_array(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    *,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """True Range per row: max(high-low, |high-prev_close|, |low-prev_close|).
+
+    The first row has no previous close and falls back to high-low, as in the
+    pandas implementation (NaN components are skipped).
+    """
+    h = np.asarray(high, dtype=float)
+    lo = np.asarray(low, dtype=float)
+    c = np.asarray(close, dtype=float)
+    if not (h.shape == lo.shape == c.shape):
+        raise ValueError("high, low and close must share one shape")
+    result = _prepare_out(out, h.shape)
+
+    np.subtract(h, lo, out=result)
+    if h.shape[0] > 1:
+        scratch = np.empty((h.shape[0] - 1, *h.shape[1:]))
+        prev_close = c[:-1]
+        tail = result[1:]
+        np.subtract(h[1:], prev_close, out=scratch)
+        np.abs(scratch, out=scratch)
+        np.fmax(tail, scratch, out=tail)
+        np.subtract(lo[1:], prev_close, out=scratch)
+        np.abs(scratch, out=scratch)
+        np.fmax(tail, scratch, out=tail)
+    return result
+
+
+def rolling_mean_array(values: np.ndarray, window: int, *, out: np.ndarray | None = None) -> np.ndarray:
+    """Trailing mean over ``window`` rows; the first ``window - 1`` rows are NaN.
+
+    Any NaN inside a window yields NaN, like ``rolling(window).mean()``.
+    """
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    x = np.asarray(values, dtype=float)
+    result = _prepare_out(out, x.shape)
+    result[: window - 1] = np.nan
+    if x.shape[0] >= window:
+        windows = sliding_window_view(x, window, axis=0)
+        np.mean(windows, axis=-1, out=result[window - 1 :])
+    return result
+
+
+def atr_array(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 14,
+    *,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Average True Range: trailing ``period``-row mean of `true_range_array`."""
+    tr = true_range_array(high, low, close)
+    return rolling_mean_array(tr, period, out=out)
 
 
 def ema(series: pd.Series, span: int) -> pd.Series:
-    """Exponential moving average with Pandas EWM.
+    """Exponential moving average with Pandas EWM semantics.
 
     Using adjust=False mirrors trading-style recursive EMA calculations.
     """
-    return series.ewm(span=span, adjust=False).mean()
+    values = series.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    if valid.any() and not valid[valid.argmax() :].all():
+        # Interior gaps re-weight observations in pandas; keep its exact semantics.
+        return series.ewm(span=span, adjust=False).mean()
+    return pd.Series(ema_array(values, span), index=series.index, name=series.name)
 
 
 def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
@@ -19,18 +199,10 @@ def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     2) abs(high-prev_close)
     3) abs(low-prev_close)
     """
-    high = df["High"]
-    low = df["Low"]
-    close = df["Close"]
-    prev_close = close.shift(1)
-
-    tr = pd.concat(
-        [
-            high - low,
-            (high - prev_close).abs(),
-            (low - prev_close).abs(),
-        ],
-        axis=1,
-    ).max(axis=1)
-
-    return tr.rolling(period).mean()
+    values = atr_array(
+        df["High"].to_numpy(dtype=float),
+        df["Low"].to_numpy(dtype=float),
+        df["Close"].to_numpy(dtype=float),
+        period,
+    )
+    return pd.Series(values, index=df.index)
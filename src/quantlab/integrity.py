@@ -0,0 +1,328 @@
+"""Data-integrity scan of OHLCV bars before they reach indicators and signals.
+
+`data.fetch_ohlc` only drops rows with missing values. Bars that are present
+but wrong (High below Low, zero volume, an unadjusted split, a repeated
+timestamp, a price that stopped updating) flow straight into ATR and the
+EMA crosses. `scan_frames` checks a whole universe at once: every symbol is
+one column of (bars, symbols) arrays aligned on its latest bar (the layout
+of `rules.rule_components`), so each check is a handful of NumPy operations
+regardless of the number of symbols.
+
+The result is a compact `IntegrityReport`: one row per flagged bar and a
+per-symbol summary with a quality flag (``ok`` / ``warn`` / ``fail``) that
+the CLI uses to quarantine symbols before evaluating them.
+"""
+
+from __future__ import annotations
+
+import math
+import warnings
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+# Check name -> severity. Any error fails the symbol; warnings fail it only
+# when they cover more than ``max_warning_fraction`` of its bars.
+CHECKS: dict[str, str] = {
+    "no_bars": "error",
+    "missing_value": "error",
+    "non_positive_price": "error",
+    "high_below_low": "error",
+    "open_close_outside_range": "error",
+    "negative_volume": "error",
+    "duplicate_timestamp": "error",
+    "unsorted_timestamp": "error",
+    "split_jump": "error",
+    "zero_volume": "warning",
+    "outlier_return": "warning",
+    "stale_price": "warning",
+    "calendar_gap": "warning",
+}
+QUALITY_FLAGS = ("ok", "warn", "fail")
+
+_NS_PER_DAY = 86_400 * 10**9
+_PRICES = ("Open", "High", "Low", "Close")
+
+
+@dataclass(frozen=True)
+class IntegrityConfig:
+    """Thresholds of `scan_frames`.
+
+    Parameters
+    ----------
+    outlier_sigma:
+        A 1-bar log return is an outlier beyond this many robust standard
+        deviations (1.4826 * MAD of the symbol's returns) ...
+    min_outlier_return:
+        ... and only if it is also larger than this absolute log return.
+    split_ratios, split_tolerance:
+        A close-to-close ratio within ``split_tolerance`` of ``k`` or ``1/k``
+        for one of these ``k`` looks like an unadjusted (reverse) split.
+    stale_bars:
+        Runs of at least this many bars with an unchanged close are stale.
+    max_gap_sessions:
+        More missing calendar sessions than this between two bars is a gap.
+    calendar:
+        Expected session dates. ``None`` means Monday-Friday, so single
+        holidays are absorbed by ``max_gap_sessions``.
+    max_warning_fraction:
+        Share of bars with warnings above which a symbol fails.
+    """
+
+    outlier_sigma: float = 10.0
+    min_outlier_return: float = 0.05
+    split_ratios: tuple[float, ...] = (2.0, 3.0, 4.0, 5.0, 10.0)
+    split_tolerance: float = 0.02
+    stale_bars: int = 5
+    max_gap_sessions: int = 3
+    calendar: tuple[pd.Timestamp, ...] | None = None
+    max_warning_fraction: float = 0.05
+
+    def __post_init__(self) -> None:
+        if self.stale_bars < 2:
+            raise ValueError("stale_bars must be >= 2")
+        if self.max_gap_sessions < 0:
+            raise ValueError("max_gap_sessions must be >= 0")
+        if not 0.0 <= self.max_warning_fraction <= 1.0:
+            raise ValueError("max_warning_fraction must be in [0, 1]")
+        if any(k <= 1.0 for k in self.split_ratios):
+            raise ValueError("split_ratios must be > 1")
+        if self.calendar is not None:
+            object.__setattr__(self, "calendar", tuple(pd.DatetimeIndex(self.calendar)))
+
+
+@dataclass(frozen=True)
+class IntegrityReport:
+    """Outcome of `scan_frames`.
+
+    ``issues`` has one row per flagged bar (``symbol``, ``as_of``, ``check``,
+    ``severity``, ``value``); stale runs and gaps are reported once, at the
+    bar that ends them, with the run length / missing sessions as value.
+    ``summary`` is indexed by symbol with ``n_bars``, ``n_errors``,
+    ``n_warnings``, ``flag`` and one count column per check.
+    """
+
+    issues: pd.DataFrame
+    summary: pd.DataFrame
+
+    @property
+    def flags(self) -> dict[str, str]:
+        return self.summary["flag"].to_dict()
+
+    def symbols(self, *flags: str) -> list[str]:
+        """Symbols whose quality flag is one of ``flags``."""
+        unknown = set(flags) - set(QUALITY_FLAGS)
+        if unknown:
+            raise ValueError(f"unknown quality flags: {sorted(unknown)}")
+        return self.summary.index[self.summary["flag"].isin(flags)].tolist()
+
+    def to_dict(self, max_issues: int = 20) -> dict[str, Any]:
+        """JSON-ready report: per-symbol counts and the first ``max_issues`` issues of each symbol."""
+        out: dict[str, Any] = {}
+        issues = self.issues.assign(as_of=self.issues["as_of"].map(str))  # str(Timestamp), as in the bundle
+        grouped = dict(tuple(issues.groupby("symbol", sort=False)))
+        for symbol, row in self.summary.iterrows():
+            counts = {check: int(row[check]) for check in CHECKS if row[check]}
+            head = grouped.get(symbol, issues.iloc[:0]).head(max_issues)
+            out[str(symbol)] = {
+                "flag": row["flag"],
+                "n_bars": int(row["n_bars"]),
+                "n_errors": int(row["n_errors"]),
+                "n_warnings": int(row["n_warnings"]),
+                "counts": counts,
+                "issues": [
+                    {"as_of": as_of, "check": check, "value": None if math.isnan(value) else float(value)}
+                    for as_of, check, value in head[["as_of", "check", "value"]].itertuples(index=False)
+                ],
+            }
+        return out
+
+
+def _stack(frames: Mapping[str, pd.DataFrame]) -> dict[str, np.ndarray]:
+    """(bars, symbols) arrays aligned on each symbol's latest bar, plus a ``present`` mask."""
+    n_rows = max(len(df) for df in frames.values())
+    shape = (n_rows, len(frames))
+    out = {col: np.full(shape, np.nan) for col in (*_PRICES, "Volume")}
+    out["ts"] = np.zeros(shape, dtype=np.int64)
+    out["present"] = np.zeros(shape, dtype=bool)
+    out["has_volume"] = np.zeros(len(frames), dtype=bool)
+    for j, df in enumerate(frames.values()):
+        k = len(df)
+        if not k:
+            continue
+        for col in _PRICES:
+            out[col][n_rows - k :, j] = df[col].to_numpy(dtype=float)
+        if "Volume" in df.columns:
+            out["Volume"][n_rows - k :, j] = df["Volume"].to_numpy(dtype=float)
+            out["has_volume"][j] = True
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)  # local wall-clock dates for the calendar
+        out["ts"][n_rows - k :, j] = index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        out["present"][n_rows - k :, j] = True
+    return out
+
+
+def _previous(a: np.ndarray, fill: Any) -> np.ndarray:
+    """``a`` shifted down one bar (row ``t`` holds bar ``t-1``)."""
+    return np.vstack([np.full((1, a.shape[1]), fill, dtype=a.dtype), a[:-1]])
+
+
+def _session_days(config: IntegrityConfig, days: np.ndarray, present: np.ndarray) -> np.ndarray:
+    if config.calendar is not None:
+        cal = pd.DatetimeIndex(config.calendar).normalize().to_numpy(dtype="datetime64[ns]").view(np.int64)
+        return np.unique(cal // _NS_PER_DAY)
+    lo, hi = days[present].min(), days[present].max()
+    span = np.arange(lo, hi + 1)
+    return span[(span + 3) % 7 < 5]  # 1970-01-01 was a Thursday; Monday = 0
+
+
+def _split_like(log_ret: np.ndarray, config: IntegrityConfig) -> np.ndarray:
+    """Bars whose close-to-close ratio is within tolerance of ``k`` or ``1/k``."""
+    hit = np.zeros(log_ret.shape, dtype=bool)
+    if not config.split_ratios:
+        return hit
+    # Only jumps at least as large as the smallest split can match; test those alone.
+    smallest = math.log(min(config.split_ratios) * (1.0 - config.split_tolerance))
+    with np.errstate(invalid="ignore"):
+        candidates = np.abs(log_ret) >= smallest
+    ratio = np.exp(log_ret[candidates])
+    match = np.zeros(ratio.shape, dtype=bool)
+    tol = config.split_tolerance
+    for k in config.split_ratios:
+        match |= (np.abs(ratio / k - 1.0) <= tol) | (np.abs(ratio * k - 1.0) <= tol)
+    hit[candidates] = match
+    return hit
+
+
+def _check_masks(data: dict[str, np.ndarray], config: IntegrityConfig) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Per-check (bars, symbols) boolean masks and the value reported with each flag."""
+    present = data["present"]
+    o, h, lo, c, v = (data[col] for col in (*_PRICES, "Volume"))
+    nan = np.full(present.shape, np.nan)
+    prev_present = _previous(present, False)
+    pair = present & prev_present
+    checks: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        prices = np.stack([o, h, lo, c])
+        checks["missing_value"] = (present & np.isnan(prices).any(axis=0), nan)
+        checks["non_positive_price"] = (present & (prices <= 0).any(axis=0), np.fmin.reduce(prices, axis=0))
+        checks["high_below_low"] = (present & (h < lo), h - lo)
+        checks["open_close_outside_range"] = (
+            present & ((o > h) | (o < lo) | (c > h) | (c < lo)) & ~(h < lo),
+            nan,
+        )
+        volume_cols = data["has_volume"][None, :]
+        checks["negative_volume"] = (present & volume_cols & (v < 0), v)
+        # Indices and FX report zero volume on every bar; only flag symbols that normally trade volume.
+        trades = (v > 0).any(axis=0)[None, :]
+        checks["zero_volume"] = (present & volume_cols & trades & (v == 0), v)
+
+        ts, prev_ts = data["ts"], _previous(data["ts"], 0)
+        checks["duplicate_timestamp"] = (pair & (ts == prev_ts), nan)
+        checks["unsorted_timestamp"] = (pair & (ts < prev_ts), nan)
+
+        prev_c = _previous(c, np.nan)
+        ratio = c / prev_c
+        valid = pair & (c > 0) & (prev_c > 0)
+        log_ret = np.where(valid, np.log(ratio), np.nan)
+        split = valid & _split_like(log_ret, config)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns (one-bar symbols)
+            center = np.nanmedian(log_ret, axis=0)
+            sigma = 1.4826 * np.nanmedian(np.abs(log_ret - center), axis=0)
+        limit = np.maximum(config.outlier_sigma * np.nan_to_num(sigma), config.min_outlier_return)
+        checks["split_jump"] = (split, ratio)
+        checks["outlier_return"] = (valid & ~split & (np.abs(log_ret) > limit), log_ret)
+
+        # Run length of unchanged closes, reported at the bar that ends each long run.
+        same = pair & (c == prev_c)
+        rows = np.arange(len(c))[:, None]
+        start = np.maximum.accumulate(np.where(same, 0, rows), axis=0)
+        run = rows - start + 1
+        same_next = np.vstack([same[1:], np.zeros((1, same.shape[1]), dtype=bool)])
+        checks["stale_price"] = (same & (run >= config.stale_bars) & ~same_next, run.astype(float))
+
+    days = ts // _NS_PER_DAY
+    if present.any():
+        sessions = _session_days(config, days, present)
+        after_prev = np.searchsorted(sessions, _previous(days, 0), side="right")
+        missing = np.searchsorted(sessions, days, side="left") - after_prev
+        checks["calendar_gap"] = (pair & (missing > config.max_gap_sessions), missing.astype(float))
+    else:
+        checks["calendar_gap"] = (np.zeros(present.shape, dtype=bool), nan)
+    return checks
+
+
+def scan_frames(
+    frames: Mapping[str, pd.DataFrame],
+    config: IntegrityConfig | None = None,
+) -> IntegrityReport:
+    """Run every check in `CHECKS` on all symbols' bars in one vectorized pass.
+
+    ``frames`` maps symbol -> OHLCV frame with a DatetimeIndex (``Volume``
+    is optional). Gaps are counted in whole sessions of ``config.calendar``,
+    so intraday bars are only checked for missing days.
+    """
+    cfg = config or IntegrityConfig()
+    if not frames:
+        raise ValueError("frames must not be empty")
+    for symbol, df in frames.items():
+        missing = [col for col in _PRICES if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required price columns for {symbol}: {missing}")
+
+    symbols = list(frames)
+    data = _stack(frames)
+    checks = _check_masks(data, cfg)
+
+    n_bars = data["present"].sum(axis=0)
+    counts = pd.DataFrame(0, index=pd.Index(symbols, name="symbol"), columns=list(CHECKS))
+    counts["no_bars"] = (n_bars == 0).astype(int)
+    found: list[tuple[np.ndarray, np.ndarray, str, np.ndarray]] = []
+    error_bars = np.zeros(data["present"].shape, dtype=bool)
+    warning_bars = np.zeros(data["present"].shape, dtype=bool)
+    for name, (mask, values) in checks.items():
+        counts[name] = mask.sum(axis=0)
+        if CHECKS[name] == "error":
+            error_bars |= mask
+        else:
+            warning_bars |= mask
+        rows, cols = np.nonzero(mask)
+        found.append((rows, cols, name, values[rows, cols]))
+
+    rows = np.concatenate([f[0] for f in found])
+    cols = np.concatenate([f[1] for f in found])
+    names = np.concatenate([np.full(len(f[0]), f[2], dtype=object) for f in found])
+    order = np.lexsort((rows, cols))  # symbol order of ``frames``, then bar order
+    rows, cols, names = rows[order], cols[order], names[order]
+    # Report the frames' own timestamps (tz-aware ones keep their offset); ``ts`` is wall-clock only.
+    as_of = np.empty(len(rows), dtype=object)
+    n_rows = data["present"].shape[0]
+    for j in np.unique(cols):
+        index = pd.DatetimeIndex(frames[symbols[j]].index)
+        take = cols == j
+        as_of[take] = index[rows[take] - (n_rows - len(index))].astype(object)
+    issues = pd.DataFrame(
+        {
+            "symbol": np.asarray(symbols, dtype=object)[cols],
+            "as_of": as_of.tolist(),
+            "check": names,
+            "severity": [CHECKS[name] for name in names],
+            "value": np.concatenate([f[3] for f in found])[order],
+        }
+    )
+
+    n_errors = error_bars.sum(axis=0) + counts["no_bars"].to_numpy()
+    n_warnings = warning_bars.sum(axis=0)
+    too_many = n_warnings > cfg.max_warning_fraction * n_bars
+    flag = np.where((n_errors > 0) | too_many, "fail", np.where(n_warnings > 0, "warn", "ok"))
+    summary = pd.DataFrame(
+        {"n_bars": n_bars, "n_errors": n_errors, "n_warnings": n_warnings, "flag": flag},
+        index=counts.index,
+    ).join(counts)
+    return IntegrityReport(issues=issues, summary=summary)
+
@@ -4,6 +4,7 @@ import json
 from dataclasses import asdict
 
 from .contract import Metrics, SignalReport, SymbolSignal
+from .profiling import stage
 
 
 def to_json(report: SignalReport) -> str:
@@ -13,14 +14,15 @@ def to_json(report: SignalReport) -> str:
     - Old consumers expect one-symbol flat keys at root (symbol, signal, reasons...)
     - New consumers can additionally rely on engine_version/as_of/metrics.
     """
-    flat_signal = asdict(report.signal)
-    payload = {
-        "generated_at": report.generated_at,
-        "engine_version": report.engine_version,
-        "as_of": report.as_of,
-        **flat_signal,
-    }
-    return json.dumps(payload, ensure_ascii=False, indent=2)
+    with stage("io.to_json"):
+        flat_signal = asdict(report.signal)
+        payload = {
+            "generated_at": report.generated_at,
+            "engine_version": report.engine_version,
+            "as_of": report.as_of,
+            **flat_signal,
+        }
+        return json.dumps(payload, ensure_ascii=False, indent=2)
 
 
 def from_json(raw: str) -> SignalReport:
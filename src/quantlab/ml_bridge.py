@@ -4,17 +4,53 @@ The goal of this module is educational and practical:
 - centralize feature engineering in one place,
 - make label construction explicit,
 - and provide leakage-safe walk-forward splits.
+
+`iter_ml_table_chunks` / `write_ml_table_csv` compute the same features and
+labels out of core: bars are consumed block by block and only a few rows of
+warm-up, the EMA values and the label window are carried between blocks.
 """
 
 from __future__ import annotations
 
+import warnings
 from dataclasses import dataclass
-from typing import Generator, Literal
+from pathlib import Path
+from typing import Generator, Iterable, Iterator, Literal, Sequence, get_args
 
 import numpy as np
 import pandas as pd
 
-LabelMethod = Literal["next_day_direction", "return_threshold", "return_quantile"]
+from .indicators import ema, ema_array, rolling_mean_array, true_range_array
+
+LabelMethod = Literal["next_day_direction", "return_threshold", "return_quantile", "rolling_quantile"]
+
+# Rows of history the features look back over (20-bar std of 1-bar returns).
+FEATURE_WARMUP_ROWS = 21
+
+
+@dataclass(frozen=True)
+class LabelMatrix:
+    """Labels for several methods and horizons, from `build_label_matrix`.
+
+    ``labels`` is an int8 (rows, columns) array of 0/1 and ``valid`` the
+    matching boolean mask; invalid entries (no realized forward return yet,
+    or no rolling threshold) hold 0. ``columns[j]`` is
+    ``label_{method}_h{horizon}`` for ``keys[j] == (method, horizon)``.
+    """
+
+    index: pd.Index
+    keys: tuple[tuple[str, int], ...]
+    labels: np.ndarray
+    valid: np.ndarray
+
+    @property
+    def columns(self) -> list[str]:
+        return [f"label_{method}_h{horizon}" for method, horizon in self.keys]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Float labels with NaN where invalid (the `build_labels` convention)."""
+        values = np.where(self.valid, self.labels, np.nan)
+        return pd.DataFrame(values, index=self.index, columns=self.columns)
 
 
 @dataclass(frozen=True)
@@ -47,6 +83,14 @@ def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
     """
 
     _require_ohlcv(df)
+    close = df["Close"].astype(float)
+    # EMA spread as trend/momentum proxy
+    return _feature_frame(df, ema(close, 12) - ema(close, 26))
+
+
+
+def _feature_frame(df: pd.DataFrame, ema_diff: pd.Series | np.ndarray) -> pd.DataFrame:
+    """`build_feature_frame` body with the (stateful) EMA spread supplied by the caller."""
     out = pd.DataFrame(index=df.index)
 
     close = df["Close"].astype(float)
@@ -61,22 +105,11 @@ def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
     out["roll_std_5"] = out["ret_1d"].rolling(5).std()
     out["roll_std_20"] = out["ret_1d"].rolling(20).std()
 
-    # EMA spread as trend/momentum proxy
-    ema_fast = close.ewm(span=12, adjust=False).mean()
-    ema_slow = close.ewm(span=26, adjust=False).mean()
-    out["ema_diff"] = ema_fast - ema_slow
+    out["ema_diff"] = ema_diff
 
     # True Range / ATR as volatility regime proxy
-    prev_close = close.shift(1)
-    tr = pd.concat(
-        [
-            (high - low),
-            (high - prev_close).abs(),
-            (low - prev_close).abs(),
-        ],
-        axis=1,
-    ).max(axis=1)
-    out["atr_14"] = tr.rolling(14).mean()
+    tr = true_range_array(high.to_numpy(), low.to_numpy(), close.to_numpy())
+    out["atr_14"] = rolling_mean_array(tr, 14)
 
     # Price range / volume changes (micro regime hints)
     out["range_close"] = (high - low) / close.replace(0.0, np.nan)
@@ -95,15 +128,31 @@ def build_labels(
     method: LabelMethod = "next_day_direction",
     threshold: float = 0.0,
     quantile: float = 0.6,
+    window: int = 252,
 ) -> pd.Series:
     """Build a supervised-learning label from Close prices.
 
     Labels are aligned to timestamp *t* and use the return from t -> t+1.
+    ``return_quantile`` compares it with one quantile of the whole series;
+    ``rolling_quantile`` uses the quantile of the ``window`` returns already
+    realized at *t* (causal, and computable block by block).
     """
 
     _require_ohlcv(df)
     next_ret = df["Close"].astype(float).pct_change().shift(-1)
+    return _label_next_returns(next_ret, method, threshold, quantile, window)
+
+
 
+def _label_next_returns(
+    next_ret: pd.Series,
+    method: LabelMethod,
+    threshold: float,
+    quantile: float,
+    window: int,
+    history: np.ndarray | None = None,
+) -> pd.Series:
+    """Label rows from their next returns; ``history`` holds earlier realized returns."""
     if method == "next_day_direction":
         label = (next_ret > 0).astype("float")
     elif method == "return_threshold":
@@ -111,6 +160,14 @@ def build_labels(
     elif method == "return_quantile":
         q = float(next_ret.dropna().quantile(quantile))
         label = (next_ret > q).astype("float")
+    elif method == "rolling_quantile":
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        past = np.empty(0) if history is None else history
+        values = pd.Series(np.concatenate([past, next_ret.to_numpy(dtype=float)]))
+        # Row t may only use returns realized by t: next_ret[t - window : t].
+        q = values.rolling(window).quantile(quantile).shift(1).to_numpy()[len(past) :]
+        label = pd.Series(np.where(np.isnan(q), np.nan, next_ret.to_numpy() > q), index=next_ret.index)
     else:
         raise ValueError(f"Unsupported method: {method}")
 
@@ -120,12 +177,89 @@ def build_labels(
 
 
 
+def build_label_matrix(
+    df: pd.DataFrame,
+    horizons: Sequence[int] = (1, 5, 10, 20),
+    methods: Sequence[LabelMethod] = ("next_day_direction",),
+    *,
+    threshold: float = 0.0,
+    quantile: float = 0.6,
+    window: int = 252,
+) -> LabelMatrix:
+    """Build labels for every (method, horizon) pair in one vectorized pass.
+
+    With ``L_t = ln(Close_t)``, the forward return over ``h`` bars is
+    ``exp(L_{t+h} - L_t) - 1``: one log-price array gives all horizons as
+    shifted differences. Each method then labels the whole (rows, horizons)
+    return matrix at once, exactly as `build_labels` does for ``h = 1``:
+
+    - ``next_day_direction``: forward return > 0
+    - ``return_threshold``: forward return > ``threshold``
+    - ``return_quantile``: above the ``quantile`` of that horizon's returns
+    - ``rolling_quantile``: above the quantile of the ``window`` returns of
+      that horizon already realized at *t* (those ending at or before *t*)
+
+    The last ``h`` rows of horizon ``h`` have no realized return and are
+    marked invalid, so no label peeks past the end of the data.
+    """
+    _require_ohlcv(df)
+    horizons = [int(h) for h in horizons]
+    if not horizons or min(horizons) < 1:
+        raise ValueError("horizons must be a non-empty list of positive integers")
+    methods = list(methods)
+    unknown = [m for m in methods if m not in get_args(LabelMethod)]
+    if unknown or not methods:
+        raise ValueError(f"Unsupported method(s): {unknown or methods}")
+    if "rolling_quantile" in methods and window < 1:
+        raise ValueError("window must be >= 1")
+
+    log_close = np.log(df["Close"].to_numpy(dtype=float))
+    n, h = len(log_close), np.asarray(horizons)
+    # Row t, column j: log_close[t + h_j] - log_close[t], NaN past the end.
+    ahead = np.arange(n)[:, None] + h[None, :]
+    future = np.where(ahead < n, log_close[np.minimum(ahead, n - 1)], np.nan)
+    fwd = np.expm1(future - log_close[:, None])
+    realized = ~np.isnan(fwd)
+
+    labels, valid = [], []
+    with np.errstate(invalid="ignore"):
+        for method in methods:
+            ok = realized
+            if method == "next_day_direction":
+                above = fwd > 0
+            elif method == "return_threshold":
+                above = fwd > threshold
+            elif method == "return_quantile":
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", RuntimeWarning)  # horizon longer than the data
+                    above = fwd > np.nanquantile(fwd, quantile, axis=0)
+            else:  # rolling_quantile
+                rolling = pd.DataFrame(fwd).rolling(window).quantile(quantile).to_numpy()
+                # Row t may use horizon-h returns realized by t: fwd[t - h - window + 1 : t - h + 1].
+                behind = np.arange(n)[:, None] - h[None, :]
+                cols = np.broadcast_to(np.arange(len(h)), behind.shape)
+                q = np.where(behind >= 0, rolling[np.maximum(behind, 0), cols], np.nan)
+                above = fwd > q
+                ok = realized & ~np.isnan(q)
+            labels.append(above & ok)
+            valid.append(ok)
+
+    return LabelMatrix(
+        index=df.index,
+        keys=tuple((method, int(hz)) for method in methods for hz in horizons),
+        labels=np.concatenate(labels, axis=1).astype(np.int8),
+        valid=np.concatenate(valid, axis=1),
+    )
+
+
+
 def make_ml_table(
     df: pd.DataFrame,
     *,
     label_method: LabelMethod = "next_day_direction",
     label_threshold: float = 0.0,
     label_quantile: float = 0.6,
+    label_window: int = 252,
 ) -> pd.DataFrame:
     """Return one table with features + label, dropping incomplete rows."""
 
@@ -135,6 +269,7 @@ def make_ml_table(
         method=label_method,
         threshold=label_threshold,
         quantile=label_quantile,
+        window=label_window,
     )
     table = features.join(label)
     return table.dropna().copy()
@@ -184,3 +319,102 @@ def iter_walk_forward_windows(
         )
 
         cursor = cursor + pd.DateOffset(months=test_months)
+
+
+
+def iter_ml_table_chunks(
+    chunks: Iterable[pd.DataFrame],
+    *,
+    label_method: LabelMethod = "next_day_direction",
+    label_threshold: float = 0.0,
+    label_quantile: float = 0.6,
+    label_window: int = 252,
+    dropna: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """Features + label for consecutive OHLCV blocks, one output block per input block.
+
+    Concatenating the output equals ``make_ml_table`` on the whole history
+    (``dropna=False`` keeps incomplete rows), but only the blocks themselves
+    are ever in memory. Carried between blocks:
+
+    - the last `FEATURE_WARMUP_ROWS` bars (rolling windows, previous close),
+    - the EMA12/EMA26 values (the EMA seeds the next block),
+    - the last row, whose label needs the next block's first close,
+    - the last ``label_window`` realized returns (``rolling_quantile``).
+
+    ``return_quantile`` needs the whole series and is rejected here; use
+    ``rolling_quantile`` instead.
+    """
+    if label_method == "return_quantile":
+        raise ValueError("return_quantile needs the full history; use label_method='rolling_quantile'")
+    warmup: pd.DataFrame | None = None
+    ema_state: tuple[float, float] | None = None
+    pending: pd.DataFrame | None = None  # last feature row, label not known yet
+    history = np.empty(0)
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        _require_ohlcv(chunk)
+        close = chunk["Close"].to_numpy(dtype=float)
+        if ema_state is None:
+            ema_fast, ema_slow = ema_array(close, 12), ema_array(close, 26)
+        else:
+            # Seeding with the previous EMA continues the recursion exactly.
+            ema_fast = ema_array(np.concatenate([[ema_state[0]], close]), 12)[1:]
+            ema_slow = ema_array(np.concatenate([[ema_state[1]], close]), 26)[1:]
+        ema_state = (float(ema_fast[-1]), float(ema_slow[-1]))
+
+        work = chunk if warmup is None else pd.concat([warmup, chunk])
+        n_warm = len(work) - len(chunk)
+        ema_diff = np.concatenate([np.full(n_warm, np.nan), ema_fast - ema_slow])
+        features = _feature_frame(work, ema_diff).iloc[n_warm:]
+        warmup = work.iloc[-FEATURE_WARMUP_ROWS:]
+
+        block = features if pending is None else pd.concat([pending, features])
+        pending = block.iloc[-1:]
+        block = block.iloc[:-1]
+        if block.empty:
+            continue
+        # Block rows are work rows [-len(block) - 1, -1); their next closes follow them.
+        closes = work["Close"].to_numpy(dtype=float)[-len(block) - 1 :]
+        next_ret = pd.Series(closes[1:] / closes[:-1] - 1.0, index=block.index)
+        label = _label_next_returns(next_ret, label_method, label_threshold, label_quantile, label_window, history)
+        history = np.concatenate([history, next_ret.to_numpy()])[-label_window:]
+        table = block.join(label)
+        yield table.dropna() if dropna else table
+
+    if pending is not None and not dropna:
+        nan_label = pd.Series(np.nan, index=pending.index, name=f"label_{label_method}")
+        yield pending.join(nan_label)
+
+
+
+def read_ohlcv_csv_chunks(path: str | Path, chunk_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+    """Read an OHLCV CSV (first column = timestamps) in blocks of ``chunk_rows``."""
+    with pd.read_csv(path, index_col=0, parse_dates=[0], chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            chunk.index.name = None
+            yield chunk
+
+
+
+def write_ml_table_csv(chunks: Iterable[pd.DataFrame], out_path: str | Path, **kwargs) -> int:
+    """Stream `iter_ml_table_chunks` output to a CSV file; returns rows written.
+
+    Each block is appended as soon as it is computed, so peak memory is set
+    by the block size, not the history length. ``kwargs`` are passed to
+    `iter_ml_table_chunks`.
+    """
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    header = True
+    with out.open("w", encoding="utf-8", newline="") as fh:
+        for table in iter_ml_table_chunks(chunks, **kwargs):
+            if table.empty:
+                continue
+            table.to_csv(fh, header=header)
+            header = False
+            rows += len(table)
+    return rows
@@ -0,0 +1,245 @@
+"""Notification stage: turn a signal bundle into deduplicated, batched alerts.
+
+Flow (see docs/05 section 3):
+
+1. keep rows whose ``signal`` is listed in ``notify.on_signals``,
+2. drop alerts already sent for the same (symbol, signal, as_of) — the
+   state store remembers the last alert per symbol, so rerunning the same
+   day never re-alerts the same cross,
+3. coalesce the rest into payloads of at most ``batch_size`` alerts and
+   hand each payload to a pluggable sender.
+
+State is recorded per batch only after the sender returns, so a failed
+delivery is retried on the next run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Protocol, Sequence, TextIO
+
+from .config import parse_simple_yaml
+
+DEFAULT_NOTIFY_CONFIG = Path("configs/notify.yaml")
+DEFAULT_NOTIFY_STATE = Path("outputs/notify_state.json")
+
+
+@dataclass(frozen=True)
+class NotifyConfig:
+    """The ``notify:`` section of `configs/notify.yaml`."""
+
+    enabled: bool = True
+    on_signals: tuple[str, ...] = ("BUY",)
+    batch_size: int = 50
+
+    def __post_init__(self) -> None:
+        unknown = sorted(set(self.on_signals) - {"BUY", "SELL", "HOLD"})
+        if unknown:
+            raise ValueError(f"notify.on_signals has unknown signals: {unknown}")
+        if self.batch_size < 1:
+            raise ValueError("notify.batch_size must be >= 1")
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> NotifyConfig:
+        section = data.get("notify", data) or {}
+        on_signals = section.get("on_signals", list(cls.on_signals))
+        if isinstance(on_signals, str):
+            on_signals = [on_signals]
+        return cls(
+            enabled=bool(section.get("enabled", cls.enabled)),
+            on_signals=tuple(str(s).upper() for s in on_signals),
+            batch_size=int(section.get("batch_size", cls.batch_size)),
+        )
+
+
+def load_notify_config(path: str | Path | None = None) -> NotifyConfig:
+    """Load a notify config file; ``None`` returns the built-in defaults."""
+    if path is None:
+        return NotifyConfig()
+    return NotifyConfig.from_mapping(parse_simple_yaml(Path(path).read_text(encoding="utf-8")))
+
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    """One alert candidate built from a bundle row."""
+
+    symbol: str
+    name: str
+    signal: str
+    as_of: str
+    last_close: float
+    pct_change_1d: float
+    reasons: tuple[str, ...] = ()
+
+    @property
+    def message(self) -> str:
+        return f"{self.name} {self.signal} @ {self.last_close:.2f} ({self.pct_change_1d:+.2f}%)"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": self.signal,
+            "symbol": self.symbol,
+            "name": self.name,
+            "as_of": self.as_of,
+            "message": self.message,
+            "last_close": self.last_close,
+            "reasons": list(self.reasons),
+        }
+
+
+class NotificationState:
+    """Small JSON store of the last alert sent per symbol.
+
+    File shape: ``{"last_sent": {symbol: {"signal", "as_of", "sent_at"}}}``.
+    """
+
+    def __init__(self, path: str | Path | None = None, last_sent: dict[str, dict] | None = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.last_sent: dict[str, dict] = dict(last_sent or {})
+
+    @classmethod
+    def load(cls, path: str | Path) -> NotificationState:
+        """Read the store; a missing file is an empty state."""
+        p = Path(path)
+        if not p.exists():
+            return cls(p)
+        data = json.loads(p.read_text(encoding="utf-8"))
+        return cls(p, data.get("last_sent", {}))
+
+    def already_sent(self, alert: Alert) -> bool:
+        last = self.last_sent.get(alert.symbol)
+        return last is not None and last.get("signal") == alert.signal and last.get("as_of") == alert.as_of
+
+    def record(self, alerts: Iterable[Alert], sent_at: str) -> None:
+        for alert in alerts:
+            self.last_sent[alert.symbol] = {"signal": alert.signal, "as_of": alert.as_of, "sent_at": sent_at}
+
+    def save(self) -> None:
+        """Write atomically (temp file + rename) so a crash never leaves half a file."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"last_sent": self.last_sent}, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class Sender(Protocol):
+    """Anything that can deliver one batched payload (push service, webhook, ...)."""
+
+    def send(self, payload: dict[str, Any]) -> None: ...
+
+
+class StreamSender:
+    """Write each payload as one JSON line to a text stream (stdout by default)."""
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream
+
+    def send(self, payload: dict[str, Any]) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        stream.flush()
+
+
+class FileSender:
+    """Append each payload as one JSON line to ``path`` (a local outbox)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def send(self, payload: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+
+@dataclass
+class DispatchResult:
+    sent: list[Alert] = field(default_factory=list)
+    duplicates: list[Alert] = field(default_factory=list)
+    batches: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sent": [asdict(a) for a in self.sent],
+            "duplicates": [asdict(a) for a in self.duplicates],
+            "batches": self.batches,
+        }
+
+
+def _bundle_rows(bundle: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+    """Rows of a bundle, or the single flat row of a one-symbol report."""
+    if "symbols" in bundle:
+        return list(bundle["symbols"])
+    return [bundle] if "symbol" in bundle else []
+
+
+def select_alerts(bundle: Mapping[str, Any], config: NotifyConfig) -> list[Alert]:
+    """Alert candidates for rows whose signal is in ``config.on_signals``.
+
+    ``as_of`` falls back to the bundle's ``generated_at`` date for rows that
+    predate per-row timestamps.
+    """
+    wanted = set(config.on_signals)
+    fallback_as_of = str(bundle.get("as_of") or str(bundle.get("generated_at", ""))[:10])
+    alerts = []
+    for row in _bundle_rows(bundle):
+        if row.get("signal") not in wanted:
+            continue
+        alerts.append(
+            Alert(
+                symbol=str(row["symbol"]),
+                name=str(row.get("name", row["symbol"])),
+                signal=str(row["signal"]),
+                as_of=str(row.get("as_of") or fallback_as_of),
+                last_close=float(row.get("last_close", float("nan"))),
+                pct_change_1d=float(row.get("pct_change_1d", 0.0)),
+                reasons=tuple(row.get("reasons", ())),
+            )
+        )
+    return alerts
+
+
+def build_batches(alerts: Sequence[Alert], batch_size: int, **meta: Any) -> list[dict[str, Any]]:
+    """Coalesce alerts into payloads of at most ``batch_size`` entries."""
+    chunks = [alerts[i : i + batch_size] for i in range(0, len(alerts), batch_size)]
+    return [
+        {**meta, "batch": i + 1, "n_batches": len(chunks), "alerts": [a.to_dict() for a in chunk]}
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def dispatch(
+    bundle: Mapping[str, Any],
+    config: NotifyConfig,
+    state: NotificationState,
+    sender: Sender,
+    *,
+    now: datetime | None = None,
+) -> DispatchResult:
+    """Filter, deduplicate, batch and send the alerts of one bundle; then save state."""
+    result = DispatchResult()
+    if not config.enabled:
+        return result
+
+    for alert in select_alerts(bundle, config):
+        (result.duplicates if state.already_sent(alert) else result.sent).append(alert)
+
+    sent_at = (now or datetime.now(timezone.utc)).isoformat(timespec="seconds")
+    meta = {"generated_at": bundle.get("generated_at"), "engine_version": bundle.get("engine_version")}
+    batches = build_batches(result.sent, config.batch_size, **meta)
+    try:
+        for start, payload in zip(range(0, len(result.sent), config.batch_size), batches):
+            sender.send(payload)
+            state.record(result.sent[start : start + config.batch_size], sent_at)
+            result.batches += 1
+    finally:
+        # Persist whatever was delivered, even if a later batch failed.
+        state.save()
+    return result
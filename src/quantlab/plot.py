@@ -3,103 +3,133 @@ from __future__ import annotations
 import matplotlib.pyplot as plt
 import pandas as pd
 
-from .indicators import atr, ema
+from .indicators import atr_array, ema_array
+from .rules import RuleParams
+
+
+def _with_indicators(df: pd.DataFrame, params: RuleParams | None = None) -> pd.DataFrame:
+    """Small helper so all plot functions share identical indicator definitions.
+
+    Indicator columns use generic names (EMA_FAST, EMA_SLOW, ATR, ATR_THRESH) so
+    plots work for any `RuleParams`; labels are derived from the parameters.
+    """
+    p = params or RuleParams()
+    close = df["Close"].to_numpy(dtype=float)
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    # Only Close plus indicator columns are plotted, so build a narrow frame
+    # instead of copying every input column.
+    work = pd.DataFrame(
+        {
+            "Close": close,
+            "EMA_FAST": ema_array(close, p.ema_fast),
+            "EMA_SLOW": ema_array(close, p.ema_slow),
+            "ATR": atr_array(high, low, close, p.atr_period),
+        },
+        index=df.index,
+    )
+    # Same regime threshold as `CompiledRule.evaluate`: a rolling ATR quantile (median by default).
+    rolling = work["ATR"].rolling(p.atr_threshold_window)
+    q = p.atr_threshold_quantile
+    work["ATR_THRESH"] = rolling.median() if q == 0.5 else rolling.quantile(q)
+    work["ACTIVE"] = work["ATR"] > work["ATR_THRESH"]
+    return work
 
 
-def _with_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    """Small helper so all plot functions share identical indicator definitions."""
-    work = df.copy()
-    work["EMA12"] = ema(work["Close"], 12)
-    work["EMA26"] = ema(work["Close"], 26)
-    work["ATR14"] = atr(work, 14)
-    work["ATR14_MED60"] = work["ATR14"].rolling(60).median()
-    work["ACTIVE"] = work["ATR14"] > work["ATR14_MED60"]
-    return work
+def _cross_masks(work: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    """Rows where the fast EMA crosses above / below the slow EMA."""
+    diff = work["EMA_FAST"] - work["EMA_SLOW"]
+    prev = diff.shift(1)
+    return (prev <= 0) & (diff > 0), (prev >= 0) & (diff < 0)
 
 
-def plot_price_ema(df: pd.DataFrame):
-    """Plot Close with EMA12 and EMA26 for trend inspection."""
-    work = _with_indicators(df)
+# The _draw_* helpers only touch the given Axes, so they work both with
+# pyplot figures (notebooks) and with headless Agg figures (`quantlab.render`).
+# ``work`` may be a downsampled view of `_with_indicators` output.
 
-    fig, ax = plt.subplots(figsize=(11, 5))
+
+def _draw_price_ema(ax, work: pd.DataFrame, p: RuleParams) -> None:
     ax.plot(work.index, work["Close"], label="Close", linewidth=1.4)
-    ax.plot(work.index, work["EMA12"], label="EMA12", linewidth=1.2)
-    ax.plot(work.index, work["EMA26"], label="EMA26", linewidth=1.2)
-    ax.set_title("Price with EMA12 / EMA26")
+    ax.plot(work.index, work["EMA_FAST"], label=f"EMA{p.ema_fast}", linewidth=1.2)
+    ax.plot(work.index, work["EMA_SLOW"], label=f"EMA{p.ema_slow}", linewidth=1.2)
+    ax.set_title(f"Price with EMA{p.ema_fast} / EMA{p.ema_slow}")
     ax.set_xlabel("Date")
     ax.set_ylabel("Price")
     ax.legend()
     ax.grid(alpha=0.25)
-    fig.tight_layout()
-    return fig, ax
 
 
-def plot_atr_regime(df: pd.DataFrame):
-    """Plot ATR14 and median60, and shade active volatility regions."""
-    work = _with_indicators(df)
-
-    fig, ax = plt.subplots(figsize=(11, 4))
-    ax.plot(work.index, work["ATR14"], label="ATR14", color="tab:orange")
-    ax.plot(work.index, work["ATR14_MED60"], label="Median60", color="tab:blue", linestyle="--")
+def _draw_atr_regime(ax, work: pd.DataFrame, p: RuleParams) -> None:
+    atr_label = f"ATR{p.atr_period}"
+    q = p.atr_threshold_quantile
+    thresh_label = f"Median{p.atr_threshold_window}" if q == 0.5 else f"Q{q:g}@{p.atr_threshold_window}"
+    ax.plot(work.index, work["ATR"], label=atr_label, color="tab:orange")
+    ax.plot(work.index, work["ATR_THRESH"], label=thresh_label, color="tab:blue", linestyle="--")
 
-    # Fill regions where ATR is above its rolling median.
+    # Fill regions where ATR is above its rolling threshold.
     ax.fill_between(
         work.index,
-        work["ATR14"],
-        work["ATR14_MED60"],
+        work["ATR"],
+        work["ATR_THRESH"],
         where=work["ACTIVE"].fillna(False),
         color="tomato",
         alpha=0.25,
         label="Active",
     )
 
-    ax.set_title("ATR Regime (Active when ATR14 > Median60)")
+    ax.set_title(f"ATR Regime (Active when {atr_label} > {thresh_label})")
     ax.set_xlabel("Date")
     ax.set_ylabel("ATR")
     ax.legend()
     ax.grid(alpha=0.25)
-    fig.tight_layout()
-    return fig, ax
-
-
-def plot_cross_points(df: pd.DataFrame):
-    """Mark BUY/SELL EMA cross points on top of Close price."""
-    work = _with_indicators(df)
-    work["EMA_DIFF"] = work["EMA12"] - work["EMA26"]
 
-    prev = work["EMA_DIFF"].shift(1)
-    crossed_up = (prev <= 0) & (work["EMA_DIFF"] > 0)
-    crossed_down = (prev >= 0) & (work["EMA_DIFF"] < 0)
 
-    fig, ax = plt.subplots(figsize=(11, 5))
-    ax.plot(work.index, work["Close"], label="Close", linewidth=1.2, color="black")
+def _draw_cross_points(ax, close: pd.Series, buys: pd.Series, sells: pd.Series) -> None:
+    """Close line plus BUY/SELL markers (markers are passed separately so a
+    downsampled line never drops a cross)."""
+    ax.plot(close.index, close, label="Close", linewidth=1.2, color="black")
 
     # BUY markers: upward triangle.
-    ax.scatter(
-        work.index[crossed_up.fillna(False)],
-        work.loc[crossed_up.fillna(False), "Close"],
-        marker="^",
-        color="green",
-        s=70,
-        label="BUY cross",
-        zorder=3,
-    )
+    ax.scatter(buys.index, buys, marker="^", color="green", s=70, label="BUY cross", zorder=3)
 
     # SELL markers: downward triangle.
-    ax.scatter(
-        work.index[crossed_down.fillna(False)],
-        work.loc[crossed_down.fillna(False), "Close"],
-        marker="v",
-        color="red",
-        s=70,
-        label="SELL cross",
-        zorder=3,
-    )
+    ax.scatter(sells.index, sells, marker="v", color="red", s=70, label="SELL cross", zorder=3)
 
     ax.set_title("EMA Cross Points")
     ax.set_xlabel("Date")
     ax.set_ylabel("Price")
     ax.legend()
     ax.grid(alpha=0.25)
+
+
+def plot_price_ema(df: pd.DataFrame, params: RuleParams | None = None):
+    """Plot Close with the fast/slow EMAs (EMA12/EMA26 by default) for trend inspection."""
+    p = params or RuleParams()
+    work = _with_indicators(df, p)
+
+    fig, ax = plt.subplots(figsize=(11, 5))
+    _draw_price_ema(ax, work, p)
+    fig.tight_layout()
+    return fig, ax
+
+
+def plot_atr_regime(df: pd.DataFrame, params: RuleParams | None = None):
+    """Plot ATR and its rolling regime threshold (ATR14 / median60 by default), shading active regions."""
+    p = params or RuleParams()
+    work = _with_indicators(df, p)
+
+    fig, ax = plt.subplots(figsize=(11, 4))
+    _draw_atr_regime(ax, work, p)
+    fig.tight_layout()
+    return fig, ax
+
+
+def plot_cross_points(df: pd.DataFrame, params: RuleParams | None = None):
+    """Mark BUY/SELL EMA cross points on top of Close price."""
+    work = _with_indicators(df, params)
+    crossed_up, crossed_down = _cross_masks(work)
+
+    fig, ax = plt.subplots(figsize=(11, 5))
+    _draw_cross_points(ax, work["Close"], work.loc[crossed_up, "Close"], work.loc[crossed_down, "Close"])
     fig.tight_layout()
     return fig, ax
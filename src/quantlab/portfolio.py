@@ -0,0 +1,186 @@
+"""Vectorized portfolio backtest over a multi-symbol universe.
+
+Inputs are 2D (time x symbol) target weights and prices. Exposure caps are
+applied to all rows at once; the rebalancing pass walks time once with every
+symbol handled as one NumPy vector, so 500 names x 10 years is a few
+thousand small array operations rather than 500 per-symbol backtests.
+
+Timing follows `quantlab.backtest.compute_strategy_returns`: the weight held
+at t earns the close(t) -> close(t+1) return.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .backtest import summarize_performance
+
+
+@dataclass(frozen=True)
+class PortfolioResult:
+    """Per-bar outputs of `run_portfolio_backtest` (all indexed like the prices)."""
+
+    weights: pd.DataFrame
+    contributions: pd.DataFrame
+    returns: pd.Series
+    equity: pd.Series
+    turnover: pd.Series
+    costs: pd.Series
+
+    def contribution_by_asset(self) -> pd.Series:
+        """Sum of each symbol's return contribution (before costs)."""
+        return self.contributions.sum().rename("contribution")
+
+    def summary(self, *, periods_per_year: float = 252.0) -> pd.Series:
+        """`summarize_performance` of the net returns plus turnover/cost totals."""
+        stats = summarize_performance(self.returns, periods_per_year=periods_per_year)
+        stats["avg_turnover"] = float(self.turnover.mean())
+        stats["total_turnover"] = float(self.turnover.sum())
+        stats["total_cost"] = float(self.costs.sum())
+        stats["avg_gross_exposure"] = float(self.weights.abs().sum(axis=1).mean())
+        return stats
+
+
+def align_prices(frames: Mapping[str, pd.DataFrame], column: str = "Close") -> pd.DataFrame:
+    """Outer-join one column of every symbol's frame into a time x symbol table."""
+    return pd.DataFrame({symbol: df[column] for symbol, df in frames.items()}).sort_index()
+
+
+def positions_from_signals(signals: pd.DataFrame) -> pd.DataFrame:
+    """Multi-symbol version of `generate_positions_from_signals`.
+
+    BUY -> 1.0, SELL -> -1.0, HOLD (or missing) keeps the previous position;
+    symbols are flat until their first explicit signal.
+    """
+    mapping = {"BUY": 1.0, "SELL": -1.0}
+    numeric = signals.apply(lambda col: col.map(mapping)).astype(float)
+    return numeric.ffill().fillna(0.0)
+
+
+def vol_target_weights(
+    positions: pd.DataFrame | np.ndarray,
+    volatility: pd.DataFrame | np.ndarray,
+    *,
+    target_vol: float = 0.01,
+    max_weight: float = 1.0,
+) -> np.ndarray:
+    """Scale directional positions by ``target_vol / volatility`` (see docs/04).
+
+    ``volatility`` is a per-bar fractional volatility estimate such as
+    ATR/Close. Missing or non-positive estimates give a zero weight.
+    """
+    pos = np.asarray(positions, dtype=float)
+    vol = np.asarray(volatility, dtype=float)
+    if pos.shape != vol.shape:
+        raise ValueError("positions and volatility must share one shape")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(vol > 0, target_vol / vol, 0.0)
+    scale = np.nan_to_num(np.minimum(scale, max_weight), nan=0.0)
+    return pos * scale
+
+
+def apply_exposure_caps(
+    weights: np.ndarray,
+    *,
+    gross_cap: float | None = None,
+    net_cap: float | None = None,
+) -> np.ndarray:
+    """Scale each row down so sum(|w|) <= gross_cap and |sum(w)| <= net_cap.
+
+    Rows are scaled uniformly (relative weights are preserved); rows already
+    within both caps are unchanged.
+    """
+    w = np.asarray(weights, dtype=float)
+    scale = np.ones(w.shape[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if gross_cap is not None:
+            gross = np.abs(w).sum(axis=1)
+            scale = np.minimum(scale, np.where(gross > gross_cap, gross_cap / gross, 1.0))
+        if net_cap is not None:
+            net = np.abs(w.sum(axis=1))
+            scale = np.minimum(scale, np.where(net > net_cap, net_cap / net, 1.0))
+    return w * scale[:, None]
+
+
+def _next_returns(prices: np.ndarray) -> np.ndarray:
+    """close(t) -> close(t+1) returns; missing prices and the last bar give 0."""
+    out = np.zeros_like(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:-1] = prices[1:] / prices[:-1] - 1.0
+    out[~np.isfinite(out)] = 0.0
+    return out
+
+
+def run_portfolio_backtest(
+    prices: pd.DataFrame,
+    target_weights: pd.DataFrame | np.ndarray,
+    *,
+    gross_cap: float | None = 1.0,
+    net_cap: float | None = None,
+    rebalance_threshold: float = 0.0,
+    cost_bps: float = 0.0,
+) -> PortfolioResult:
+    """Backtest target weights with exposure caps, drift and threshold rebalancing.
+
+    Between bars held weights drift with their assets' returns. At each bar a
+    symbol is traded back to its (capped) target only when its drifted weight
+    is more than ``rebalance_threshold`` away; otherwise the drifted weight is
+    kept. Costs are ``cost_bps`` per unit of turnover, charged on the bar of
+    the trade. Symbols without a price on a bar get a zero target.
+    """
+    if rebalance_threshold < 0:
+        raise ValueError("rebalance_threshold must be >= 0")
+    if isinstance(target_weights, pd.DataFrame):
+        target_weights = target_weights.reindex(index=prices.index, columns=prices.columns)
+    px = prices.to_numpy(dtype=float)
+    targets = np.nan_to_num(np.asarray(target_weights, dtype=float), nan=0.0)
+    if targets.shape != px.shape:
+        raise ValueError(f"target_weights shape {targets.shape} does not match prices {px.shape}")
+
+    targets = np.where(np.isnan(px), 0.0, targets)
+    targets = apply_exposure_caps(targets, gross_cap=gross_cap, net_cap=net_cap)
+    asset_ret = _next_returns(px)
+    n_bars, n_assets = px.shape
+
+    if rebalance_threshold == 0.0:
+        # Always trade to target: drift only affects turnover, so no time loop is needed.
+        held = targets
+        gross_ret = np.einsum("ij,ij->i", held, asset_ret)
+        drifted = np.zeros_like(held)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drifted[1:] = held[:-1] * (1.0 + asset_ret[:-1]) / (1.0 + gross_ret[:-1, None])
+        drifted = np.nan_to_num(drifted, nan=0.0, posinf=0.0, neginf=0.0)
+    else:
+        held = np.empty_like(targets)
+        drifted = np.empty_like(targets)
+        gross_ret = np.empty(n_bars)
+        current = np.zeros(n_assets)
+        for t in range(n_bars):
+            drifted[t] = current
+            trade = np.abs(targets[t] - current) > rebalance_threshold
+            current = np.where(trade, targets[t], current)
+            held[t] = current
+            gross_ret[t] = current @ asset_ret[t]
+            growth = 1.0 + gross_ret[t]
+            current = current * (1.0 + asset_ret[t]) / growth if growth != 0 else np.zeros(n_assets)
+
+    turnover = np.abs(held - drifted).sum(axis=1)
+    costs = turnover * (cost_bps / 10_000.0)
+    net_ret = gross_ret - costs
+    # The last bar has no next-bar return; keep it in the index but as NaN like the single-asset helper.
+    net_ret[-1:] = np.nan
+
+    index, columns = prices.index, prices.columns
+    returns = pd.Series(net_ret, index=index, name="portfolio_return")
+    return PortfolioResult(
+        weights=pd.DataFrame(held, index=index, columns=columns),
+        contributions=pd.DataFrame(held * asset_ret, index=index, columns=columns),
+        returns=returns,
+        equity=(1.0 + returns.fillna(0.0)).cumprod().rename("equity"),
+        turnover=pd.Series(turnover, index=index, name="turnover"),
+        costs=pd.Series(costs, index=index, name="cost"),
+    )
@@ -0,0 +1,207 @@
+"""Opt-in stage timers and counters for the signal pipeline.
+
+Library code marks its hot stages with ``stage("fetch.download")`` and
+``count("fetch.rows", n)``. Until a :class:`StageProfiler` is activated these
+calls hit a shared no-op object, so the disabled cost is one global lookup
+and an empty context manager per stage.
+
+Stage names are dotted (``rules.indicators``); nested stages are recorded
+inclusively, so ``cli.symbol`` contains ``fetch`` which contains
+``fetch.download``.
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, ContextManager, Iterator
+
+GLOBAL_SCOPE = "_global"
+
+
+@dataclass(slots=True)
+class StageStats:
+    """Accumulated timing for one stage within one scope (symbol)."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class _StageTimer:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: StageProfiler, name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = perf_counter()
+
+    def __exit__(self, *exc: object) -> bool:
+        self._profiler._record(self._name, perf_counter() - self._start)
+        return False
+
+
+class StageProfiler:
+    """Collects per-scope stage timings, counters and (optionally) peak memory."""
+
+    def __init__(self, *, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self._scope = GLOBAL_SCOPE
+        self._stages: dict[str, dict[str, StageStats]] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._peak_memory: dict[str, int] = {}
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return _StageTimer(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        counters = self._counters.setdefault(self._scope, {})
+        counters[name] = counters.get(name, 0) + int(n)
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        """Attribute everything recorded inside the block to ``name``."""
+        outer = self._scope
+        self._scope = name
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                self._peak_memory[name] = max(self._peak_memory.get(name, 0), peak - baseline)
+            self._scope = outer
+
+    def _record(self, name: str, seconds: float) -> None:
+        stats = self._stages.setdefault(self._scope, {}).get(name)
+        if stats is None:
+            stats = self._stages[self._scope][name] = StageStats()
+        stats.calls += 1
+        stats.seconds += seconds
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+
+    def stage_names(self) -> list[str]:
+        names: set[str] = set()
+        for stages in self._stages.values():
+            names.update(stages)
+        return sorted(names)
+
+    def rows(self) -> list[dict[str, Any]]:
+        """One row per scope with seconds per stage, counters and peak memory."""
+        scopes = list(dict.fromkeys([*self._stages, *self._counters, *self._peak_memory]))
+        rows = []
+        for scope in scopes:
+            stages = self._stages.get(scope, {})
+            rows.append(
+                {
+                    "scope": scope,
+                    "stages": {name: stats.seconds for name, stats in stages.items()},
+                    "counters": dict(self._counters.get(scope, {})),
+                    "peak_memory_bytes": self._peak_memory.get(scope),
+                }
+            )
+        return rows
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Aggregate each stage across scopes (total, mean per call, worst call)."""
+        merged: dict[str, StageStats] = {}
+        for stages in self._stages.values():
+            for name, stats in stages.items():
+                agg = merged.setdefault(name, StageStats())
+                agg.calls += stats.calls
+                agg.seconds += stats.seconds
+                agg.max_seconds = max(agg.max_seconds, stats.max_seconds)
+        return {
+            name: {
+                "calls": stats.calls,
+                "total_seconds": stats.seconds,
+                "mean_seconds": stats.seconds / stats.calls if stats.calls else 0.0,
+                "max_seconds": stats.max_seconds,
+            }
+            for name, stats in sorted(merged.items())
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"scopes": self.rows(), "summary": self.summary()}
+
+    def format_table(self) -> str:
+        """Plain-text table: one row per scope, one column per stage (milliseconds)."""
+        names = self.stage_names()
+        scope_width = max([len("scope"), *(len(row["scope"]) for row in self.rows())])
+        widths = [max(len(n), 10) for n in names]
+        header = "  ".join([f"{'scope':<{scope_width}}", *(f"{n:>{w}}" for n, w in zip(names, widths))])
+        lines = [header, "-" * len(header)]
+        for row in self.rows():
+            cells = [
+                f"{row['stages'][n] * 1e3:>{w}.2f}" if n in row["stages"] else f"{'-':>{w}}"
+                for n, w in zip(names, widths)
+            ]
+            lines.append("  ".join([f"{row['scope']:<{scope_width}}", *cells]))
+        summary = self.summary()
+        total_cells = [f"{summary[n]['total_seconds'] * 1e3:>{w}.2f}" for n, w in zip(names, widths)]
+        lines.append("-" * len(header))
+        lines.append("  ".join([f"{'TOTAL':<{scope_width}}", *total_cells]))
+        return "\n".join(lines)
+
+
+class _NullProfiler:
+    """Stand-in used while profiling is disabled; every method is a no-op."""
+
+    trace_memory = False
+    _NULL_CONTEXT = nullcontext()
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return self._NULL_CONTEXT
+
+    def count(self, name: str, n: int = 1) -> None:
+        return None
+
+    def scope(self, name: str) -> ContextManager[None]:
+        return self._NULL_CONTEXT
+
+
+_NULL_PROFILER = _NullProfiler()
+_active: StageProfiler | _NullProfiler = _NULL_PROFILER
+
+
+def get_profiler() -> StageProfiler | None:
+    """Return the active profiler, or None when profiling is disabled."""
+    return _active if isinstance(_active, StageProfiler) else None
+
+
+@contextmanager
+def activate(profiler: StageProfiler) -> Iterator[StageProfiler]:
+    """Route ``stage``/``count``/``scope`` calls to ``profiler`` inside the block."""
+    global _active
+    previous = _active
+    started_tracing = profiler.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def stage(name: str) -> ContextManager[None]:
+    return _active.stage(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    _active.count(name, n)
+
+
+def scope(name: str) -> ContextManager[None]:
+    return _active.scope(name)
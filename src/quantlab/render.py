@@ -0,0 +1,187 @@
+"""Headless batch rendering of the standard charts to PNG/SVG files.
+
+`render_symbol_charts` computes indicators once per symbol and draws every
+chart from that single frame on matplotlib ``Figure`` objects with the Agg
+canvas, so no GUI backend or pyplot figure registry is involved.
+`render_universe` fans symbols out over a process pool.
+
+Long series are downsampled before drawing: a 2000-pixel-wide PNG cannot
+show more than a few thousand points anyway. ``"minmax"`` keeps the
+extremes of every bucket (spikes stay visible); ``"lttb"``
+(Largest-Triangle-Three-Buckets) keeps the visual shape with fewer points.
+Cross markers are never downsampled.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Literal, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .plot import _cross_masks, _draw_atr_regime, _draw_cross_points, _draw_price_ema, _with_indicators
+from .rules import RuleParams
+
+CHARTS = ("price_ema", "atr_regime", "cross_points")
+_FIGSIZE = {"price_ema": (11, 5), "atr_regime": (11, 4), "cross_points": (11, 5)}
+
+Downsample = Literal["minmax", "lttb"]
+
+
+def minmax_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """Sorted row indices keeping the min and max of ``n_out // 2`` equal buckets.
+
+    The first and last rows are always kept. Returns every index when the
+    series already has at most ``n_out`` points.
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 4:
+        raise ValueError("n_out must be >= 4")
+    n_buckets = (n_out - 2) // 2
+    size = n // n_buckets
+    body = n_buckets * size
+
+    # NaNs never win a bucket (an all-NaN bucket just yields its first row).
+    lo_src = np.where(np.isnan(y[:body]), np.inf, y[:body]).reshape(n_buckets, size)
+    hi_src = np.where(np.isnan(y[:body]), -np.inf, y[:body]).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    picks = [offsets + lo_src.argmin(axis=1), offsets + hi_src.argmax(axis=1), [0, n - 1]]
+    if body < n:
+        tail = y[body:]
+        if not np.isnan(tail).all():
+            picks.append([body + np.nanargmin(tail), body + np.nanargmax(tail)])
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Row indices chosen by Largest-Triangle-Three-Buckets.
+
+    Each bucket keeps the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket. The loop runs over
+    buckets (``n_out``), not points; each step is a vectorized area calculation.
+    """
+    xs = np.asarray(x, dtype=float)
+    ys = np.asarray(y, dtype=float)
+    n = len(ys)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("n_out must be >= 3")
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = xs[nxt_lo:nxt_hi].mean()
+        avg_y = np.nanmean(ys[nxt_lo:nxt_hi]) if not np.isnan(ys[nxt_lo:nxt_hi]).all() else ys[prev]
+        area = np.abs(
+            (xs[prev] - avg_x) * (ys[lo:hi] - ys[prev]) - (xs[prev] - xs[lo:hi]) * (avg_y - ys[prev])
+        )
+        area = np.where(np.isnan(area), -np.inf, area)
+        prev = lo + int(area.argmax())
+        out[b + 1] = prev
+    return out
+
+
+def _downsample(work: pd.DataFrame, column: str, max_points: int | None, method: Downsample | None) -> pd.DataFrame:
+    if method is None or max_points is None or len(work) <= max_points:
+        return work
+    if method == "minmax":
+        idx = minmax_indices(work[column].to_numpy(), max_points)
+    elif method == "lttb":
+        index = work.index
+        x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(work))
+        idx = lttb_indices(x, work[column].to_numpy(), max_points)
+    else:
+        raise ValueError(f"Unknown downsample method: {method!r}")
+    return work.iloc[idx]
+
+
+def _safe_name(symbol: str) -> str:
+    return re.sub(r"[^\w.^=-]", "_", symbol)
+
+
+def render_symbol_charts(
+    df: pd.DataFrame,
+    out_dir: str | Path,
+    *,
+    symbol: str,
+    params: RuleParams | None = None,
+    charts: Sequence[str] = CHARTS,
+    formats: Sequence[str] = ("png",),
+    max_points: int | None = 2000,
+    downsample: Downsample | None = "minmax",
+    dpi: int = 100,
+) -> list[Path]:
+    """Render ``charts`` for one symbol into ``out_dir/<symbol>_<chart>.<fmt>``.
+
+    Indicators are computed once and shared by every chart. Returns the
+    written paths in chart/format order.
+    """
+    unknown = sorted(set(charts) - set(CHARTS))
+    if unknown:
+        raise ValueError(f"Unknown charts {unknown}; choose from {list(CHARTS)}")
+    p = params or RuleParams()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    work = _with_indicators(df, p)
+    price_view = _downsample(work, "Close", max_points, downsample)
+    written: list[Path] = []
+    for chart in charts:
+        fig = Figure(figsize=_FIGSIZE[chart])
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        if chart == "price_ema":
+            _draw_price_ema(ax, price_view, p)
+        elif chart == "atr_regime":
+            _draw_atr_regime(ax, _downsample(work, "ATR", max_points, downsample), p)
+        else:
+            crossed_up, crossed_down = _cross_masks(work)
+            _draw_cross_points(
+                ax, price_view["Close"], work.loc[crossed_up, "Close"], work.loc[crossed_down, "Close"]
+            )
+        fig.tight_layout()
+        for fmt in formats:
+            path = out / f"{_safe_name(symbol)}_{chart}.{fmt}"
+            fig.savefig(path, format=fmt, dpi=dpi)
+            written.append(path)
+    return written
+
+
+def _render_job(job: tuple) -> list[Path]:
+    """Process-pool worker (module-level so it can be pickled)."""
+    symbol, df, out_dir, kwargs = job
+    return render_symbol_charts(df, out_dir, symbol=symbol, **kwargs)
+
+
+def render_universe(
+    frames: Mapping[str, pd.DataFrame],
+    out_dir: str | Path,
+    *,
+    n_jobs: int = 1,
+    **kwargs,
+) -> dict[str, list[Path]]:
+    """Render every symbol's charts; ``n_jobs > 1`` uses a process pool.
+
+    ``kwargs`` are passed to `render_symbol_charts` (params, charts, formats,
+    max_points, downsample, dpi).
+    """
+    jobs = [(symbol, df, out_dir, kwargs) for symbol, df in frames.items()]
+    if n_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_render_job, jobs))
+    else:
+        results = [_render_job(job) for job in jobs]
+    return dict(zip(frames, results))
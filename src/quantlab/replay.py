@@ -0,0 +1,275 @@
+"""Bar-by-bar replay: check the live signal path against the historical rule.
+
+`make_signal` looks at the latest bar of a frame; the notebooks backtest the
+same rule over the whole history with vectorized masks
+(`rules.rule_components`). Running `make_signal` on every prefix to compare
+them is O(n²). Here:
+
+- `StreamingRule` is the live path as a small state machine: EMA
+  recursions, an ``atr_period``-bar true-range window and a sorted
+  ``atr_threshold_window``-bar ATR window. Each bar costs O(window), never
+  O(history), and yields exactly what `make_signal` would say for the
+  prefix ending at that bar.
+- `replay` feeds a frame through it one bar at a time, compares every bar
+  with the vectorized full-history result, spot-checks a few prefixes
+  against `make_signal` itself, and reports mismatches and bars/sec.
+
+Indicator values are compared with a tolerance (the batch EMA is a blocked
+scan, so the last bits can differ); signals and regime flags must match
+exactly.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .rules import CompiledRule, RuleParams, compile_rule, rule_components
+
+_CODES = {"BUY": 1, "SELL": -1, "HOLD": 0}
+_FLOAT_FIELDS = ("atr", "atr_thresh", "ema_diff")
+
+
+def _sorted_quantile(values: list[float], q: float) -> float:
+    """``np.quantile(values, q)`` (linear method) of an already sorted list."""
+    n = len(values)
+    if n == 0:
+        return math.nan
+    if q == 0.5:  # np.median
+        mid = n // 2
+        return values[mid] if n % 2 else (values[mid - 1] + values[mid]) / 2.0
+    virtual = (n - 1) * q
+    if virtual >= n - 1:
+        return values[-1]
+    lo = int(virtual)
+    gamma = virtual - lo
+    a, b = values[lo], values[lo + 1]
+    diff = b - a
+    return b - diff * (1.0 - gamma) if gamma >= 0.5 else a + diff * gamma
+
+
+class StreamingRule:
+    """`CompiledRule.evaluate` as a state machine costing O(``atr_threshold_window``) per bar.
+
+    Call `update` with each new bar; it returns the signal `make_signal`
+    would give for all bars seen so far (``None`` until ``min_rows`` bars).
+    The latest ``atr``, ``atr_thresh``, ``ema_diff`` and ``active`` values
+    are kept as attributes.
+    """
+
+    __slots__ = (
+        "rule",
+        "n_bars",
+        "signal",
+        "active",
+        "atr",
+        "atr_thresh",
+        "ema_diff",
+        "_alpha_fast",
+        "_alpha_slow",
+        "_ema_fast",
+        "_ema_slow",
+        "_prev_close",
+        "_tr",
+        "_atr_fifo",
+        "_atr_sorted",
+    )
+
+    def __init__(self, rule: CompiledRule | RuleParams | None = None) -> None:
+        if not isinstance(rule, CompiledRule):
+            rule = compile_rule(rule)
+        p = rule.params
+        self.rule = rule
+        self._alpha_fast = 2.0 / (p.ema_fast + 1.0)
+        self._alpha_slow = 2.0 / (p.ema_slow + 1.0)
+        self._tr: deque[float] = deque(maxlen=p.atr_period)
+        self._atr_fifo: deque[float] = deque()
+        self._atr_sorted: list[float] = []  # non-NaN values of _atr_fifo, sorted
+        self.n_bars = 0
+        self.signal: str | None = None
+        self.active = False
+        self.atr = self.atr_thresh = self.ema_diff = math.nan
+        self._ema_fast = self._ema_slow = self._prev_close = math.nan
+
+    def update(self, high: float, low: float, close: float) -> str | None:
+        """Consume one bar and return the signal for the history so far."""
+        p = self.rule.params
+        prev_close = self._prev_close
+        tr = high - low
+        if prev_close == prev_close:  # not NaN: skip the gap terms on the first bar
+            tr = max(tr, abs(high - prev_close), abs(low - prev_close))
+        self._prev_close = close
+        trs = self._tr
+        trs.append(tr)
+        atr = sum(trs) / p.atr_period if len(trs) == p.atr_period else math.nan
+
+        fifo, ordered = self._atr_fifo, self._atr_sorted
+        if len(fifo) == p.atr_threshold_window:
+            old = fifo.popleft()
+            if old == old:
+                del ordered[bisect_left(ordered, old)]
+        fifo.append(atr)
+        if atr == atr:
+            insort(ordered, atr)
+        thresh = _sorted_quantile(ordered, p.atr_threshold_quantile)
+
+        if self.n_bars:
+            a, b = self._alpha_fast, self._alpha_slow
+            self._ema_fast = (1.0 - a) * self._ema_fast + a * close
+            self._ema_slow = (1.0 - b) * self._ema_slow + b * close
+        else:
+            self._ema_fast = self._ema_slow = close
+        diff_prev, diff = self.ema_diff, self._ema_fast - self._ema_slow
+
+        self.n_bars += 1
+        self.atr, self.atr_thresh, self.ema_diff = atr, thresh, diff
+        self.active = active = atr > thresh
+        if self.n_bars < p.min_rows:
+            self.signal = None
+        elif active and diff_prev <= 0.0 and diff > 0.0:
+            self.signal = "BUY"
+        elif active and diff_prev >= 0.0 and diff < 0.0:
+            self.signal = "SELL"
+        else:
+            self.signal = "HOLD"
+        return self.signal
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    """Outcome of `replay`.
+
+    ``mismatches`` has one row per differing (bar, field) with columns
+    ``source`` (``"batch"`` or ``"make_signal"``), ``field``,
+    ``streaming`` and ``reference``.
+    """
+
+    n_bars: int
+    n_compared: int
+    n_spot_checks: int
+    streaming_seconds: float
+    batch_seconds: float
+    mismatches: pd.DataFrame
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatches.empty
+
+    @property
+    def bars_per_second(self) -> float:
+        """Throughput of the live (streaming) path."""
+        return self.n_bars / self.streaming_seconds if self.streaming_seconds > 0 else math.inf
+
+    @property
+    def batch_bars_per_second(self) -> float:
+        return self.n_bars / self.batch_seconds if self.batch_seconds > 0 else math.inf
+
+    def to_dict(self, max_mismatches: int = 20) -> dict[str, Any]:
+        """JSON-ready summary with the first ``max_mismatches`` mismatches."""
+        head = self.mismatches.head(max_mismatches).reset_index(names="as_of")
+        head["as_of"] = head["as_of"].astype(str)
+        return {
+            "ok": self.ok,
+            "n_bars": self.n_bars,
+            "n_compared": self.n_compared,
+            "n_spot_checks": self.n_spot_checks,
+            "n_mismatches": len(self.mismatches),
+            "bars_per_second": self.bars_per_second,
+            "batch_bars_per_second": self.batch_bars_per_second,
+            "mismatches": head.to_dict(orient="records"),
+        }
+
+
+def _float_mismatch(a: np.ndarray, b: np.ndarray, rtol: float, atol: float) -> np.ndarray:
+    return ~np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+
+
+def replay(
+    df: pd.DataFrame,
+    rule: CompiledRule | RuleParams | None = None,
+    *,
+    spot_checks: int = 3,
+    rtol: float = 1e-9,
+    atol: float = 1e-12,
+) -> ReplayResult:
+    """Replay ``df`` bar by bar through `StreamingRule` and verify every bar.
+
+    Bars from ``min_rows`` onwards (where `make_signal` is defined) are
+    compared with `rules.rule_components` on the full history. In addition,
+    ``spot_checks`` evenly spaced prefixes (always including the last bar)
+    are evaluated with `make_signal` itself.
+    """
+    if not isinstance(rule, CompiledRule):
+        rule = compile_rule(rule)
+    n = len(df)
+    high, low, close = (df[c].to_numpy(dtype=float) for c in ("High", "Low", "Close"))
+
+    stream = StreamingRule(rule)
+    step = stream.update
+    signals: list[str | None] = []
+    trace: list[tuple[float, float, float, bool]] = []
+    start = perf_counter()
+    for h, lo, c in zip(high.tolist(), low.tolist(), close.tolist()):
+        signals.append(step(h, lo, c))
+        trace.append((stream.atr, stream.atr_thresh, stream.ema_diff, stream.active))
+    streaming_seconds = perf_counter() - start
+
+    start = perf_counter()
+    comp = rule_components({"replay": df}, rule.params)
+    batch_seconds = perf_counter() - start
+
+    first = min(rule.params.min_rows, n + 1) - 1
+    index = df.index[first:]
+    up, down, active = comp.crossed_up[first:, 0], comp.crossed_down[first:, 0], comp.active[first:, 0]
+    batch = {
+        "signal": np.where(up & active, 1, np.where(down & active, -1, 0)),
+        "active": active,
+        "atr": comp.atr[first:, 0],
+        "atr_thresh": comp.atr_thresh[first:, 0],
+        "ema_diff": comp.ema_diff[first:, 0],
+    }
+    values = np.array(trace[first:], dtype=float).reshape(-1, 4)
+    mine = {
+        "signal": np.array([_CODES[sig] for sig in signals[first:]], dtype=int),
+        "active": values[:, 3].astype(bool),
+        "atr": values[:, 0],
+        "atr_thresh": values[:, 1],
+        "ema_diff": values[:, 2],
+    }
+    rows = []
+    for field, ref in batch.items():
+        bad = _float_mismatch(mine[field], ref, rtol, atol) if field in _FLOAT_FIELDS else mine[field] != ref
+        for j in np.flatnonzero(bad):
+            rows.append((index[j], "batch", field, mine[field][j], ref[j]))
+
+    checked = []
+    if spot_checks > 0 and first < n:
+        checked = sorted(set(np.linspace(first, n - 1, spot_checks).astype(int).tolist()))
+    for i in checked:
+        ref = rule.evaluate(df.iloc[: i + 1])
+        j = i - first
+        if _CODES[ref["signal"]] != mine["signal"][j]:
+            rows.append((df.index[i], "make_signal", "signal", mine["signal"][j], _CODES[ref["signal"]]))
+        if bool(ref["active"]) != mine["active"][j]:
+            rows.append((df.index[i], "make_signal", "active", mine["active"][j], bool(ref["active"])))
+        for field in _FLOAT_FIELDS:
+            if _float_mismatch(mine[field][j], ref["metrics"][field], rtol, atol):
+                rows.append((df.index[i], "make_signal", field, mine[field][j], ref["metrics"][field]))
+
+    mismatches = pd.DataFrame(rows, columns=["as_of", "source", "field", "streaming", "reference"])
+    mismatches = mismatches.set_index("as_of").sort_index(kind="stable")
+    return ReplayResult(
+        n_bars=n,
+        n_compared=len(index),
+        n_spot_checks=len(checked),
+        streaming_seconds=streaming_seconds,
+        batch_seconds=batch_seconds,
+        mismatches=mismatches,
+    )
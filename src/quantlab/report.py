@@ -0,0 +1,535 @@
+"""Strategy reports in the mobile contract of docs/05 (``strategy_report.json``).
+
+One report per symbol with ``meta``, ``signal``, ``risk``, ``performance``,
+``regime`` and ``alerts`` sections, following Notebook 12's research
+strategy: long when EMA fast > EMA slow, flat otherwise, costs of
+``cost_bps`` per unit of weight change, next-bar returns.
+
+Two ways to get there, producing identical reports:
+
+- `build_reports` stacks every symbol as one column of 2D arrays (aligned on
+  each symbol's latest bar, so different calendars and listing dates need
+  no reindexing) and computes indicators, the backtest and all metrics in
+  one vectorized pass.
+- `update_reports` advances the previous day's reports by the new bars
+  only. Each report carries a compact ``state`` section (running equity,
+  Welford moments, EMA values and the short trailing windows the metrics
+  need), so the daily update costs O(new bars), not O(history).
+
+`refresh_reports` picks the incremental path per symbol whenever the
+previous state is still consistent with the fetched bars. The ``state``
+section is not part of the mobile contract: `split_state` moves it out
+before publishing (the CLI keeps it in a ``.state.json`` sidecar) and
+`merge_state` puts it back for the next refresh.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .indicators import ema_array, rolling_mean_array, true_range_array
+from .rules import RuleParams
+
+REPORT_VERSION = "v1"
+
+_ACTIONS = {1: "BUY", -1: "SELL", 0: "HOLD"}
+_SCALARS = (
+    "last_close",
+    "ema_fast",
+    "ema_slow",
+    "weight",
+    "equity",
+    "peak_equity",
+    "max_drawdown",
+    "n",
+    "mean_ret",
+    "m2_ret",
+    "n_wins",
+    "year",
+    "year_start_equity",
+    "n_trades",
+    "trade_log_sum",
+    "atr",
+    "active",
+    "action",
+)
+_WINDOWS = ("tr", "atr_window", "ratio", "dw", "events")
+
+
+@dataclass(frozen=True)
+class ReportConfig:
+    """Strategy and metric settings shared by the full and incremental paths.
+
+    ``regime_window`` bars of ATR/Close define the low/mid/high volatility
+    tertiles; ``recent_window`` bars define ``turnover_20d`` and
+    ``signal_frequency_20d``.
+    """
+
+    params: RuleParams = field(default_factory=RuleParams)
+    cost_bps: float = 5.0
+    periods_per_year: float = 252.0
+    regime_window: int = 252
+    recent_window: int = 20
+
+    def __post_init__(self) -> None:
+        if self.regime_window < 3 or self.recent_window < 1:
+            raise ValueError("regime_window must be >= 3 and recent_window >= 1")
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash stored in each report's state; updates require a matching config."""
+        canonical = json.dumps(asdict(self), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:8]
+
+    def window_lengths(self) -> dict[str, int]:
+        p = self.params
+        return {
+            "tr": p.atr_period,
+            "atr_window": p.atr_threshold_window,
+            "ratio": self.regime_window,
+            "dw": self.recent_window,
+            "events": self.recent_window,
+        }
+
+
+def _tail(a: np.ndarray, k: int) -> np.ndarray:
+    """Last ``k`` rows of a (T, N) array as (N, k), NaN-padded on the left."""
+    out = np.full((a.shape[1], k), np.nan)
+    rows = min(k, a.shape[0])
+    if rows:
+        out[:, k - rows :] = a[-rows:].T
+    return out
+
+
+def _threshold(window: np.ndarray, q: float) -> np.ndarray:
+    """Rule threshold over the last axis, ignoring NaN (all-NaN -> NaN)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(window, axis=-1) if q == 0.5 else np.nanquantile(window, q, axis=-1)
+
+
+def _full_state(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    years: np.ndarray,
+    cfg: ReportConfig,
+) -> dict[str, np.ndarray]:
+    """State after the last row of (T, N) arrays whose columns end on each symbol's latest bar."""
+    p = cfg.params
+    cost = cfg.cost_bps / 10_000.0
+    valid = ~np.isnan(close)
+
+    ema_f = ema_array(close, p.ema_fast)
+    ema_s = ema_array(close, p.ema_slow)
+    tr = true_range_array(high, low, close)
+    atr = rolling_mean_array(tr, p.atr_period)
+
+    w = (ema_f > ema_s).astype(float)
+    w_prev = np.vstack([np.zeros((1, w.shape[1])), w[:-1]])
+    ret = np.zeros_like(close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret[1:] = close[1:] / close[:-1] - 1.0
+    ret[~np.isfinite(ret)] = 0.0
+    dw = np.abs(w - w_prev)
+    net = w_prev * ret - cost * dw
+
+    equity = np.cumprod(1.0 + net, axis=0)
+    peak = np.maximum.accumulate(equity, axis=0)
+    n = valid.sum(axis=0).astype(float)
+    mean = np.where(valid, net, 0.0).sum(axis=0) / n
+    m2 = np.where(valid, (net - mean) ** 2, 0.0).sum(axis=0)
+
+    last_year = years[-1]
+    before = valid & (years < last_year)
+    has_before = before.any(axis=0)
+    last_before = before.shape[0] - 1 - before[::-1].argmax(axis=0)
+    year_start = np.where(has_before, equity[last_before, np.arange(equity.shape[1])], 1.0)
+
+    entries = (w_prev == 0.0) & (w == 1.0)
+    in_trade = (w_prev > 0.0) | (dw > 0.0)
+
+    # Rule events over the last `recent_window` bars (same threshold as make_signal).
+    r, win = cfg.recent_window, p.atr_threshold_window
+    atr_span = _tail(atr, win + r - 1)
+    thresholds = _threshold(sliding_window_view(atr_span, win, axis=1), p.atr_threshold_quantile)
+    atr_recent = atr_span[:, win - 1 :]
+    active = atr_recent > thresholds
+    diff = _tail(ema_f - ema_s, r + 1)
+    up = (diff[:, :-1] <= 0) & (diff[:, 1:] > 0) & active
+    down = (diff[:, :-1] >= 0) & (diff[:, 1:] < 0) & active
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = atr / close
+    return {
+        "last_close": close[-1],
+        "ema_fast": ema_f[-1],
+        "ema_slow": ema_s[-1],
+        "weight": w[-1],
+        "equity": equity[-1],
+        "peak_equity": peak[-1],
+        "max_drawdown": (equity / peak - 1.0).min(axis=0),
+        "n": n,
+        "mean_ret": mean,
+        "m2_ret": m2,
+        "n_wins": (net > 0).sum(axis=0).astype(float),
+        "year": last_year.astype(float),
+        "year_start_equity": year_start,
+        "n_trades": entries.sum(axis=0).astype(float),
+        "trade_log_sum": np.where(in_trade, np.log1p(net), 0.0).sum(axis=0),
+        "atr": atr[-1],
+        "active": active[:, -1].astype(float),
+        "action": np.where(up[:, -1], 1.0, np.where(down[:, -1], -1.0, 0.0)),
+        "tr": _tail(tr, p.atr_period),
+        "atr_window": _tail(atr, win),
+        "ratio": _tail(ratio, cfg.regime_window),
+        "dw": _tail(dw, r),
+        "events": (up | down).astype(float),
+    }
+
+
+def _push(window: np.ndarray, values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Append ``values`` to each masked row of an (N, k) window, dropping the oldest."""
+    rolled = np.concatenate([window[:, 1:], values[:, None]], axis=1)
+    return np.where(mask[:, None], rolled, window)
+
+
+def _advance(state: dict[str, np.ndarray], close, high, low, year, cfg: ReportConfig) -> dict[str, np.ndarray]:
+    """One bar for every symbol at once; symbols with NaN ``close`` are left unchanged."""
+    p = cfg.params
+    s = dict(state)
+    m = ~np.isnan(close)
+    prev_close = s["last_close"]
+
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    s["tr"] = _push(s["tr"], tr, m)
+    atr = s["tr"].mean(axis=1)
+    s["atr_window"] = _push(s["atr_window"], atr, m)
+    active = atr > _threshold(s["atr_window"], p.atr_threshold_quantile)
+
+    a_f, a_s = 2.0 / (p.ema_fast + 1.0), 2.0 / (p.ema_slow + 1.0)
+    ema_f = (1.0 - a_f) * s["ema_fast"] + a_f * close
+    ema_s = (1.0 - a_s) * s["ema_slow"] + a_s * close
+    diff_prev, diff = s["ema_fast"] - s["ema_slow"], ema_f - ema_s
+    up = (diff_prev <= 0) & (diff > 0) & active
+    down = (diff_prev >= 0) & (diff < 0) & active
+
+    w_prev = s["weight"]
+    w = (ema_f > ema_s).astype(float)
+    dw = np.abs(w - w_prev)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = close / prev_close - 1.0
+    ret = np.where(np.isfinite(ret), ret, 0.0)
+    net = w_prev * ret - cfg.cost_bps / 10_000.0 * dw
+
+    equity = s["equity"] * (1.0 + net)
+    peak = np.maximum(s["peak_equity"], equity)
+    n = s["n"] + 1.0
+    delta = net - s["mean_ret"]
+    mean = s["mean_ret"] + delta / n
+    new_year = year != s["year"]
+
+    updates = {
+        "last_close": close,
+        "ema_fast": ema_f,
+        "ema_slow": ema_s,
+        "weight": w,
+        "equity": equity,
+        "peak_equity": peak,
+        "max_drawdown": np.minimum(s["max_drawdown"], equity / peak - 1.0),
+        "n": n,
+        "mean_ret": mean,
+        "m2_ret": s["m2_ret"] + delta * (net - mean),
+        "n_wins": s["n_wins"] + (net > 0),
+        "year": year,
+        "year_start_equity": np.where(new_year, s["equity"], s["year_start_equity"]),
+        "n_trades": s["n_trades"] + ((w_prev == 0.0) & (w == 1.0)),
+        "trade_log_sum": s["trade_log_sum"] + np.where((w_prev > 0) | (dw > 0), np.log1p(net), 0.0),
+        "atr": atr,
+        "active": active.astype(float),
+        "action": np.where(up, 1.0, np.where(down, -1.0, 0.0)),
+    }
+    for key, value in updates.items():
+        s[key] = np.where(m, value, s[key])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s["ratio"] = _push(s["ratio"], atr / close, m)
+    s["dw"] = _push(s["dw"], dw, m)
+    s["events"] = _push(s["events"], (up | down).astype(float), m)
+    return s
+
+
+def _num(x: float) -> float | None:
+    return None if not np.isfinite(x) else float(x)
+
+
+def _num_list(values: list[float]) -> list[float | None]:
+    return [v if v == v else None for v in values]  # NaN != NaN
+
+
+def _vol_regimes(ratio: np.ndarray) -> list[str | None]:
+    """Latest ATR/Close vs tertiles of each row of an (N, k) window."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        quantile = np.quantile if not np.isnan(ratio).any() else np.nanquantile
+        q1, q2 = quantile(ratio, [0.33, 0.66], axis=1)
+    current = ratio[:, -1]
+    labels = np.where(current <= q1, "low", np.where(current <= q2, "mid", "high"))
+    return [None if np.isnan(c) else str(label) for c, label in zip(current, labels)]
+
+
+def _render_all(
+    state: dict[str, np.ndarray],
+    metas: list[dict[str, Any]],
+    cfg: ReportConfig,
+    generated_at: str | None,
+) -> list[dict[str, Any]]:
+    """One report per state column; window-wide statistics are computed for all columns at once."""
+    shared = {
+        "fingerprint": cfg.fingerprint,
+        "vol_regime": _vol_regimes(state["ratio"]),
+        "turnover": np.nansum(state["dw"], axis=1).tolist(),
+        "frequency": np.nansum(state["events"], axis=1).astype(int).tolist(),
+        "windows": {key: state[key].tolist() for key in _WINDOWS},
+    }
+    return [_render(state, i, meta, cfg, generated_at, shared) for i, meta in enumerate(metas)]
+
+
+def _render(
+    state: dict[str, np.ndarray],
+    i: int,
+    meta: dict[str, Any],
+    cfg: ReportConfig,
+    generated_at: str | None,
+    shared: dict[str, Any],
+) -> dict[str, Any]:
+    """Report dict for column ``i`` of a state."""
+    p = cfg.params
+    g = {key: float(state[key][i]) for key in _SCALARS}
+    action = _ACTIONS[int(g["action"])]
+    trend_up = g["ema_fast"] >= g["ema_slow"]
+
+    reason_codes = ["ema_trend_up" if trend_up else "ema_trend_down", "atr_active" if g["active"] else "atr_inactive"]
+    if action != "HOLD":
+        reason_codes.append("ema_cross_up" if action == "BUY" else "ema_cross_down")
+
+    n = g["n"]
+    ann_vol = np.sqrt(g["m2_ret"] / (n - 1.0) * cfg.periods_per_year) if n > 1 else np.nan
+    avg_trade = np.expm1(g["trade_log_sum"] / g["n_trades"]) if g["n_trades"] else np.nan
+
+    alerts = []
+    if action != "HOLD":
+        direction = "above" if action == "BUY" else "below"
+        alerts.append(
+            {
+                "type": action,
+                "message": f"EMA{p.ema_fast} crossed {direction} EMA{p.ema_slow} with ATR{p.atr_period} active",
+                "scheduled_at": generated_at,
+            }
+        )
+
+    windows = {key: _num_list(rows[i]) for key, rows in shared["windows"].items()}
+    return {
+        "meta": {**meta, "version": REPORT_VERSION},
+        "signal": {"action": action, "position_target": g["weight"], "reason_codes": reason_codes},
+        "risk": {
+            "max_drawdown": g["max_drawdown"],
+            "ann_vol": _num(ann_vol),
+            "turnover_20d": shared["turnover"][i],
+        },
+        "performance": {
+            "cum_return": g["equity"] - 1.0,
+            "ytd_return": g["equity"] / g["year_start_equity"] - 1.0,
+            "win_rate": g["n_wins"] / n,
+            "avg_trade_return": _num(avg_trade),
+        },
+        "regime": {
+            "vol_regime": shared["vol_regime"][i],
+            "trend_regime": "bull" if trend_up else "bear",
+            "signal_frequency_20d": shared["frequency"][i],
+        },
+        "alerts": alerts,
+        "state": {"config": shared["fingerprint"], **{k: _num(v) for k, v in g.items()}, **windows},
+    }
+
+
+def _meta(symbol: str, df: pd.DataFrame, engine_version: str | None) -> dict[str, Any]:
+    tz = getattr(df.index, "tz", None)
+    meta: dict[str, Any] = {"symbol": symbol, "as_of": str(df.index[-1]), "timezone": str(tz) if tz else None}
+    if engine_version is not None:
+        meta["engine_version"] = engine_version
+    return meta
+
+
+def build_reports(
+    frames: Mapping[str, pd.DataFrame],
+    config: ReportConfig | None = None,
+    *,
+    generated_at: str | None = None,
+    engine_version: str | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Full-history reports for every symbol in one vectorized pass.
+
+    Symbols with fewer than ``params.min_rows`` bars get ``{"meta", "error"}``.
+    """
+    cfg = config or ReportConfig()
+    reports: dict[str, dict[str, Any]] = {}
+    usable = {}
+    for symbol, df in frames.items():
+        if len(df) < cfg.params.min_rows:
+            reports[symbol] = {
+                "meta": _meta(symbol, df, engine_version) if len(df) else {"symbol": symbol},
+                "error": f"Not enough data (need ~{cfg.params.min_rows} bars).",
+            }
+        else:
+            usable[symbol] = df
+    if not usable:
+        return reports
+
+    # Column j holds symbol j's bars aligned on its latest bar (NaN-padded on top).
+    n_rows = max(len(df) for df in usable.values())
+    shape = (n_rows, len(usable))
+    close, high, low = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    years = np.full(shape, -1, dtype=np.int64)
+    for j, df in enumerate(usable.values()):
+        k = len(df)
+        close[-k:, j] = df["Close"].to_numpy(dtype=float)
+        high[-k:, j] = df["High"].to_numpy(dtype=float)
+        low[-k:, j] = df["Low"].to_numpy(dtype=float)
+        years[-k:, j] = df.index.year
+
+    state = _full_state(close, high, low, years, cfg)
+    metas = [_meta(symbol, df, engine_version) for symbol, df in usable.items()]
+    reports.update(zip(usable, _render_all(state, metas, cfg, generated_at)))
+    return {symbol: reports[symbol] for symbol in frames}
+
+
+def _load_state(reports: list[dict[str, Any]], cfg: ReportConfig) -> dict[str, np.ndarray]:
+    lengths = cfg.window_lengths()
+    state: dict[str, np.ndarray] = {}
+    for key in _SCALARS:
+        state[key] = np.array([r["state"][key] for r in reports], dtype=float)
+    for key in _WINDOWS:
+        rows = [r["state"][key] for r in reports]
+        if any(len(row) != lengths[key] for row in rows):
+            raise ValueError(f"report state window {key!r} does not match the config")
+        state[key] = np.array(rows, dtype=float).reshape(len(reports), lengths[key])
+    return state
+
+
+def update_reports(
+    previous: Mapping[str, dict[str, Any]],
+    new_bars: Mapping[str, pd.DataFrame],
+    config: ReportConfig | None = None,
+    *,
+    generated_at: str | None = None,
+    engine_version: str | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Advance previous reports by bars strictly after each report's ``as_of``.
+
+    ``new_bars`` may contain the full history; only the new rows are used.
+    Every symbol needs a previous report with ``state`` built under the same
+    config (ValueError otherwise). Symbols are stepped together, one bar per
+    step, so the cost is O(max new bars) vectorized operations.
+    """
+    cfg = config or ReportConfig()
+    symbols = list(new_bars)
+    missing = [s for s in symbols if "state" not in previous.get(s, {})]
+    if missing:
+        raise ValueError(f"No previous report state for {missing}; use build_reports")
+    prev = [previous[s] for s in symbols]
+    fingerprint = cfg.fingerprint
+    if any(r["state"].get("config") != fingerprint for r in prev):
+        raise ValueError("previous reports were built with a different ReportConfig")
+
+    # New rows per symbol as (close, high, low, year) arrays, left-aligned by step.
+    tails = []
+    for symbol, report in zip(symbols, prev):
+        df = new_bars[symbol]
+        start = df.index.searchsorted(pd.Timestamp(report["meta"]["as_of"]), side="right")
+        tail = df.iloc[start:]
+        columns = [tail[c].to_numpy(dtype=float) for c in ("Close", "High", "Low")]
+        tails.append(np.column_stack([*columns, tail.index.year.to_numpy(dtype=float)]))
+    n_steps = max((len(tail) for tail in tails), default=0)
+    steps = np.full((n_steps, len(symbols), 4), np.nan)
+    for j, tail in enumerate(tails):
+        steps[: len(tail), j] = tail
+
+    state = _load_state(prev, cfg)
+    for t in range(n_steps):
+        close, high, low, year = steps[t].T
+        state = _advance(state, close, high, low, np.where(np.isnan(year), state["year"], year), cfg)
+
+    metas = []
+    for j, symbol in enumerate(symbols):
+        meta = _meta(symbol, new_bars[symbol], engine_version) if len(tails[j]) else dict(prev[j]["meta"])
+        meta.pop("version", None)
+        metas.append(meta)
+    return dict(zip(symbols, _render_all(state, metas, cfg, generated_at)))
+
+
+def _can_update(report: Mapping[str, Any] | None, df: pd.DataFrame, cfg: ReportConfig) -> bool:
+    """True when ``report``'s state still describes the start of ``df``."""
+    if not report or "state" not in report or report["state"].get("config") != cfg.fingerprint:
+        return False
+    as_of = pd.Timestamp(report["meta"]["as_of"])
+    if as_of not in df.index:
+        return False
+    last_close = report["state"].get("last_close")
+    return last_close is not None and bool(np.isclose(df.loc[as_of, "Close"], last_close, rtol=1e-9, atol=0.0))
+
+
+def refresh_reports(
+    frames: Mapping[str, pd.DataFrame],
+    previous: Mapping[str, dict[str, Any]] | None = None,
+    config: ReportConfig | None = None,
+    *,
+    generated_at: str | None = None,
+    engine_version: str | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Incremental update where the previous state matches the bars, full build elsewhere.
+
+    A previous report is reused only if it was built under the same config and
+    its ``as_of`` bar is still present with the same close (a revised history
+    or a new symbol falls back to `build_reports`).
+    """
+    cfg = config or ReportConfig()
+    previous = previous or {}
+    incremental = {s: df for s, df in frames.items() if _can_update(previous.get(s), df, cfg)}
+    full = {s: df for s, df in frames.items() if s not in incremental}
+    kwargs = {"generated_at": generated_at, "engine_version": engine_version}
+    out = build_reports(full, cfg, **kwargs) if full else {}
+    if incremental:
+        out.update(update_reports(previous, incremental, cfg, **kwargs))
+    return {symbol: out[symbol] for symbol in frames}
+
+
+def split_state(
+    reports: Mapping[str, dict[str, Any]],
+) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Split reports into the docs/05 sections and the per-symbol ``state`` sections.
+
+    Returns ``(public, states)``; ``public`` is what the app downloads,
+    ``states`` is kept by the server for `merge_state` on the next run.
+    """
+    public = {symbol: {k: v for k, v in report.items() if k != "state"} for symbol, report in reports.items()}
+    states = {symbol: report["state"] for symbol, report in reports.items() if "state" in report}
+    return public, states
+
+
+def merge_state(
+    reports: Mapping[str, dict[str, Any]],
+    states: Mapping[str, dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    """Inverse of `split_state`: reports ready for `refresh_reports` / `update_reports`."""
+    return {
+        symbol: {**report, "state": states[symbol]} if symbol in states else dict(report)
+        for symbol, report in reports.items()
+    }
@@ -0,0 +1,203 @@
+"""Streaming OHLCV aggregation from base bars into several timeframes.
+
+One download at the finest interval (e.g. 5m) can feed 1h and 1d signals:
+`BarAggregator` consumes base bars chunk by chunk, emits bars as soon as
+their bucket is complete and keeps the current (partial) bar open until a
+later bar or `flush` closes it.
+
+Each timeframe is aggregated straight from the base bars. OHLCV aggregation
+is associative, so this equals cascading 5m -> 1h -> 1d while needing only
+one vectorized pass per chunk.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rules import CompiledRule, RuleParams, make_signal
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+_TIMEFRAME_RE = re.compile(r"^(\d+)(m|min|h|d)$")
+_UNIT_TO_PANDAS = {"m": "min", "min": "min", "h": "h", "d": "D"}
+
+
+def parse_timeframe(timeframe: str) -> pd.Timedelta:
+    """Parse yfinance-style intervals such as ``5m``, ``90m``, ``1h`` or ``1d``."""
+    match = _TIMEFRAME_RE.match(timeframe.strip().lower())
+    if not match:
+        raise ValueError(f"Unsupported timeframe {timeframe!r}; use e.g. 5m, 1h, 1d")
+    amount, unit = match.groups()
+    delta = pd.Timedelta(int(amount), unit=_UNIT_TO_PANDAS[unit])
+    if delta <= pd.Timedelta(0):
+        raise ValueError(f"Timeframe must be positive, got {timeframe!r}")
+    return delta
+
+
+def periods_per_year(
+    interval: str,
+    *,
+    trading_days: float = 252.0,
+    session_hours: float = 6.5,
+) -> float:
+    """Bars per year for annualizing per-bar statistics (Sharpe, volatility).
+
+    Daily bars give ``trading_days``; intraday bars assume ``session_hours``
+    of trading per day (6.5 for US equities, 5.0 for the Tokyo cash session).
+    ``1wk``/``1mo`` are accepted for the yfinance weekly/monthly intervals.
+    """
+    key = interval.strip().lower()
+    if key in {"1wk", "1w"}:
+        return 52.0
+    if key == "1mo":
+        return 12.0
+    delta = parse_timeframe(key)
+    if delta >= pd.Timedelta(days=1):
+        return trading_days / (delta / pd.Timedelta(days=1))
+    bars_per_session = session_hours * 3600.0 / delta.total_seconds()
+    return trading_days * max(bars_per_session, 1.0)
+
+
+def _aggregate(bars: pd.DataFrame, keys: pd.DatetimeIndex) -> pd.DataFrame:
+    """OHLCV per run of equal ``keys`` (bars must already be time-ordered)."""
+    key_values = keys.asi8
+    starts = np.flatnonzero(np.r_[True, key_values[1:] != key_values[:-1]])
+    ends = np.r_[starts[1:], len(key_values)] - 1
+
+    data = {
+        "Open": bars["Open"].to_numpy(dtype=float)[starts],
+        "High": np.maximum.reduceat(bars["High"].to_numpy(dtype=float), starts),
+        "Low": np.minimum.reduceat(bars["Low"].to_numpy(dtype=float), starts),
+        "Close": bars["Close"].to_numpy(dtype=float)[ends],
+    }
+    if "Volume" in bars.columns:
+        data["Volume"] = np.add.reduceat(bars["Volume"].to_numpy(dtype=float), starts)
+    return pd.DataFrame(data, index=keys[starts])
+
+
+def _merge_partial(partial: pd.DataFrame, head: pd.DataFrame) -> pd.DataFrame:
+    """Combine an open bar with the first aggregated row of the same bucket."""
+    merged = head.copy()
+    merged.iloc[0, merged.columns.get_loc("Open")] = partial["Open"].iloc[0]
+    merged.iloc[0, merged.columns.get_loc("High")] = max(partial["High"].iloc[0], head["High"].iloc[0])
+    merged.iloc[0, merged.columns.get_loc("Low")] = min(partial["Low"].iloc[0], head["Low"].iloc[0])
+    if "Volume" in merged.columns:
+        merged.iloc[0, merged.columns.get_loc("Volume")] = partial["Volume"].iloc[0] + head["Volume"].iloc[0]
+    return merged
+
+
+class BarAggregator:
+    """Incrementally aggregate base bars into several coarser timeframes.
+
+    Bars are labelled by bucket start (``index.floor(timeframe)``); for
+    tz-aware indexes daily buckets follow the exchange's local calendar day.
+    Closed bars are accumulated and returned by `update`; the open bar per
+    timeframe is available through `partial`.
+    """
+
+    def __init__(self, timeframes: Sequence[str]) -> None:
+        if not timeframes:
+            raise ValueError("timeframes must not be empty")
+        self.timeframes = list(dict.fromkeys(timeframes))
+        self._freqs = {tf: parse_timeframe(tf) for tf in self.timeframes}
+        self._partial: dict[str, pd.DataFrame | None] = {tf: None for tf in self.timeframes}
+        self._closed: dict[str, list[pd.DataFrame]] = {tf: [] for tf in self.timeframes}
+        self._last_ts: pd.Timestamp | None = None
+
+    def update(self, bars: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        """Consume the next chunk of base bars; return bars closed by this chunk."""
+        if bars.empty:
+            return {tf: pd.DataFrame(columns=OHLCV_COLUMNS) for tf in self.timeframes}
+        if not isinstance(bars.index, pd.DatetimeIndex):
+            raise TypeError("bars must be indexed by a pandas.DatetimeIndex")
+        overlaps = self._last_ts is not None and bars.index[0] <= self._last_ts
+        if not bars.index.is_monotonic_increasing or overlaps:
+            raise ValueError("bars must be time-ordered and strictly after previously consumed bars")
+        self._last_ts = bars.index[-1]
+
+        emitted: dict[str, pd.DataFrame] = {}
+        for tf, freq in self._freqs.items():
+            agg = _aggregate(bars, bars.index.floor(freq))
+            partial = self._partial[tf]
+            closed_parts = []
+            if partial is not None:
+                if agg.index[0] == partial.index[0]:
+                    agg = _merge_partial(partial, agg)
+                else:
+                    closed_parts.append(partial)
+            closed_parts.append(agg.iloc[:-1])
+            self._partial[tf] = agg.iloc[-1:]
+            emitted[tf] = pd.concat(closed_parts) if len(closed_parts) > 1 else closed_parts[0]
+            if len(emitted[tf]):
+                self._closed[tf].append(emitted[tf])
+        return emitted
+
+    def partial(self, timeframe: str) -> pd.DataFrame:
+        """The currently open bar for ``timeframe`` (empty before any input)."""
+        bar = self._partial[timeframe]
+        return bar if bar is not None else pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def bars(self, timeframe: str, *, include_partial: bool = False) -> pd.DataFrame:
+        """All closed bars so far, optionally followed by the open bar."""
+        closed_parts = self._closed[timeframe]
+        if len(closed_parts) > 1:
+            # Keep the concatenation so repeated calls only pay for new chunks.
+            self._closed[timeframe] = closed_parts = [pd.concat(closed_parts)]
+        partial = self._partial[timeframe]
+        parts = closed_parts + ([partial] if include_partial and partial is not None else [])
+        if not parts:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+    def flush(self) -> dict[str, pd.DataFrame]:
+        """Close every open bar (end of stream) and return them."""
+        flushed: dict[str, pd.DataFrame] = {}
+        for tf in self.timeframes:
+            bar = self._partial[tf]
+            self._partial[tf] = None
+            if bar is not None:
+                self._closed[tf].append(bar)
+                flushed[tf] = bar
+        return flushed
+
+
+def aggregate_timeframes(
+    bars: pd.DataFrame,
+    timeframes: Sequence[str],
+    *,
+    include_partial: bool = True,
+) -> dict[str, pd.DataFrame]:
+    """One-shot helper: aggregate a whole base-bar frame into each timeframe.
+
+    With ``include_partial=True`` the last (possibly still forming) bar is kept,
+    which is what a live signal "as of now" should see.
+    """
+    agg = BarAggregator(timeframes)
+    agg.update(bars)
+    return {tf: agg.bars(tf, include_partial=include_partial) for tf in agg.timeframes}
+
+
+def signals_by_timeframe(
+    frames: Mapping[str, pd.DataFrame],
+    rule: CompiledRule | RuleParams | None = None,
+) -> dict[str, dict]:
+    """Run the rule on each timeframe; timeframes with too little history report an error.
+
+    Each entry carries ``periods_per_year`` so per-bar statistics can be
+    annualized correctly (e.g. ``summarize_performance(..., periods_per_year=...)``).
+    """
+    out: dict[str, dict] = {}
+    for tf, df in frames.items():
+        entry: dict = {"bars": int(len(df)), "periods_per_year": periods_per_year(tf)}
+        if len(df):
+            entry["as_of"] = str(df.index[-1])
+        try:
+            entry.update(make_signal(df, rule))
+        except ValueError as exc:
+            entry["error"] = str(exc)
+        out[tf] = entry
+    return out
@@ -0,0 +1,158 @@
+"""Block-bootstrap confidence intervals for strategy metrics.
+
+`summarize_performance` gives one number per metric. Resampling the return
+stream in contiguous blocks (which keeps short-range autocorrelation and
+volatility clustering intact) shows how much those numbers could move by
+chance.
+
+All resamples of a stream are built as one index matrix and summarized
+with `summarize_performance_batch`, in chunks of ``chunk_size`` rows to
+bound memory. Block starts are drawn up front from a per-stream seed, so
+results depend only on ``seed`` (not on ``chunk_size`` or ``n_jobs``).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .backtest import summarize_performance, summarize_performance_batch
+
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+
+def block_bootstrap_indices(
+    n_periods: int,
+    n_samples: int,
+    block_length: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Row indices of ``n_samples`` circular block-bootstrap resamples.
+
+    Each resample concatenates blocks of ``block_length`` consecutive periods
+    starting at random offsets (wrapping around the end) and is cut to
+    ``n_periods``. Returns an int array of shape (n_samples, n_periods).
+    """
+    starts = _draw_block_starts(n_periods, n_samples, block_length, rng)
+    return _expand_blocks(starts, n_periods, block_length)
+
+
+def _draw_block_starts(n_periods: int, n_samples: int, block_length: int, rng: np.random.Generator) -> np.ndarray:
+    if n_periods < 1:
+        raise ValueError("need at least one return to resample")
+    if not 1 <= block_length <= n_periods:
+        raise ValueError(f"block_length must be within [1, {n_periods}], got {block_length}")
+    if n_samples < 1:
+        raise ValueError("n_samples must be >= 1")
+    n_blocks = -(-n_periods // block_length)
+    return rng.integers(0, n_periods, size=(n_samples, n_blocks))
+
+
+def _expand_blocks(starts: np.ndarray, n_periods: int, block_length: int) -> np.ndarray:
+    offsets = np.arange(block_length)
+    idx = (starts[:, :, None] + offsets) % n_periods
+    return idx.reshape(starts.shape[0], -1)[:, :n_periods]
+
+
+def bootstrap_metrics(
+    returns: pd.Series | np.ndarray,
+    *,
+    n_samples: int = 1000,
+    block_length: int = 20,
+    seed: int | np.random.SeedSequence | None = 0,
+    periods_per_year: float = 252.0,
+    chunk_size: int = 1000,
+) -> pd.DataFrame:
+    """Metric distribution of one return stream: one row per resample.
+
+    Columns match `summarize_performance`. NaNs are dropped before resampling.
+    ``block_length`` ~20 (one trading month of daily bars) is a reasonable
+    default; use longer blocks for strongly autocorrelated streams.
+    """
+    values = np.asarray(returns, dtype=float)
+    values = values[~np.isnan(values)]
+    block_length = min(block_length, max(len(values), 1))
+    rng = np.random.default_rng(seed)
+    starts = _draw_block_starts(len(values), n_samples, block_length, rng)
+
+    parts = []
+    for lo in range(0, n_samples, max(chunk_size, 1)):
+        idx = _expand_blocks(starts[lo : lo + chunk_size], len(values), block_length)
+        parts.append(summarize_performance_batch(values[idx], periods_per_year=periods_per_year))
+    return pd.concat(parts, ignore_index=True)
+
+
+def summarize_bootstrap(
+    samples: pd.DataFrame,
+    *,
+    point: pd.Series | None = None,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+) -> pd.DataFrame:
+    """Per-metric table of the bootstrap distribution.
+
+    Columns: ``point`` (if given), ``mean``, ``std``, one ``pXX`` column per
+    quantile (``p5``, ``p50``, ``p95`` by default) and ``prob_positive``.
+    """
+    metrics = samples.drop(columns=["n"], errors="ignore")
+    table = pd.DataFrame({"mean": metrics.mean(), "std": metrics.std(ddof=0)})
+    for q in quantiles:
+        table[f"p{q * 100:g}"] = metrics.quantile(q)
+    table["prob_positive"] = (metrics > 0).mean()
+    if point is not None:
+        table.insert(0, "point", point.reindex(table.index).astype(float))
+    table.index.name = "metric"
+    return table
+
+
+def _bootstrap_one(job: tuple) -> pd.DataFrame:
+    """Process-pool worker: bootstrap one stream and reduce it to a summary table."""
+    values, seed, kwargs, quantiles = job
+    point = summarize_performance(pd.Series(values), periods_per_year=kwargs["periods_per_year"])
+    if np.isnan(values).all():  # no returns yet: an all-NaN table instead of failing the universe
+        samples = pd.DataFrame(columns=point.index, dtype=float)
+    else:
+        samples = bootstrap_metrics(values, seed=seed, **kwargs)
+    return summarize_bootstrap(samples, point=point, quantiles=quantiles)
+
+
+def bootstrap_universe(
+    returns: Mapping[str, pd.Series] | pd.DataFrame,
+    *,
+    n_samples: int = 1000,
+    block_length: int = 20,
+    seed: int = 0,
+    periods_per_year: float = 252.0,
+    chunk_size: int = 1000,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """Bootstrap summary for many return streams (e.g. one per symbol).
+
+    Returns a frame indexed by (symbol, metric) with the columns of
+    `summarize_bootstrap`; only the summary is kept, so memory stays flat for
+    large universes. Each symbol gets its own child seed of ``seed``, and
+    ``n_jobs > 1`` spreads symbols over a process pool with identical results.
+    Streams without any returns (empty or all NaN, e.g. a symbol with no
+    data yet in a wide frame) get an all-NaN table instead of an error.
+    """
+    streams = dict(returns.items())
+    children = np.random.SeedSequence(seed).spawn(len(streams))
+    kwargs = {
+        "n_samples": n_samples,
+        "block_length": block_length,
+        "periods_per_year": periods_per_year,
+        "chunk_size": chunk_size,
+    }
+    jobs = [
+        (np.asarray(series, dtype=float), child, kwargs, tuple(quantiles))
+        for series, child in zip(streams.values(), children)
+    ]
+    if n_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            tables = list(pool.map(_bootstrap_one, jobs))
+    else:
+        tables = [_bootstrap_one(job) for job in jobs]
+    return pd.concat(tables, keys=list(streams), names=["symbol"])
@@ -1,86 +1,453 @@
 from __future__ import annotations
 
-from typing import Literal
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Iterable, Literal, Mapping, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .indicators import atr, ema
+from .backtest import summarize_performance_batch
+from .indicators import atr_array, ema_array
+from .profiling import stage
 
 Signal = Literal["BUY", "SELL", "HOLD"]
 
+DEFAULT_RULESET = "ema_atr_v0"
 
-def make_signal(df: pd.DataFrame) -> dict:
+# Indicator identity shared across rulesets, e.g. ("ema", 12) or ("atr", 14).
+IndicatorKey = Tuple[str, int]
+
+
+@dataclass(frozen=True, slots=True)
+class RuleParams:
+    """Tunable parameters of the EMA cross + ATR regime rule.
+
+    Field names mirror `parameters:` in `configs/engine.yaml`. Defaults are the
+    historical hard-coded values (12/26/14/60, ~120 rows of history). The
+    regime threshold is the ``atr_threshold_quantile`` of the last
+    ``atr_threshold_window`` ATR values (0.5 = the original median).
+    """
+
+    ema_fast: int = 12
+    ema_slow: int = 26
+    atr_period: int = 14
+    atr_threshold_window: int = 60
+    atr_threshold_quantile: float = 0.5
+    min_rows: int = 120
+
+    def __post_init__(self) -> None:
+        for f in fields(self):
+            if f.name == "atr_threshold_quantile":
+                continue
+            value = getattr(self, f.name)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                raise ValueError(f"{f.name} must be a positive integer, got {value!r}")
+        if not 0.0 <= self.atr_threshold_quantile <= 1.0:
+            raise ValueError("atr_threshold_quantile must be within [0, 1]")
+        if self.ema_fast >= self.ema_slow:
+            raise ValueError("ema_fast must be shorter than ema_slow")
+        if self.min_rows < 2:
+            raise ValueError("min_rows must be >= 2 (the rule compares the last two rows)")
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> RuleParams:
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - known)
+        if unknown:
+            raise ValueError(f"Unknown rule parameters: {unknown}")
+        return cls(
+            **{
+                key: float(value) if key == "atr_threshold_quantile" else int(value)
+                for key, value in data.items()
+            }
+        )
+
+    def replace(self, **overrides: Any) -> RuleParams:
+        """Return a copy with ``overrides`` applied (validated like `from_mapping`)."""
+        current = {f.name: getattr(self, f.name) for f in fields(self)}
+        return RuleParams.from_mapping({**current, **overrides})
+
+
+def compute_indicators(df: pd.DataFrame, keys: Iterable[IndicatorKey]) -> dict[IndicatorKey, np.ndarray]:
+    """Compute each distinct indicator in ``keys`` exactly once, as NumPy arrays.
+
+    Columns are read as arrays (no frame copy); results are aligned with ``df`` rows.
+    """
+    out: dict[IndicatorKey, np.ndarray] = {}
+    close = df["Close"].to_numpy(dtype=float)
+    for kind, period in keys:
+        if (kind, period) in out:
+            continue
+        if kind == "ema":
+            out[(kind, period)] = ema_array(close, period)
+        elif kind == "atr":
+            high = df["High"].to_numpy(dtype=float)
+            low = df["Low"].to_numpy(dtype=float)
+            out[(kind, period)] = atr_array(high, low, close, period)
+        else:
+            raise ValueError(f"Unknown indicator kind: {kind!r}")
+    return out
+
+
+class CompiledRule:
+    """EMA/ATR rule with parameters validated and display strings built once.
+
+    Compile once per run (see `compile_rule`) and reuse the object across
+    symbols; `evaluate` only does per-frame work.
+    """
+
+    __slots__ = (
+        "name",
+        "params",
+        "required_indicators",
+        "_atr_label",
+        "_thresh_label",
+        "_fast_label",
+        "_slow_label",
+        "_min_rows_error",
+    )
+
+    def __init__(self, params: RuleParams | None = None, *, name: str = DEFAULT_RULESET) -> None:
+        self.name = name
+        self.params = params or RuleParams()
+        p = self.params
+        self.required_indicators: tuple[IndicatorKey, ...] = (
+            ("ema", p.ema_fast),
+            ("ema", p.ema_slow),
+            ("atr", p.atr_period),
+        )
+        self._atr_label = f"ATR({p.atr_period})"
+        if p.atr_threshold_quantile == 0.5:
+            self._thresh_label = f"thresh(median{p.atr_threshold_window})"
+        else:
+            self._thresh_label = f"thresh(q{p.atr_threshold_quantile:g}@{p.atr_threshold_window})"
+        self._fast_label = f"EMA({p.ema_fast})"
+        self._slow_label = f"EMA({p.ema_slow})"
+        self._min_rows_error = f"Not enough data (need ~{p.min_rows} trading days)."
+
+    def __repr__(self) -> str:
+        return f"CompiledRule(name={self.name!r}, params={self.params!r})"
+
+    def evaluate(self, df: pd.DataFrame) -> dict:
+        """Evaluate the rule on the latest row of ``df`` (see `make_signal`)."""
+        self.check_length(df)
+        with stage("rules.indicators"):
+            indicators = compute_indicators(df, self.required_indicators)
+        with stage("rules.evaluate"):
+            return self.evaluate_indicators(df["Close"].to_numpy(dtype=float), indicators)
+
+    def check_length(self, df: pd.DataFrame) -> None:
+        if len(df) < self.params.min_rows:
+            raise ValueError(self._min_rows_error)
+
+    def evaluate_indicators(self, close: np.ndarray, indicators: Mapping[IndicatorKey, np.ndarray]) -> dict:
+        """Evaluate on indicators computed elsewhere (e.g. shared by several rulesets)."""
+        p = self.params
+        return self._evaluate_latest(
+            close,
+            indicators[("ema", p.ema_fast)],
+            indicators[("ema", p.ema_slow)],
+            indicators[("atr", p.atr_period)],
+        )
+
+    def evaluate_many(self, frames: Mapping[str, pd.DataFrame]) -> dict[str, dict]:
+        """Evaluate the same compiled rule over many symbols' frames."""
+        return {symbol: self.evaluate(df) for symbol, df in frames.items()}
+
+    def _evaluate_latest(
+        self,
+        close: np.ndarray,
+        ema_fast: np.ndarray,
+        ema_slow: np.ndarray,
+        atr_values: np.ndarray,
+    ) -> dict:
+        """Apply the rule to the last two rows of precomputed indicators."""
+        q = self.params.atr_threshold_quantile
+        atr_window = atr_values[-self.params.atr_threshold_window :]
+        atr_window = atr_window[~np.isnan(atr_window)]
+        source = atr_window if len(atr_window) else atr_values[~np.isnan(atr_values)]
+        atr_thresh = float(np.median(source)) if q == 0.5 else float(np.quantile(source, q))
+
+        atr_last = float(atr_values[-1])
+        active = atr_last > atr_thresh
+
+        ema_diff_last = float(ema_fast[-1] - ema_slow[-1])
+        ema_diff_prev = float(ema_fast[-2] - ema_slow[-2])
+
+        signal: Signal = "HOLD"
+        reasons: list[str] = [
+            f"{self._atr_label}={atr_last:.4f} vs {self._thresh_label}={atr_thresh:.4f}",
+            f"EMA{self.params.ema_fast}-EMA{self.params.ema_slow}={ema_diff_last:.4f} (prev {ema_diff_prev:.4f})",
+        ]
+
+        if not active:
+            reasons.insert(0, f"{self._atr_label} below threshold → Inactive")
+            reasons.append("No trade: inactive regime")
+        else:
+            reasons.insert(0, f"{self._atr_label} above threshold → Active")
+
+            crossed_up = (ema_diff_prev <= 0.0) and (ema_diff_last > 0.0)
+            crossed_down = (ema_diff_prev >= 0.0) and (ema_diff_last < 0.0)
+
+            if crossed_up:
+                signal = "BUY"
+                reasons.append(f"{self._fast_label} crossed above {self._slow_label}")
+            elif crossed_down:
+                signal = "SELL"
+                reasons.append(f"{self._fast_label} crossed below {self._slow_label}")
+            else:
+                reasons.append("No EMA cross")
+
+        last_close = float(close[-1])
+        prev_close = float(close[-2])
+        pct_change_1d = (last_close / prev_close - 1.0) * 100.0
+
+        return {
+            "last_close": last_close,
+            "prev_close": prev_close,
+            "pct_change_1d": float(pct_change_1d),
+            "active": active,
+            "signal": signal,
+            "reasons": reasons[:3],
+            "metrics": {
+                "atr": atr_last,
+                "atr_thresh": atr_thresh,
+                "ema_diff": ema_diff_last,
+            },
+        }
+
+
+@lru_cache(maxsize=128)
+def compile_rule(params: RuleParams | None = None, name: str = DEFAULT_RULESET) -> CompiledRule:
+    """Return a (cached) compiled rule for ``params``."""
+    return CompiledRule(params, name=name)
+
+
+def evaluate_batch(
+    frames: Mapping[str, pd.DataFrame],
+    rules: Sequence[CompiledRule],
+) -> dict[str, dict[str, dict]]:
+    """Evaluate several compiled rules (e.g. a parameter grid) over many symbols.
+
+    Returns ``{symbol: {rule.name: signal_dict}}``; rule names must be unique.
+    Indicators are shared per symbol (see `evaluate_rulesets`).
+    """
+    _check_unique_names(rules)
+    return {symbol: evaluate_rulesets(df, rules) for symbol, df in frames.items()}
+
+
+def evaluate_rulesets(df: pd.DataFrame, rules: Sequence[CompiledRule]) -> dict[str, dict]:
+    """Evaluate several rulesets on one frame in a single indicator pass.
+
+    The union of every rule's `required_indicators` is computed once, so
+    adding a variant that reuses EMA12/EMA26/ATR14 costs only the final
+    latest-row comparison.
+    """
+    _check_unique_names(rules)
+    for rule in rules:
+        rule.check_length(df)
+    with stage("rules.indicators"):
+        indicators = compute_indicators(df, (key for rule in rules for key in rule.required_indicators))
+    with stage("rules.evaluate"):
+        close = df["Close"].to_numpy(dtype=float)
+        return {rule.name: rule.evaluate_indicators(close, indicators) for rule in rules}
+
+
+def _check_unique_names(rules: Sequence[CompiledRule]) -> None:
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Rule names must be unique, got {names}")
+
+
+def make_signal(df: pd.DataFrame, rule: CompiledRule | RuleParams | None = None) -> dict:
     """Generate a rule-based signal using ATR activity and EMA cross.
 
-    Rule summary:
+    Rule summary (default parameters; see `RuleParams`):
     - Active regime: ATR(14) > median of ATR(14) over the latest 60 rows.
     - Signal trigger: EMA12/EMA26 cross on latest row, only when active.
     - reasons is trimmed to top 3 for UI readability.
 
+    Parameters
+    ----------
+    rule:
+        A `CompiledRule` (preferred when evaluating many symbols), bare
+        `RuleParams`, or None for the defaults.
+
     Returns
     -------
     dict
         Legacy-compatible keys plus `metrics` for richer diagnostics.
     """
-    if len(df) < 120:
-        raise ValueError("Not enough data (need ~120 trading days).")
-
-    work = df.copy()
-    work["EMA12"] = ema(work["Close"], 12)
-    work["EMA26"] = ema(work["Close"], 26)
-    work["ATR14"] = atr(work, 14)
-
-    last = work.iloc[-1]
-    prev = work.iloc[-2]
-
-    atr_window = work["ATR14"].iloc[-60:].dropna()
-    fallback = work["ATR14"].dropna().median()
-    atr_thresh = float(atr_window.median()) if len(atr_window) else float(fallback)
-
-    atr_last = float(last["ATR14"])
-    active = atr_last > atr_thresh
-
-    ema_diff_last = float(last["EMA12"] - last["EMA26"])
-    ema_diff_prev = float(prev["EMA12"] - prev["EMA26"])
-
-    signal: Signal = "HOLD"
-    reasons: list[str] = [
-        f"ATR(14)={atr_last:.4f} vs thresh(median60)={atr_thresh:.4f}",
-        f"EMA12-EMA26={ema_diff_last:.4f} (prev {ema_diff_prev:.4f})",
-    ]
-
-    if not active:
-        reasons.insert(0, "ATR(14) below threshold → Inactive")
-        reasons.append("No trade: inactive regime")
-    else:
-        reasons.insert(0, "ATR(14) above threshold → Active")
-
-        crossed_up = (ema_diff_prev <= 0.0) and (ema_diff_last > 0.0)
-        crossed_down = (ema_diff_prev >= 0.0) and (ema_diff_last < 0.0)
-
-        if crossed_up:
-            signal = "BUY"
-            reasons.append("EMA(12) crossed above EMA(26)")
-        elif crossed_down:
-            signal = "SELL"
-            reasons.append("EMA(12) crossed below EMA(26)")
-        else:
-            reasons.append("No EMA cross")
-
-    last_close = float(last["Close"])
-    prev_close = float(prev["Close"])
-    pct_change_1d = (last_close / prev_close - 1.0) * 100.0
-
-    return {
-        "last_close": last_close,
-        "prev_close": prev_close,
-        "pct_change_1d": float(pct_change_1d),
-        "active": active,
-        "signal": signal,
-        "reasons": reasons[:3],
-        "metrics": {
-            "atr": atr_last,
-            "atr_thresh": atr_thresh,
-            "ema_diff": ema_diff_last,
-        },
-    }
+    if not isinstance(rule, CompiledRule):
+        rule = compile_rule(rule)
+    return rule.evaluate(df)
+
+
+@dataclass(frozen=True, slots=True)
+class Ablation:
+    """One rule variant built from the shared component masks.
+
+    ``regime_filter`` gates crosses with the ATR regime; ``long``/``short``
+    choose what a BUY/SELL cross does (a disabled side goes flat instead);
+    ``min_trend_strength`` > 0 also requires ``|ema_diff| / ATR`` above it
+    (Notebook 07's trend-strength variant).
+    """
+
+    name: str
+    regime_filter: bool = True
+    long: bool = True
+    short: bool = True
+    min_trend_strength: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not (self.long or self.short):
+            raise ValueError(f"ablation {self.name!r} must trade at least one side")
+        if self.min_trend_strength < 0:
+            raise ValueError("min_trend_strength must be >= 0")
+
+
+DEFAULT_ABLATIONS: tuple[Ablation, ...] = tuple(
+    Ablation(
+        f"{side}{'+regime' if regime else ''}",
+        regime_filter=regime,
+        long=side != "short_only",
+        short=side != "long_only",
+    )
+    for regime in (True, False)
+    for side in ("long_short", "long_only", "short_only")
+)
+
+
+@dataclass(frozen=True)
+class RuleComponents:
+    """Per-bar building blocks of the rule for a whole universe.
+
+    Boolean masks (``crossed_up``, ``crossed_down``, ``active``) plus the
+    indicator values behind them. Every array is (bars, symbols); column
+    ``j`` holds ``symbols[j]`` aligned on its latest bar (NaN/False-padded
+    on top), so symbols with different histories need no common calendar.
+    """
+
+    symbols: tuple[str, ...]
+    close: np.ndarray
+    crossed_up: np.ndarray
+    crossed_down: np.ndarray
+    active: np.ndarray
+    trend_strength: np.ndarray
+    ema_diff: np.ndarray
+    atr: np.ndarray
+    atr_thresh: np.ndarray
+
+    def masks(self, ablation: Ablation) -> tuple[np.ndarray, np.ndarray]:
+        """BUY and SELL event masks of ``ablation`` (bitwise combinations only)."""
+        gate = self.active if ablation.regime_filter else np.ones_like(self.active)
+        if ablation.min_trend_strength > 0:
+            gate = gate & (self.trend_strength >= ablation.min_trend_strength)
+        return self.crossed_up & gate, self.crossed_down & gate
+
+
+def rule_components(frames: Mapping[str, pd.DataFrame], params: RuleParams | None = None) -> RuleComponents:
+    """Compute the EMA cross and ATR regime masks for every symbol in one pass.
+
+    Unlike `make_signal`, which looks at the latest row only, this gives the
+    full history: a cross at bar ``t`` compares ``ema_diff`` at ``t-1`` and
+    ``t``, and ``active`` compares ATR with its trailing
+    ``atr_threshold_window``-bar quantile (NaN windows are inactive).
+    """
+    p = params or RuleParams()
+    if not frames:
+        raise ValueError("frames must not be empty")
+    n_rows = max(len(df) for df in frames.values())
+    shape = (n_rows, len(frames))
+    close, high, low = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    for j, df in enumerate(frames.values()):
+        k = len(df)
+        close[n_rows - k :, j] = df["Close"].to_numpy(dtype=float)
+        high[n_rows - k :, j] = df["High"].to_numpy(dtype=float)
+        low[n_rows - k :, j] = df["Low"].to_numpy(dtype=float)
+
+    with stage("rules.indicators"):
+        ema_diff = ema_array(close, p.ema_fast) - ema_array(close, p.ema_slow)
+        atr_values = atr_array(high, low, close, p.atr_period)
+        rolling = pd.DataFrame(atr_values).rolling(p.atr_threshold_window)
+        q = p.atr_threshold_quantile
+        threshold = (rolling.median() if q == 0.5 else rolling.quantile(q)).to_numpy()
+
+    with stage("rules.evaluate"):
+        prev = np.vstack([np.full((1, shape[1]), np.nan), ema_diff[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            strength = np.abs(ema_diff) / atr_values
+        strength[~np.isfinite(strength)] = np.nan
+        return RuleComponents(
+            symbols=tuple(frames),
+            close=close,
+            crossed_up=(prev <= 0.0) & (ema_diff > 0.0),
+            crossed_down=(prev >= 0.0) & (ema_diff < 0.0),
+            active=atr_values > threshold,
+            trend_strength=strength,
+            ema_diff=ema_diff,
+            atr=atr_values,
+            atr_thresh=threshold,
+        )
+
+
+def _hold_positions(buy: np.ndarray, sell: np.ndarray, long: float, short: float) -> np.ndarray:
+    """Forward-fill event targets along axis -2 (flat before the first event)."""
+    events = buy | sell
+    rows = np.arange(events.shape[-2]).reshape(-1, 1)
+    last = np.maximum.accumulate(np.where(events, rows, -1), axis=-2)
+    target = np.where(buy, long, short)
+    held = np.take_along_axis(target, np.maximum(last, 0), axis=-2)
+    return np.where(last >= 0, held, 0.0)
+
+
+def ablation_study(
+    frames: Mapping[str, pd.DataFrame] | RuleComponents,
+    ablations: Sequence[Ablation] = DEFAULT_ABLATIONS,
+    *,
+    params: RuleParams | None = None,
+    periods_per_year: float = 252.0,
+) -> pd.DataFrame:
+    """Backtest every ablation over every symbol from one indicator pass.
+
+    Each variant's BUY/SELL masks are bitwise combinations of the shared
+    `RuleComponents`; positions follow `generate_positions_from_signals`
+    (HOLD keeps the previous position) and earn next-bar returns as in
+    `compute_strategy_returns`. All variants and symbols are summarized
+    together by `summarize_performance_batch`.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by (ablation, symbol) with the `summarize_performance` columns
+        plus ``turnover`` (mean absolute position change per bar), the table
+        Notebook 07 builds one variant at a time.
+    """
+    names = [a.name for a in ablations]
+    if not names or len(set(names)) != len(names):
+        raise ValueError(f"Ablation names must be unique and non-empty, got {names}")
+    comp = frames if isinstance(frames, RuleComponents) else rule_components(frames, params)
+
+    with stage("rules.ablation"):
+        masks = [comp.masks(a) for a in ablations]
+        buy = np.stack([m[0] for m in masks])
+        sell = np.stack([m[1] for m in masks])
+        long = np.array([1.0 if a.long else 0.0 for a in ablations]).reshape(-1, 1, 1)
+        short = np.array([-1.0 if a.short else 0.0 for a in ablations]).reshape(-1, 1, 1)
+        positions = _hold_positions(buy, sell, long, short)  # (variants, bars, symbols)
+
+        next_ret = np.full_like(comp.close, np.nan)
+        next_ret[:-1] = comp.close[1:] / comp.close[:-1] - 1.0
+        returns = positions * next_ret
+        # Positions only change on event bars, and no cross fires on a symbol's first bar.
+        changes = np.abs(np.diff(positions, axis=1)).sum(axis=1)
+        turnover = changes / np.maximum((~np.isnan(comp.close)).sum(axis=0), 1)
+
+        n_var, n_bars, n_sym = returns.shape
+        table = summarize_performance_batch(
+            returns.transpose(0, 2, 1).reshape(n_var * n_sym, n_bars), periods_per_year=periods_per_year
+        )
+    table["turnover"] = turnover.reshape(-1)
+    table.index = pd.MultiIndex.from_product([names, comp.symbols], names=["ablation", "symbol"])
+    return table
@@ -0,0 +1,380 @@
+"""Cross-sectional screener over the latest features of a whole universe.
+
+`Screener` keeps one row per symbol in a columnar table (one preallocated
+NumPy array per column): the latest `build_feature_frame` features plus the
+rule outputs of the signal bundle (``atr``, ``atr_thresh``, ``ema_diff``,
+``active``, ``signal``, ...). Updating a symbol overwrites its row in place,
+so the scheduler can refresh symbols one at a time.
+
+Screens are small expressions over column names::
+
+    screener.screen("active and ema_diff / atr > 0.5", rank_by="ema_diff_over_atr", top=20)
+
+An expression is parsed once (and cached), checked against a whitelist of
+syntax (arithmetic, comparisons, ``and``/``or``/``not``, ``abs``/``log``/
+``sqrt``/``min``/``max``) and evaluated as whole-column NumPy operations. No
+Python loop runs over symbols, and no ``eval`` ever sees user text. Numeric
+literals become ``float64`` (``9 ** 9 ** 8`` is ``inf``, not a hung process).
+The signal column holds codes, and ``signal == "BUY"`` is understood.
+
+Missing values use three-valued logic: a comparison involving NaN is
+*unknown* (NaN), ``not`` keeps unknown unknown, ``and``/``or`` follow SQL,
+and only rows that are definitely true pass a filter. So symbols with
+missing features drop out of ``ema_diff != 5`` and ``not (ema_diff > 5)``
+alike.
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .ml_bridge import build_feature_frame
+from .rules import CompiledRule, compile_rule
+
+FEATURE_COLUMNS = (
+    "ret_1d",
+    "ret_5d",
+    "roll_mean_5",
+    "roll_std_5",
+    "roll_std_20",
+    "atr_14",
+    "range_close",
+    "volume_change_1d",
+    "ema_diff_over_atr",
+)
+SIGNAL_COLUMNS = ("last_close", "pct_change_1d", "active", "signal", "atr", "atr_thresh", "ema_diff")
+DEFAULT_COLUMNS = SIGNAL_COLUMNS + FEATURE_COLUMNS
+
+SIGNAL_CODES = {"BUY": 1.0, "SELL": -1.0, "HOLD": 0.0}
+_SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+Columns = Mapping[str, np.ndarray]
+_Compiled = Callable[[Columns], Any]
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+_COMPARE = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+# name -> (ufunc, number of arguments)
+_FUNCTIONS = {"abs": (np.abs, 1), "log": (np.log, 1), "sqrt": (np.sqrt, 1), "min": (np.fmin, 2), "max": (np.fmax, 2)}
+
+
+def _as_bool(values: Any) -> np.ndarray:
+    """Truth value per row; NaN (missing) is false, unlike ``bool(nan)``."""
+    arr = np.asarray(values)
+    if arr.dtype == bool:
+        return arr
+    return (arr != 0) & ~np.isnan(arr)
+
+
+def _truth(values: Any) -> np.ndarray:
+    """Three-valued truth per row: 1.0 true, 0.0 false, NaN unknown."""
+    arr = np.asarray(values, dtype=float)
+    return np.where(np.isnan(arr), np.nan, (arr != 0).astype(float))
+
+
+def _negate(values: Any) -> np.ndarray:
+    """``not`` that keeps missing values unknown (and so false in a filter)."""
+    return 1.0 - _truth(values)
+
+
+def _and(a: Any, b: Any) -> np.ndarray:
+    a, b = _truth(a), _truth(b)
+    return np.where((a == 0) | (b == 0), 0.0, np.where(np.isnan(a) | np.isnan(b), np.nan, 1.0))
+
+
+def _or(a: Any, b: Any) -> np.ndarray:
+    a, b = _truth(a), _truth(b)
+    return np.where((a == 1) | (b == 1), 1.0, np.where(np.isnan(a) | np.isnan(b), np.nan, 0.0))
+
+
+def _compare(op: Callable[[Any, Any], Any], a: Any, b: Any) -> np.ndarray:
+    """``op(a, b)`` as 1.0/0.0, NaN wherever either operand is missing."""
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return np.where(np.isnan(a) | np.isnan(b), np.nan, op(a, b).astype(float))
+
+
+def _compile_node(node: ast.AST, columns: frozenset[str]) -> _Compiled:
+    """Turn one whitelisted AST node into a closure over the column arrays."""
+    if isinstance(node, ast.Name):
+        if node.id not in columns:
+            raise ValueError(f"Unknown column {node.id!r}; available: {sorted(columns)}")
+        name = node.id
+        return lambda cols: cols[name]
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, str):
+            if value.upper() not in SIGNAL_CODES:
+                raise ValueError(f"Only signal names may be quoted, got {value!r}")
+            value = SIGNAL_CODES[value.upper()]
+        elif not isinstance(value, (int, float)):
+            raise ValueError(f"Unsupported constant {value!r}")
+        try:
+            value = np.float64(value)
+        except OverflowError:
+            raise ValueError(f"Numeric constant out of range: {value!r}") from None
+        return lambda cols: value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left, right = _compile_node(node.left, columns), _compile_node(node.right, columns)
+        return lambda cols: op(left(cols), right(cols))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.Not)):
+        inner = _compile_node(node.operand, columns)
+        if isinstance(node.op, ast.USub):
+            return lambda cols: -inner(cols)
+        return lambda cols: _negate(inner(cols))
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, columns) for v in node.values]
+        combine = _and if isinstance(node.op, ast.And) else _or
+
+        def boolop(cols: Columns) -> Any:
+            out = _truth(parts[0](cols))
+            for part in parts[1:]:
+                out = combine(out, part(cols))
+            return out
+
+        return boolop
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        # a < b < c  ->  (a < b) & (b < c)
+        operands = [_compile_node(node.left, columns)] + [_compile_node(c, columns) for c in node.comparators]
+        ops = [_COMPARE[type(op)] for op in node.ops]
+
+        def compare(cols: Columns) -> Any:
+            values = [operand(cols) for operand in operands]
+            out = _compare(ops[0], values[0], values[1])
+            for i, op in enumerate(ops[1:], start=1):
+                out = _and(out, _compare(op, values[i], values[i + 1]))
+            return out
+
+        return compare
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id
+        if name not in _FUNCTIONS:
+            raise ValueError(f"Unknown function {name!r}; available: {sorted(_FUNCTIONS)}")
+        func, arity = _FUNCTIONS[name]
+        if len(node.args) != arity:
+            raise ValueError(f"{name}() takes {arity} argument{'s' if arity > 1 else ''}, got {len(node.args)}")
+        args = [_compile_node(arg, columns) for arg in node.args]
+        return lambda cols: func(*(arg(cols) for arg in args))
+    raise ValueError(f"Unsupported syntax in screen expression: {type(node).__name__}")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expression: str, columns: frozenset[str]) -> _Compiled:
+    """Parse and validate ``expression`` once; returns ``f(columns) -> array``."""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid screen expression {expression!r}: {exc.msg}") from None
+    return _compile_node(tree.body, columns)
+
+
+class Screener:
+    """Columnar table of the latest per-symbol features with vectorized screens.
+
+    Parameters
+    ----------
+    columns:
+        Column names (all stored as float64; ``signal`` as -1/0/1 codes,
+        ``active`` as 0/1).
+    capacity:
+        Initial number of rows; the table doubles when it fills up.
+    """
+
+    def __init__(self, columns: Sequence[str] = DEFAULT_COLUMNS, *, capacity: int = 1024) -> None:
+        if len(set(columns)) != len(columns) or not columns:
+            raise ValueError("columns must be unique and non-empty")
+        self.columns = tuple(columns)
+        self._names = frozenset(self.columns)
+        self._data = {name: np.full(max(capacity, 1), np.nan) for name in self.columns}
+        self._symbols: list[str] = []
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._rows
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._symbols)
+
+    def _row_for(self, symbol: str) -> int:
+        row = self._rows.get(symbol)
+        if row is not None:
+            return row
+        row = len(self._symbols)
+        capacity = len(next(iter(self._data.values())))
+        if row == capacity:
+            for name, values in self._data.items():
+                grown = np.full(2 * capacity, np.nan)
+                grown[:capacity] = values
+                self._data[name] = grown
+        self._symbols.append(symbol)
+        self._rows[symbol] = row
+        return row
+
+    def upsert(self, symbol: str, values: Mapping[str, Any]) -> None:
+        """Insert ``symbol`` or overwrite the given columns of its row.
+
+        Columns not in ``values`` keep their previous value (NaN for a new row).
+        """
+        unknown = set(values) - self._names
+        if unknown:
+            raise ValueError(f"Unknown screener columns: {sorted(unknown)}")
+        converted = {name: _to_float(name, value) for name, value in values.items()}
+        row = self._row_for(symbol)
+        for name, value in converted.items():
+            self._data[name][row] = value
+
+    def upsert_many(self, rows: Mapping[str, Mapping[str, Any]]) -> None:
+        for symbol, values in rows.items():
+            self.upsert(symbol, values)
+
+    def remove(self, symbol: str) -> None:
+        """Drop a symbol (its row is filled by the last row, O(columns))."""
+        row = self._rows.pop(symbol)
+        last = len(self._symbols) - 1
+        if row != last:
+            moved = self._symbols[last]
+            for column in self._data.values():
+                column[row] = column[last]
+            self._symbols[row] = moved
+            self._rows[moved] = row
+        for column in self._data.values():
+            column[last] = np.nan
+        self._symbols.pop()
+
+    def update_from_frame(self, symbol: str, df: pd.DataFrame, rule: CompiledRule | None = None) -> None:
+        """Refresh ``symbol`` from its OHLCV frame (features + rule evaluation)."""
+        features = build_feature_frame(df).iloc[-1]
+        signal = (rule or compile_rule()).evaluate(df)
+        values = {name: features[name] for name in FEATURE_COLUMNS if name in self._names}
+        values.update(_signal_values(signal, self._names))
+        self.upsert(symbol, values)
+
+    def update_from_bundle(self, bundle: Mapping[str, Any]) -> None:
+        """Refresh rule columns from a signals bundle (``{"symbols": [...]}``).
+
+        Feature columns already stored for those symbols are kept; error rows
+        are skipped.
+        """
+        for row in bundle.get("symbols", []):
+            if "metrics" in row:
+                self.upsert(str(row["symbol"]), _signal_values(row, self._names))
+
+    def row(self, symbol: str) -> dict[str, Any]:
+        i = self._rows[symbol]
+        return {name: _from_float(name, column[i]) for name, column in self._data.items()}
+
+    def _view(self) -> dict[str, np.ndarray]:
+        n = len(self._symbols)
+        return {name: column[:n] for name, column in self._data.items()}
+
+    def evaluate(self, expression: str) -> np.ndarray:
+        """Value of ``expression`` for every symbol, in `symbols` order."""
+        view = self._view()
+        with np.errstate(all="ignore"):  # overflow -> inf, log(-1) -> nan, x / 0 -> inf
+            out = compile_expression(expression, self._names)(view)
+        return np.broadcast_to(np.asarray(out), (len(self),))
+
+    def screen(
+        self,
+        where: str | None = None,
+        *,
+        rank_by: str | None = None,
+        top: int | None = 20,
+        ascending: bool = False,
+        columns: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Symbols passing ``where``, ordered by ``rank_by``, first ``top`` only.
+
+        ``rank_by`` is a column or expression; rows where it is NaN are
+        dropped. Returns JSON-ready records ``{"symbol", "rank_value", <columns>}``.
+        """
+        n = len(self)
+        selected = np.arange(n)
+        if where:
+            selected = np.flatnonzero(_as_bool(self.evaluate(where)))
+        rank_values = None
+        if rank_by:
+            rank_values = np.asarray(self.evaluate(rank_by), dtype=float)[selected]
+            keep = ~np.isnan(rank_values)
+            selected, rank_values = selected[keep], rank_values[keep]
+            key = rank_values if ascending else -rank_values
+            if top is not None and top < len(selected):
+                part = np.argpartition(key, top - 1)[:top]
+                order = part[np.argsort(key[part], kind="stable")]
+            else:
+                order = np.argsort(key, kind="stable")
+            selected, rank_values = selected[order], rank_values[order]
+        if top is not None:
+            selected = selected[:top]
+        wanted = self.columns if columns is None else tuple(columns)
+        unknown = set(wanted) - self._names
+        if unknown:
+            raise ValueError(f"Unknown screener columns: {sorted(unknown)}")
+        records = []
+        for k, i in enumerate(selected.tolist()):
+            record: dict[str, Any] = {"symbol": self._symbols[i]}
+            if rank_values is not None:
+                record["rank_value"] = float(rank_values[k])
+            for name in wanted:
+                record[name] = _from_float(name, self._data[name][i])
+            records.append(record)
+        return records
+
+    def to_frame(self) -> pd.DataFrame:
+        """The whole table as a DataFrame indexed by symbol (signal as names)."""
+        frame = pd.DataFrame(self._view(), index=pd.Index(self._symbols, name="symbol"))
+        if "signal" in frame:
+            frame["signal"] = frame["signal"].map(_SIGNAL_NAMES)
+        if "active" in frame:
+            frame["active"] = frame["active"].map({1.0: True, 0.0: False})
+        return frame
+
+
+def _signal_values(signal: Mapping[str, Any], names: frozenset[str]) -> dict[str, Any]:
+    """Screener columns from a `make_signal` dict or a bundle row."""
+    values = {k: signal[k] for k in ("last_close", "pct_change_1d", "active", "signal") if k in signal}
+    values.update(signal.get("metrics", {}))
+    return {k: v for k, v in values.items() if k in names}
+
+
+def _to_float(name: str, value: Any) -> float:
+    if value is None:
+        return math.nan
+    if name == "signal":
+        if value not in SIGNAL_CODES:
+            raise ValueError(f"signal must be one of {sorted(SIGNAL_CODES)}, got {value!r}")
+        return SIGNAL_CODES[value]
+    return float(value)
+
+
+def _from_float(name: str, value: float) -> Any:
+    if math.isnan(value):
+        return None
+    if name == "signal":
+        return _SIGNAL_NAMES[value]
+    if name == "active":
+        return bool(value)
+    return float(value)
@@ -1,7 +1,16 @@
-"""Lightweight statistical helpers for financial time-series tutorials."""
+"""Lightweight statistical helpers for financial time-series tutorials.
+
+`MomentSketch` and `TDigest` summarize return distributions without keeping
+the returns: both update bar by bar or chunk by chunk, use bounded memory,
+and merge, so per-symbol or per-worker sketches combine into universe-wide
+skew/kurtosis and quantiles.
+"""
 
 from __future__ import annotations
 
+import math
+from typing import Any, Mapping, Sequence
+
 import numpy as np
 import pandas as pd
 
@@ -61,3 +70,260 @@ def autocorr(series: pd.Series, max_lag: int) -> pd.Series:
         acf_values.append(float(numer / denom))
 
     return pd.Series(acf_values, index=range(1, max_lag + 1), dtype=float)
+
+
+# Running totals per stream of `MomentSketch`; also the serialized field order.
+MOMENT_FIELDS = ("n", "mean", "m2", "m3", "m4")
+
+
+class MomentSketch:
+    """Streaming mean/std/skew/kurtosis of ``n_streams`` series, mergeable.
+
+    Keeps the count, mean and the central moment sums M2..M4 per stream
+    (five floats, no history). Bars or chunks are folded in with Pébay's
+    pairwise update, which is also how two sketches (e.g. two symbols'
+    halves or two worker processes) are merged:
+
+        delta = mean_b - mean_a,  n = n_a + n_b
+        M2 = M2_a + M2_b + delta^2 n_a n_b / n
+        M3 = M3_a + M3_b + delta^3 n_a n_b (n_a - n_b) / n^2 + 3 delta (n_a M2_b - n_b M2_a) / n
+        M4 = M4_a + M4_b + delta^4 n_a n_b (n_a^2 - n_a n_b + n_b^2) / n^3
+             + 6 delta^2 (n_a^2 M2_b + n_b^2 M2_a) / n^2 + 4 delta (n_a M3_b - n_b M3_a) / n
+
+    Parameters
+    ----------
+    n_streams:
+        Number of streams; ignored when ``names`` is given.
+    names:
+        Optional stream labels used as the `summary` index.
+    """
+
+    __slots__ = ("names",) + MOMENT_FIELDS
+
+    def __init__(self, n_streams: int = 1, *, names: Sequence[str] | None = None) -> None:
+        if names is not None:
+            names = [str(name) for name in names]
+            if len(set(names)) != len(names):
+                raise ValueError("stream names must be unique")
+            n_streams = len(names)
+        if n_streams < 1:
+            raise ValueError("n_streams must be >= 1")
+        self.names: list[str] | None = names
+        for name in MOMENT_FIELDS:
+            setattr(self, name, np.zeros(n_streams))
+
+    def __len__(self) -> int:
+        return len(self.n)
+
+    def update(self, values: Any) -> None:
+        """Add one bar (shape ``(k,)``) or a chunk of bars (shape ``(T, k)``); NaN is skipped.
+
+        A single-stream sketch also takes a 1-D series of ``T`` bars.
+        """
+        x = np.asarray(values, dtype=float)
+        if x.ndim == 0 and len(self) == 1:
+            x = x[None, None]
+        elif x.ndim == 1:
+            x = x[:, None] if len(self) == 1 else x[None, :]
+        if x.ndim != 2 or x.shape[1] != len(self):
+            raise ValueError(f"values must have shape ({len(self)},) or (T, {len(self)}), got {np.shape(values)}")
+        valid = ~np.isnan(x)
+        n_b = valid.sum(axis=0).astype(float)
+        mean_b = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(n_b, 1)
+        d = np.where(valid, x - mean_b, 0.0)
+        d2 = d * d
+        self._combine(n_b, mean_b, d2.sum(axis=0), (d2 * d).sum(axis=0), (d2 * d2).sum(axis=0))
+
+    def merge(self, other: MomentSketch) -> MomentSketch:
+        """Fold ``other`` (same number of streams) into this sketch and return it."""
+        if len(other) != len(self):
+            raise ValueError("sketches must have the same number of streams")
+        self._combine(other.n, other.mean, other.m2, other.m3, other.m4)
+        return self
+
+    def _combine(
+        self, n_b: np.ndarray, mean_b: np.ndarray, m2_b: np.ndarray, m3_b: np.ndarray, m4_b: np.ndarray
+    ) -> None:
+        n_a, m2_a, m3_a = self.n, self.m2, self.m3
+        n = n_a + n_b
+        safe = np.maximum(n, 1)
+        delta = mean_b - self.mean
+        ab = n_a * n_b
+        self.m4 = (
+            self.m4
+            + m4_b
+            + delta**4 * ab * (n_a**2 - ab + n_b**2) / safe**3
+            + 6.0 * delta**2 * (n_a**2 * m2_b + n_b**2 * m2_a) / safe**2
+            + 4.0 * delta * (n_a * m3_b - n_b * m3_a) / safe
+        )
+        self.m3 = m3_a + m3_b + delta**3 * ab * (n_a - n_b) / safe**2 + 3.0 * delta * (n_a * m2_b - n_b * m2_a) / safe
+        self.m2 = m2_a + m2_b + delta**2 * ab / safe
+        self.mean = self.mean + delta * n_b / safe
+        self.n = n
+
+    def summary(self) -> pd.DataFrame:
+        """``n``, ``mean``, ``std`` (ddof=0), ``skew`` and Pearson ``kurtosis`` (normal = 3) per stream.
+
+        Matches Notebook 04's ``manual_skew`` / ``manual_kurtosis`` on the
+        full series: 0.0 for a constant series, NaN for an empty one.
+        """
+        n, m2 = self.n, self.m2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            flat = m2 <= 0
+            skew = np.where(flat, 0.0, np.sqrt(n) * self.m3 / m2**1.5)
+            kurtosis = np.where(flat, 0.0, n * self.m4 / m2**2)
+            std = np.sqrt(m2 / n)
+        out = pd.DataFrame(
+            {"n": n.astype(int), "mean": self.mean, "std": std, "skew": skew, "kurtosis": kurtosis},
+            index=self.names,
+        )
+        out.loc[n == 0, out.columns[1:]] = np.nan
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready state: five floats per stream."""
+        data: dict[str, Any] = {"fields": list(MOMENT_FIELDS)}
+        if self.names is not None:
+            data["names"] = list(self.names)
+        data["state"] = np.column_stack([getattr(self, name) for name in MOMENT_FIELDS]).tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> MomentSketch:
+        """Rebuild a sketch saved by `to_dict`."""
+        if list(data.get("fields", [])) != list(MOMENT_FIELDS):
+            raise ValueError("moment sketch fields do not match this version")
+        state = np.asarray(data["state"], dtype=float).reshape(-1, len(MOMENT_FIELDS))
+        sketch = cls(len(state), names=data.get("names"))
+        if len(sketch) != len(state):
+            raise ValueError("sketch names and state rows differ in length")
+        for i, name in enumerate(MOMENT_FIELDS):
+            setattr(sketch, name, state[:, i].copy())
+        return sketch
+
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest) of one series.
+
+    Values are summarized by at most about ``compression / 2`` weighted
+    centroids. Centroids are small near the tails and large in the middle
+    (the arcsine scale function ``k(q) = compression / (2 pi) * asin(2q - 1)``
+    allows one unit of ``k`` per centroid), so extreme quantiles stay
+    accurate while memory is bounded whatever the number of values.
+
+    New values are buffered and compressed in one vectorized pass: sort,
+    cumulative weight, scale function, group. Merging two digests
+    compresses their centroids together the same way.
+    """
+
+    __slots__ = ("compression", "n", "min", "max", "_means", "_weights", "_pending", "_n_pending")
+
+    def __init__(self, compression: float = 200.0) -> None:
+        if compression < 20:
+            raise ValueError("compression must be >= 20")
+        self.compression = float(compression)
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._pending: list[tuple[np.ndarray, np.ndarray | None]] = []
+        self._n_pending = 0
+
+    def __repr__(self) -> str:
+        self._flush()
+        return f"TDigest(compression={self.compression:g}, n={self.n}, centroids={len(self._means)})"
+
+    def update(self, values: Any) -> None:
+        """Add one value or an array of values (NaN is skipped)."""
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        if not x.size:
+            return
+        self.n += x.size
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self._add(x, None)
+
+    def merge(self, other: TDigest) -> TDigest:
+        """Fold ``other`` into this digest and return it."""
+        other._flush()
+        if other.n:
+            self.n += other.n
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._add(other._means, other._weights)
+        return self
+
+    def _add(self, means: np.ndarray, weights: np.ndarray | None) -> None:
+        self._pending.append((means, weights))
+        self._n_pending += len(means)
+        if self._n_pending >= 5 * self.compression:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        means = np.concatenate([self._means, *(m for m, _ in self._pending)])
+        weights = np.concatenate(
+            [self._weights, *(np.ones(len(m)) if w is None else w for m, w in self._pending)]
+        )
+        self._pending, self._n_pending = [], 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cum = np.cumsum(weights)
+        q_left = (cum - weights) / cum[-1]
+        k = np.floor(self.compression / (2.0 * math.pi) * np.arcsin(2.0 * q_left - 1.0))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+
+    def quantile(self, q: Any) -> Any:
+        """Estimated quantile(s), interpolated between centroid centres (and the exact min/max)."""
+        q_arr = np.asarray(q, dtype=float)
+        if np.any((q_arr < 0) | (q_arr > 1)):
+            raise ValueError("quantiles must be in [0, 1]")
+        self._flush()
+        if not self.n:
+            out = np.full(q_arr.shape, np.nan)
+        else:
+            centres = np.cumsum(self._weights) - self._weights / 2.0
+            out = np.interp(q_arr * self.n, np.r_[0.0, centres, self.n], np.r_[self.min, self._means, self.max])
+        return float(out) if out.ndim == 0 else out
+
+    def cdf(self, x: Any) -> Any:
+        """Estimated fraction of values <= ``x``."""
+        x_arr = np.asarray(x, dtype=float)
+        self._flush()
+        if not self.n:
+            out = np.full(x_arr.shape, np.nan)
+        else:
+            centres = np.cumsum(self._weights) - self._weights / 2.0
+            xp = np.r_[self.min, self._means, self.max]
+            out = np.interp(x_arr, xp, np.r_[0.0, centres, self.n]) / self.n
+        return float(out) if out.ndim == 0 else out
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready state (centroid means and weights)."""
+        self._flush()
+        return {
+            "compression": self.compression,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "means": self._means.tolist(),
+            "weights": self._weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> TDigest:
+        """Rebuild a digest saved by `to_dict`."""
+        digest = cls(data["compression"])
+        digest._means = np.asarray(data["means"], dtype=float)
+        digest._weights = np.asarray(data["weights"], dtype=float)
+        if len(digest._means) != len(digest._weights):
+            raise ValueError("t-digest means and weights differ in length")
+        digest.n = int(data["n"])
+        if digest.n:
+            digest.min, digest.max = float(data["min"]), float(data["max"])
+        return digest
@@ -0,0 +1,172 @@
+"""Incremental `summarize_performance` for live tracking of many strategies.
+
+`backtest.summarize_performance` rescans the whole return history each
+time. `PerformanceTracker` keeps a fixed number of running totals per return
+stream instead, so one update costs O(1) per stream and needs no history:
+
+- count, mean and sum of squared deviations (Welford; a block of bars is
+  merged with Chan et al.'s parallel formula),
+- win/loss counters and sums (hit rate, average win/loss, expectancy),
+- equity, running peak and worst drawdown.
+
+Every stream is one column of small NumPy arrays, so a scheduler updates
+thousands of strategy/symbol pairs per bar in a few vectorized operations.
+`summary()` returns exactly the `summarize_performance` columns.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Running totals per stream; also the serialized field order.
+STATE_FIELDS = ("n", "mean", "m2", "n_win", "n_loss", "sum_win", "sum_loss", "equity", "peak", "max_drawdown")
+
+
+class PerformanceTracker:
+    """Running performance metrics of ``n_streams`` return streams.
+
+    Parameters
+    ----------
+    n_streams:
+        Number of streams; ignored when ``names`` is given.
+    names:
+        Optional stream labels used as the `summary` index.
+    """
+
+    __slots__ = ("names",) + STATE_FIELDS
+
+    def __init__(self, n_streams: int = 1, *, names: Sequence[str] | None = None) -> None:
+        if names is not None:
+            names = [str(name) for name in names]
+            if len(set(names)) != len(names):
+                raise ValueError("stream names must be unique")
+            n_streams = len(names)
+        if n_streams < 1:
+            raise ValueError("n_streams must be >= 1")
+        self.names: list[str] | None = names
+        for name in STATE_FIELDS:
+            setattr(self, name, np.zeros(n_streams))
+        self.equity[:] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.n)
+
+    def __repr__(self) -> str:
+        return f"PerformanceTracker(n_streams={len(self)}, bars_seen={int(self.n.max(initial=0))})"
+
+    def update(self, returns: Any) -> None:
+        """Add one bar (shape ``(k,)``) or a block of bars (shape ``(T, k)``).
+
+        NaN entries are skipped, like ``dropna`` in `summarize_performance`, so
+        streams may have gaps or start later than others.
+        """
+        r = np.asarray(returns, dtype=float)
+        if r.ndim == 1:
+            r = r[None, :]
+        if r.ndim != 2 or r.shape[1] != len(self):
+            raise ValueError(f"returns must have shape ({len(self)},) or (T, {len(self)}), got {np.shape(returns)}")
+        if r.shape[0] == 1:
+            self._update_bar(r[0])
+        elif r.shape[0]:
+            self._update_block(r)
+
+    def _update_bar(self, r: np.ndarray) -> None:
+        valid = ~np.isnan(r)
+        x = np.where(valid, r, 0.0)
+        n = self.n + valid
+        delta = x - self.mean
+        self.mean += np.where(valid, delta / np.maximum(n, 1), 0.0)
+        self.m2 += np.where(valid, delta * (x - self.mean), 0.0)
+        self.n = n
+        self._count_wins(x[None, :])
+
+        self.equity *= 1.0 + x
+        self.peak = np.where(valid, np.maximum(self.peak, self.equity), self.peak)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(valid & (self.peak > 0), self.equity / self.peak - 1.0, 0.0)
+        np.minimum(self.max_drawdown, drawdown, out=self.max_drawdown)
+
+    def _update_block(self, r: np.ndarray) -> None:
+        valid = ~np.isnan(r)
+        x = np.where(valid, r, 0.0)
+
+        # Chan et al.: merge the block's (count, mean, M2) into the running totals.
+        n_b = valid.sum(axis=0)
+        mean_b = x.sum(axis=0) / np.maximum(n_b, 1)
+        m2_b = np.where(valid, (x - mean_b) ** 2, 0.0).sum(axis=0)
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        share = n_b / np.maximum(n, 1)
+        self.mean += delta * share
+        self.m2 += m2_b + delta**2 * self.n * share
+        self.n = n
+        self._count_wins(x)
+
+        # Skipped bars repeat the previous equity but are never a new peak.
+        path = self.equity * np.cumprod(1.0 + x, axis=0)
+        peaks = np.maximum(self.peak, np.maximum.accumulate(np.where(valid, path, 0.0), axis=0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(valid & (peaks > 0), path / peaks - 1.0, 0.0)
+        self.equity = path[-1]
+        self.peak = peaks[-1]
+        np.minimum(self.max_drawdown, drawdown.min(axis=0), out=self.max_drawdown)
+
+    def _count_wins(self, x: np.ndarray) -> None:
+        """Win/loss counters and sums over the rows of a (T, k) block (skipped bars are 0)."""
+        wins, losses = x > 0, x < 0
+        self.n_win += wins.sum(axis=0)
+        self.n_loss += losses.sum(axis=0)
+        self.sum_win += np.where(wins, x, 0.0).sum(axis=0)
+        self.sum_loss += np.where(losses, x, 0.0).sum(axis=0)
+
+    def summary(self, *, periods_per_year: float = 252.0) -> pd.DataFrame:
+        """Current metrics, one row per stream, with the `summarize_performance` columns."""
+        n = self.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(self.m2 / n)
+            p_win, p_loss = self.n_win / n, self.n_loss / n
+            avg_win = np.where(self.n_win > 0, self.sum_win / np.maximum(self.n_win, 1), 0.0)
+            avg_loss = np.where(self.n_loss > 0, self.sum_loss / np.maximum(self.n_loss, 1), 0.0)
+            sharpe_like = np.where(std > 0, self.mean / std * np.sqrt(periods_per_year), np.nan)
+        out = pd.DataFrame(
+            {
+                "n": n.astype(int),
+                "mean": self.mean,
+                "std": std,
+                "hit_rate": p_win,
+                "avg_win": avg_win,
+                "avg_loss": avg_loss,
+                "expectancy": p_win * avg_win + p_loss * avg_loss,
+                "sharpe_like": sharpe_like,
+                "cum_return": self.equity - 1.0,
+                "max_drawdown": self.max_drawdown,
+            },
+            index=self.names,
+        )
+        out.loc[n == 0, out.columns[1:]] = np.nan
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready state: ten floats per stream, no history."""
+        data: dict[str, Any] = {"fields": list(STATE_FIELDS)}
+        if self.names is not None:
+            data["names"] = list(self.names)
+        data["state"] = np.column_stack([getattr(self, name) for name in STATE_FIELDS]).tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> PerformanceTracker:
+        """Rebuild a tracker saved by `to_dict`."""
+        if list(data.get("fields", [])) != list(STATE_FIELDS):
+            raise ValueError("tracker state fields do not match this version")
+        state = np.asarray(data["state"], dtype=float).reshape(-1, len(STATE_FIELDS))
+        names = data.get("names")
+        tracker = cls(len(state), names=names)
+        if len(tracker) != len(state):
+            raise ValueError("tracker names and state rows differ in length")
+        for i, name in enumerate(STATE_FIELDS):
+            setattr(tracker, name, state[:, i].copy())
+        return tracker
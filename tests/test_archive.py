@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.archive import SignalArchive
+from quantlab.report import build_reports
+from quantlab.rules import make_signal
+
+
+def _row(symbol: str, as_of: str, signal: str = "HOLD", ema_diff: float = 1.0) -> dict[str, object]:
+    return {
+        "symbol": symbol,
+        "ruleset": "ema_atr_v0",
+        "as_of": as_of,
+        "signal": signal,
+        "active": signal != "HOLD",
+        "last_close": 100.0,
+        "pct_change_1d": 0.5,
+        "atr": 1.0,
+        "atr_thresh": 0.9,
+        "ema_diff": ema_diff,
+    }
+
+
+def test_append_partitions_by_month_and_queries_latest_write(tmp_path: Path) -> None:
+    archive = SignalArchive(tmp_path / "archive")
+    archive.append([_row("SPY", "2026-01-30", "BUY"), _row("SPY", "2026-02-02"), _row("QQQ", "2026-02-02", "BUY")])
+    archive.append([_row("QQQ", "2026-02-02", "SELL"), _row("QQQ", "2026-02-03")])  # rerun of 02-02, then a new day
+
+    reopened = SignalArchive(tmp_path / "archive")
+    assert [p["file"].split("/")[0] for p in reopened.parts] == ["2026-01", "2026-02", "2026-02"]
+    assert reopened.parts[0]["symbols"] == ["SPY"]
+
+    everything = reopened.query()
+    assert len(everything) == 4
+    assert everything.loc[everything["symbol"] == "QQQ", "signal"].tolist() == ["SELL", "HOLD"]
+    buys = reopened.query(day="2026-01-30", signals="BUY")
+    assert buys[["symbol", "as_of"]].values.tolist() == [["SPY", pd.Timestamp("2026-01-30")]]
+    assert reopened.query("SPY", start="2026-02-01").as_of.tolist() == [pd.Timestamp("2026-02-02")]
+    assert reopened.tail("QQQ", n=1)["as_of"].tolist() == [pd.Timestamp("2026-02-03")]
+    with pytest.raises(ValueError):
+        reopened.append([{**_row("SPY", "2026-02-04"), "signal": "MAYBE"}])
+
+
+def test_tail_keeps_rulesets_that_only_appear_in_older_parts(tmp_path: Path) -> None:
+    archive = SignalArchive(tmp_path / "archive")
+    archive.append([{**_row("X", "2026-01-05"), "ruleset": "shadow"}, _row("X", "2026-01-05")])
+    archive.append([_row("X", "2026-01-06")])
+    archive.append([_row("X", "2026-01-07")])
+
+    tail = archive.tail("X", n=2)
+    assert tail.groupby("ruleset").size().to_dict() == {"ema_atr_v0": 2, "shadow": 1}
+    assert archive.tail("X", n=2, ruleset="shadow")["as_of"].tolist() == [pd.Timestamp("2026-01-05")]
+    assert archive.recent_activity(window=1).index.get_level_values("ruleset").tolist() == ["ema_atr_v0", "shadow"]
+
+
+def test_tail_skips_parts_of_up_to_date_symbols_when_others_went_stale(tmp_path: Path, monkeypatch) -> None:
+    archive = SignalArchive(tmp_path / "archive")
+    archive.append([_row("OLD", "2025-12-01")])  # delisted: never reaches n rows
+    for day in pd.bdate_range("2026-01-01", periods=60):
+        archive.append([_row("SPY", str(day.date()))])
+    loaded = []
+    load = archive._load
+    monkeypatch.setattr(archive, "_load", lambda parts: loaded.extend(parts) or load(parts))
+
+    tail = archive.tail(n=5)
+    assert tail.groupby("symbol").size().to_dict() == {"OLD": 1, "SPY": 5}
+    assert len(loaded) == 6  # SPY's newest five parts plus OLD's, not all 61
+
+
+def test_recent_activity_matches_strategy_report_without_recomputation(tmp_path: Path) -> None:
+    rng = np.random.default_rng(3)
+    frames = {}
+    for symbol in ("A", "B"):
+        idx = pd.bdate_range(end="2026-02-10", periods=260)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.012, len(idx))))
+        frames[symbol] = pd.DataFrame(
+            {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6},
+            index=idx,
+        )
+    archive = SignalArchive(tmp_path)
+    for k in range(200, 261):  # one run per day, spanning three monthly partitions
+        rows = []
+        for symbol, df in frames.items():
+            sig = make_signal(df.iloc[:k])
+            rows.append(
+                {
+                    **_row(symbol, str(df.index[k - 1]), sig["signal"]),
+                    "active": sig["active"],
+                    **sig["metrics"],
+                }
+            )
+        archive.append(rows)
+
+    activity = archive.recent_activity(window=20).droplevel("ruleset")
+    reports = build_reports(frames)
+    for symbol in frames:
+        assert activity.loc[symbol, "signal_frequency"] == reports[symbol]["regime"]["signal_frequency_20d"]
+        assert activity.loc[symbol, "turnover"] == pytest.approx(reports[symbol]["risk"]["turnover_20d"])
+    assert (activity["n_bars"] == 20).all()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.cache import SignalCache, frame_digest, result_key
+from quantlab.contract import Metrics, SymbolSignal
+from quantlab.rules import CompiledRule, RuleParams
+
+
+def _bars(n: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    idx = pd.date_range("2024-01-01", periods=n, freq="B")
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1.0}, index=idx)
+
+
+def _signal(symbol: str = "QQQ", close: float = 101.0) -> SymbolSignal:
+    return SymbolSignal(
+        symbol=symbol,
+        period="2y",
+        interval="1d",
+        last_close=close,
+        prev_close=100.0,
+        pct_change_1d=1.0,
+        active=True,
+        signal="BUY",
+        reasons=["cross up"],
+        metrics=Metrics(atr=1.0, atr_thresh=0.8, ema_diff=0.1),
+    )
+
+
+def test_keys_cover_full_history_and_rule_parameters():
+    df = _bars()
+    digest = frame_digest(df)
+    early_revision = df.copy()
+    early_revision.iloc[0, early_revision.columns.get_loc("Close")] += 0.01
+
+    assert frame_digest(df.copy()) == digest
+    assert frame_digest(early_revision) != digest  # EMA depends on the whole series
+
+    key = result_key(digest, CompiledRule(), symbol="QQQ", period="2y", interval="1d")
+    other_params = CompiledRule(RuleParams(ema_fast=8))
+    assert result_key(digest, other_params, symbol="QQQ", period="2y", interval="1d") != key
+    assert result_key(digest, CompiledRule(), symbol="QQQ", period="1y", interval="1d") != key
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = SignalCache(max_memory_items=2)
+    cache.put("a", _signal("A"))
+    cache.put("b", _signal("B"))
+    assert cache.get("a").symbol == "A"  # "b" is now the oldest
+    cache.put("c", _signal("C"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_cache_survives_restart_and_respects_budget(tmp_path):
+    first = SignalCache(tmp_path)
+    first.put("k1" * 16, _signal(close=123.5))
+
+    restarted = SignalCache(tmp_path)
+    assert restarted.get("k1" * 16) == _signal(close=123.5)
+
+    small = SignalCache(tmp_path / "small", max_disk_bytes=2_000)
+    for i in range(20):
+        small.put(f"{i:032x}", _signal(close=float(i)))
+    files = list((tmp_path / "small").glob("*/*.json"))
+    assert 0 < len(files) < 20
+    assert sum(f.stat().st_size for f in files) <= 2_000
+    assert SignalCache(tmp_path / "small").get(f"{19:032x}").last_close == 19.0
+    with pytest.raises(ValueError):
+        SignalCache(max_memory_items=0)
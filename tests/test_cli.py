@@ -3,9 +3,11 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from quantlab import cli
+from quantlab.archive import SignalArchive
 
 
 def _fake_df() -> pd.DataFrame:
@@ -22,7 +24,7 @@ def _fake_df() -> pd.DataFrame:
     )
 
 
-def _fake_signal(_: pd.DataFrame) -> dict[str, object]:
+def _fake_signal(_: pd.DataFrame, rule=None) -> dict[str, object]:
     return {
         "last_close": 102.0,
         "prev_close": 100.0,
@@ -69,7 +71,8 @@ def test_cli_symbols_file_outputs_bundled_json(tmp_path: Path, monkeypatch) -> N
 
     payload = json.loads(out_path.read_text(encoding="utf-8"))
     assert payload["timeframe"] == {"period": "6mo", "interval": "1d"}
-    assert payload["engine_version"] == cli.ENGINE_VERSION
+    assert payload["engine_version"].startswith(f"{cli.ENGINE_VERSION}+")
+    assert payload["ruleset"] == "ema_atr_v0"
     assert [row["symbol"] for row in payload["symbols"]] == ["1306.T", "QQQ"]
     assert [row["name"] for row in payload["symbols"]] == ["TOPIX ETF", "QQQ"]
     assert fetched_symbols == ["1306.T", "QQQ"]
@@ -89,3 +92,204 @@ def test_parser_rejects_symbol_and_symbols_file_together() -> None:
         raise AssertionError("Expected parser to reject mutually exclusive args")
     except SystemExit:
         pass
+
+
+def test_cli_profile_writes_stage_table(tmp_path: Path, monkeypatch) -> None:
+    out_path = tmp_path / "signals.json"
+
+    monkeypatch.setattr(cli, "fetch_ohlc", lambda symbol, period, interval: _fake_df())
+    monkeypatch.setattr(cli, "make_signal", _fake_signal)
+    monkeypatch.setattr("sys.argv", ["quantlab.cli", "--symbol", "QQQ", "--out", str(out_path), "--profile"])
+
+    cli.main()
+
+    profile = json.loads(out_path.with_suffix(".profile.json").read_text(encoding="utf-8"))
+    rows = {row["scope"]: row for row in profile["scopes"]}
+    assert {"cli.symbol", "fetch", "rules"} <= set(rows["QQQ"]["stages"])
+    assert "io.to_json" in profile["summary"]
+
+
+def test_cli_bundle_includes_shadow_rulesets(tmp_path: Path, monkeypatch) -> None:
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["QQQ"]), encoding="utf-8")
+    out_path = tmp_path / "bundle.json"
+
+    monkeypatch.setattr(cli, "fetch_ohlc", lambda symbol, period, interval: _fake_df())
+    monkeypatch.setattr(
+        cli,
+        "evaluate_rulesets",
+        lambda df, rules: {rule.name: _fake_signal(df, rule) for rule in rules},
+    )
+    monkeypatch.setattr(
+        "sys.argv",
+        ["quantlab.cli", "--symbols-file", str(symbols_file), "--out", str(out_path), "--ruleset", "all"],
+    )
+
+    cli.main()
+
+    payload = json.loads(out_path.read_text(encoding="utf-8"))
+    names = list(payload["rulesets"])
+    assert names[0] == payload["ruleset"] and len(names) > 1
+    row = payload["symbols"][0]
+    assert row["signal"] == "BUY"
+    assert list(row["rulesets"]) == names
+
+
+def test_cli_bundle_adds_timeframes_from_one_download(tmp_path: Path, monkeypatch) -> None:
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["QQQ"]), encoding="utf-8")
+    out_path = tmp_path / "bundle.json"
+    fetch_calls: list[str] = []
+
+    def fake_fetch(symbol: str, period: str, interval: str):
+        fetch_calls.append(interval)
+        return _fake_df()
+
+    monkeypatch.setattr(cli, "fetch_ohlc", fake_fetch)
+    monkeypatch.setattr(cli, "make_signal", _fake_signal)
+    monkeypatch.setattr(
+        "sys.argv",
+        ["quantlab.cli", "--symbols-file", str(symbols_file), "--out", str(out_path), "--timeframes", "1d,2d"],
+    )
+
+    cli.main()
+
+    payload = json.loads(out_path.read_text(encoding="utf-8"))
+    assert fetch_calls == ["1d"]
+    assert payload["timeframe"]["timeframes"] == ["1d", "2d"]
+    assert payload["symbols"][0]["timeframes"]["2d"]["bars"] == 1
+
+
+def test_cli_notify_sends_each_cross_once(tmp_path: Path, monkeypatch) -> None:
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["1306.T", "QQQ"]), encoding="utf-8")
+    outbox = tmp_path / "alerts.jsonl"
+    monkeypatch.setattr(cli, "fetch_ohlc", lambda symbol, period, interval: _fake_df())
+    monkeypatch.setattr(cli, "make_signal", _fake_signal)
+    argv = [
+        "quantlab.cli",
+        "--symbols-file",
+        str(symbols_file),
+        "--out",
+        str(tmp_path / "bundle.json"),
+        "--notify",
+        "--notify-state",
+        str(tmp_path / "state.json"),
+        "--notify-out",
+        str(outbox),
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+
+    cli.main()
+    cli.main()  # rerun: same as_of, nothing new to send
+
+    payloads = [json.loads(line) for line in outbox.read_text(encoding="utf-8").splitlines()]
+    assert len(payloads) == 1
+    assert [a["symbol"] for a in payloads[0]["alerts"]] == ["1306.T", "QQQ"]
+    assert payloads[0]["alerts"][0]["as_of"] == "2026-02-11 00:00:00"
+
+
+def test_cli_cache_dir_skips_unchanged_symbols(tmp_path: Path, monkeypatch) -> None:
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["1306.T", "QQQ"]), encoding="utf-8")
+    evaluated: list[float] = []
+
+    def counting_signal(df: pd.DataFrame, rule=None) -> dict[str, object]:
+        evaluated.append(float(df["Close"].iloc[-1]))
+        return _fake_signal(df, rule)
+
+    def fetch(symbol: str, period: str, interval: str) -> pd.DataFrame:
+        df = _fake_df()
+        if symbol == "QQQ" and len(evaluated) >= 2:
+            df.loc[df.index[-1], "Close"] = 105.0  # new data on the second run
+        return df
+
+    monkeypatch.setattr(cli, "fetch_ohlc", fetch)
+    monkeypatch.setattr(cli, "make_signal", counting_signal)
+    out_path = tmp_path / "bundle.json"
+    argv = ["quantlab.cli", "--symbols-file", str(symbols_file), "--out", str(out_path)]
+    monkeypatch.setattr("sys.argv", [*argv, "--cache-dir", str(tmp_path / "cache")])
+
+    cli.main()
+    first = json.loads(out_path.read_text(encoding="utf-8"))
+    cli.main()
+    second = json.loads(out_path.read_text(encoding="utf-8"))
+
+    assert evaluated == [102.0, 102.0, 105.0]  # only QQQ is recomputed
+    assert second["symbols"][0] == first["symbols"][0]
+
+
+def test_cli_strategy_report_is_written_and_reused(tmp_path: Path, monkeypatch) -> None:
+    idx = pd.bdate_range(end="2026-02-10", periods=300)
+    close = 100 + np.sin(np.arange(300) / 9.0) * 5
+    df = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1.0}, index=idx)
+    days = iter([df.iloc[:-1], df])
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["SPY"]), encoding="utf-8")
+    report_path = tmp_path / "strategy_report.json"
+    monkeypatch.setattr(cli, "fetch_ohlc", lambda symbol, period, interval: next(days))
+    argv = ["quantlab.cli", "--symbols-file", str(symbols_file), "--out", str(tmp_path / "b.json")]
+    monkeypatch.setattr("sys.argv", [*argv, "--strategy-report", str(report_path)])
+
+    state_path = tmp_path / "strategy_report.state.json"
+    cli.main()
+    first = json.loads(report_path.read_text(encoding="utf-8"))["reports"]["SPY"]
+    first_state = json.loads(state_path.read_text(encoding="utf-8"))["SPY"]
+    cli.main()
+    second = json.loads(report_path.read_text(encoding="utf-8"))["reports"]["SPY"]
+
+    assert first["meta"]["as_of"] == str(idx[-2])
+    assert second["meta"]["as_of"] == str(idx[-1])
+    assert "state" not in second  # the mobile file keeps to the docs/05 sections
+    assert json.loads(state_path.read_text(encoding="utf-8"))["SPY"]["n"] == first_state["n"] + 1
+    assert second["meta"]["engine_version"].startswith(f"{cli.ENGINE_VERSION}+")
+
+
+def test_cli_integrity_quarantines_failing_symbols(tmp_path: Path, monkeypatch) -> None:
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["GOOD", "BAD"]), encoding="utf-8")
+    out_path = tmp_path / "bundle.json"
+    evaluated: list[float] = []
+
+    def fetch(symbol: str, period: str, interval: str) -> pd.DataFrame:
+        df = _fake_df()
+        if symbol == "BAD":
+            df["High"] = df["Low"] - 1.0
+        return df
+
+    def counting_signal(df: pd.DataFrame, rule=None) -> dict[str, object]:
+        evaluated.append(float(df["High"].iloc[-1]))
+        return _fake_signal(df, rule)
+
+    monkeypatch.setattr(cli, "fetch_ohlc", fetch)
+    monkeypatch.setattr(cli, "make_signal", counting_signal)
+    argv = ["quantlab.cli", "--symbols-file", str(symbols_file), "--out", str(out_path)]
+    monkeypatch.setattr("sys.argv", [*argv, "--integrity", "quarantine"])
+
+    cli.main()
+
+    payload = json.loads(out_path.read_text(encoding="utf-8"))
+    assert evaluated == [103.0]  # BAD never reaches the rules
+    assert [(row["symbol"], row["quality"]) for row in payload["symbols"]] == [("GOOD", "ok")]
+    assert payload["integrity"]["flags"] == {"GOOD": "ok", "BAD": "fail"}
+    assert payload["integrity"]["quarantined"] == ["BAD"]
+    report = json.loads(out_path.with_suffix(".integrity.json").read_text(encoding="utf-8"))
+    assert report["BAD"]["counts"] == {"high_below_low": 2}
+
+
+def test_cli_archive_appends_each_run(tmp_path: Path, monkeypatch) -> None:
+    symbols_file = tmp_path / "symbols.json"
+    symbols_file.write_text(json.dumps(["1306.T", "QQQ"]), encoding="utf-8")
+    monkeypatch.setattr(cli, "fetch_ohlc", lambda symbol, period, interval: _fake_df())
+    monkeypatch.setattr(cli, "make_signal", _fake_signal)
+    argv = ["quantlab.cli", "--symbols-file", str(symbols_file), "--out", str(tmp_path / "bundle.json")]
+    monkeypatch.setattr("sys.argv", [*argv, "--archive", str(tmp_path / "archive")])
+
+    cli.main()
+    cli.main()
+
+    archive = SignalArchive(tmp_path / "archive")
+    assert len(archive.parts) == 2
+    history = archive.query(signals="BUY")
+    assert history[["symbol", "ruleset"]].values.tolist() == [["1306.T", "ema_atr_v0"], ["QQQ", "ema_atr_v0"]]
+    assert history["ema_diff"].tolist() == [0.2, 0.2]
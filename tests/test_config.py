@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from quantlab.config import EngineConfig, load_engine_config, parse_simple_yaml
+from quantlab.rules import RuleParams
+
+CONFIGS = Path(__file__).resolve().parents[1] / "configs"
+
+
+def test_parse_simple_yaml_handles_repo_configs() -> None:
+    engine = parse_simple_yaml((CONFIGS / "engine.yaml").read_text(encoding="utf-8"))
+    notify = parse_simple_yaml((CONFIGS / "notify.yaml").read_text(encoding="utf-8"))
+
+    assert engine["parameters"] == {"ema_fast": 12, "ema_slow": 26, "atr_period": 14, "atr_threshold_window": 60}
+    assert notify == {"notify": {"enabled": True, "on_signals": ["BUY"], "batch_size": 50}}
+
+
+def test_engine_config_defaults_match_repo_file_and_hash_is_stable() -> None:
+    loaded = load_engine_config(CONFIGS / "engine.yaml")
+
+    assert loaded.parameters == EngineConfig().parameters
+    assert loaded.config_hash == EngineConfig().config_hash
+    assert loaded.stamped_version == f"v0+{loaded.config_hash}"
+    changed = EngineConfig(parameters=RuleParams(ema_fast=8))
+    assert changed.config_hash != loaded.config_hash
+
+
+def test_engine_config_rejects_unknown_parameters(tmp_path: Path) -> None:
+    path = tmp_path / "engine.yaml"
+    path.write_text("parameters:\n  ema_fats: 5\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="ema_fats"):
+        load_engine_config(path)
+
+
+def test_engine_config_compiles_shadow_rulesets_primary_first() -> None:
+    config = EngineConfig.from_mapping(
+        {
+            "ruleset": "base",
+            "parameters": {"ema_fast": 12, "ema_slow": 26},
+            "rulesets": {"fast": {"ema_fast": 8, "ema_slow": 21}, "q75": {"atr_threshold_quantile": 0.75}},
+        }
+    )
+
+    rules = config.compile_rulesets(["q75"])
+    assert [rule.name for rule in rules] == ["base", "q75"]
+    assert rules[1].params.atr_threshold_quantile == 0.75
+    assert rules[1].params.ema_fast == 12
+    assert [rule.name for rule in config.compile_rulesets(["all"])] == ["base", "fast", "q75"]
+    with pytest.raises(ValueError, match="Unknown ruleset"):
+        config.compile_rulesets(["missing"])
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.integrity import IntegrityConfig, scan_frames
+
+
+def _bars(n: int = 120, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2025-01-01", periods=n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6},
+        index=idx,
+    )
+
+
+def test_scan_flags_each_defect_once_and_fails_the_symbol() -> None:
+    bad = _bars(seed=1)
+    bad.iloc[10, bad.columns.get_loc("High")] = bad["Low"].iloc[10] * 0.9
+    bad.iloc[20, bad.columns.get_loc("Volume")] = 0.0
+    bad.iloc[60:, :4] *= 0.5  # unadjusted 2:1 split
+    bad.iloc[80:88, :4] = bad.iloc[79, :4].to_numpy()  # price stops updating for 9 bars
+    bad = pd.concat([bad.iloc[:100], bad.iloc[[99]], bad.iloc[110:]])  # duplicate bar, then 10 missing days
+
+    report = scan_frames({"GOOD": _bars(), "BAD": bad})
+
+    assert report.flags == {"GOOD": "ok", "BAD": "fail"}
+    issues = report.issues.set_index("check")
+    assert sorted(issues.index) == sorted(
+        ["high_below_low", "zero_volume", "split_jump", "stale_price", "duplicate_timestamp", "calendar_gap"]
+    )
+    assert (issues["symbol"] == "BAD").all()
+    assert issues.loc["split_jump", "value"] == pytest.approx(0.5, rel=0.02)
+    assert issues.loc["stale_price", "value"] == 9
+    assert issues.loc["calendar_gap", "value"] == 10
+    assert issues.loc["split_jump", "as_of"] == bad.index[60]
+    summary = report.summary.loc["BAD"]
+    assert (summary["n_errors"], summary["n_warnings"]) == (3, 3)
+
+
+def test_warnings_fail_only_above_the_allowed_share() -> None:
+    df = _bars()
+    df.iloc[[5, 50], df.columns.get_loc("Volume")] = 0.0
+    index_like = _bars(seed=2).assign(Volume=0.0)  # indices report no volume at all
+
+    assert scan_frames({"X": df, "IDX": index_like}).flags == {"X": "warn", "IDX": "ok"}
+    strict = IntegrityConfig(max_warning_fraction=0.01)
+    assert scan_frames({"X": df}, strict).symbols("fail") == ["X"]
+
+
+def test_calendar_gaps_follow_the_given_sessions_and_report_is_json_ready() -> None:
+    df = _bars(30)
+    holiday = df.index[10]
+    report = scan_frames({"X": df.drop(holiday)}, IntegrityConfig(max_gap_sessions=0))
+    assert report.issues["check"].tolist() == ["calendar_gap"]
+
+    sessions = df.index.drop(holiday)
+    assert scan_frames({"X": df.drop(holiday)}, IntegrityConfig(max_gap_sessions=0, calendar=sessions)).flags == {
+        "X": "ok"
+    }
+    data = report.to_dict()
+    assert data["X"]["counts"] == {"calendar_gap": 1}
+    assert data["X"]["issues"] == [{"as_of": str(df.index[11]), "check": "calendar_gap", "value": 1.0}]
+
+    tokyo = df.drop(holiday).tz_localize("Asia/Tokyo")
+    data = scan_frames({"X": tokyo}, IntegrityConfig(max_gap_sessions=0)).to_dict()
+    assert data["X"]["issues"][0]["as_of"] == str(tokyo.index[10])  # keeps +09:00, like the bundle as_of
@@ -1,7 +1,17 @@
 import numpy as np
 import pandas as pd
+import pytest
 
-from quantlab.ml_bridge import build_feature_frame, build_labels, iter_walk_forward_windows, make_ml_table
+from quantlab.ml_bridge import (
+    build_feature_frame,
+    build_label_matrix,
+    build_labels,
+    iter_ml_table_chunks,
+    iter_walk_forward_windows,
+    make_ml_table,
+    read_ohlcv_csv_chunks,
+    write_ml_table_csv,
+)
 
 
 def _sample_ohlcv(n: int = 80) -> pd.DataFrame:
@@ -33,3 +43,68 @@ def test_walk_forward_windows_are_ordered_and_non_empty() -> None:
     assert len(windows) > 0
     for w in windows:
         assert w.train_start <= w.train_end < w.test_start <= w.test_end
+
+
+def test_chunked_ml_table_matches_in_memory_for_any_block_size(tmp_path) -> None:
+    rng = np.random.default_rng(7)
+    df = _sample_ohlcv(600)
+    df["Volume"] = 1_000_000 * (1 + rng.random(600))
+    expected = make_ml_table(df, label_method="rolling_quantile", label_window=60)
+
+    for rows in (7, 100, 1_000):  # smaller than the warm-up, typical, single block
+        blocks = (df.iloc[i : i + rows] for i in range(0, len(df), rows))
+        got = pd.concat(iter_ml_table_chunks(blocks, label_method="rolling_quantile", label_window=60))
+        pd.testing.assert_frame_equal(got, expected, rtol=1e-9, check_freq=False)
+
+    bars = tmp_path / "bars.csv"
+    df.to_csv(bars)
+    n = write_ml_table_csv(read_ohlcv_csv_chunks(bars, chunk_rows=128), tmp_path / "table.csv")
+    written = pd.read_csv(tmp_path / "table.csv", index_col=0, parse_dates=[0])
+    assert n == len(written) == len(make_ml_table(df))
+    np.testing.assert_allclose(written.to_numpy(), make_ml_table(df).to_numpy(), rtol=1e-9)
+
+
+def test_rolling_quantile_label_is_causal() -> None:
+    df = _sample_ohlcv(200)
+    label = build_labels(df, method="rolling_quantile", quantile=0.5, window=20)
+    next_ret = df["Close"].pct_change().shift(-1)
+
+    assert label.iloc[:20].isna().all() and np.isnan(label.iloc[-1])
+    t = 50
+    assert label.iloc[t] == float(next_ret.iloc[t] > next_ret.iloc[t - 20 : t].median())
+    # Changing the future does not move earlier thresholds.
+    changed = df.copy()
+    changed.iloc[150:, changed.columns.get_loc("Close")] *= 2.0
+    pd.testing.assert_series_equal(
+        build_labels(changed, method="rolling_quantile", quantile=0.5, window=20).iloc[:149], label.iloc[:149]
+    )
+    with pytest.raises(ValueError, match="rolling_quantile"):
+        next(iter_ml_table_chunks([df], label_method="return_quantile"))
+
+
+
+def test_label_matrix_matches_build_labels_at_horizon_one() -> None:
+    df = _sample_ohlcv(400)
+    methods = ["next_day_direction", "return_threshold", "return_quantile", "rolling_quantile"]
+    matrix = build_label_matrix(df, (1, 5, 20), methods, threshold=0.002, window=60)
+
+    assert matrix.labels.dtype == np.int8 and matrix.labels.shape == (400, 12)
+    frame = matrix.to_frame()
+    for method in methods:
+        expected = build_labels(df, method=method, threshold=0.002, window=60)
+        pd.testing.assert_series_equal(frame[f"label_{method}_h1"], expected, check_names=False)
+
+
+def test_label_matrix_masks_each_horizon_tail_and_uses_only_realized_returns() -> None:
+    df = _sample_ohlcv(200)
+    matrix = build_label_matrix(df, (5,), ["next_day_direction", "rolling_quantile"], window=30)
+    direction, rolling = matrix.valid[:, 0], matrix.valid[:, 1]
+
+    assert direction[:-5].all() and not direction[-5:].any()
+    # The first rolling threshold needs 30 realized 5-bar returns: rows 0..29 end by row 34.
+    assert np.flatnonzero(rolling)[[0, -1]].tolist() == [34, 194]
+
+    future = df.copy()
+    future.iloc[150:, future.columns.get_loc("Close")] *= 3.0  # change only the future of row 144
+    changed = build_label_matrix(future, (5,), ["next_day_direction", "rolling_quantile"], window=30)
+    np.testing.assert_array_equal(changed.labels[:145], matrix.labels[:145])
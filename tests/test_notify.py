@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from quantlab.notify import FileSender, NotificationState, NotifyConfig, StreamSender, dispatch, load_notify_config
+
+CONFIGS = Path(__file__).resolve().parents[1] / "configs"
+
+
+def _bundle(signals: dict[str, str], as_of: str = "2026-02-10") -> dict:
+    return {
+        "generated_at": "2026-02-11T07:00:00+09:00",
+        "engine_version": "v0+deadbeef",
+        "symbols": [
+            {
+                "symbol": symbol,
+                "name": symbol,
+                "signal": signal,
+                "as_of": as_of,
+                "last_close": 100.0,
+                "pct_change_1d": 1.5,
+                "reasons": ["ATR(14) above threshold → Active"],
+            }
+            for symbol, signal in signals.items()
+        ],
+    }
+
+
+def test_load_repo_notify_config():
+    config = load_notify_config(CONFIGS / "notify.yaml")
+    assert config == NotifyConfig(enabled=True, on_signals=("BUY",), batch_size=50)
+    with pytest.raises(ValueError):
+        NotifyConfig.from_mapping({"notify": {"on_signals": ["LONG"]}})
+
+
+def test_dispatch_filters_and_batches(tmp_path):
+    signals = {f"S{i:03d}": ("BUY", "SELL", "HOLD")[i % 3] for i in range(500)}
+    outbox = tmp_path / "outbox.jsonl"
+    config = NotifyConfig(on_signals=("BUY", "SELL"), batch_size=100)
+
+    result = dispatch(_bundle(signals), config, NotificationState(), FileSender(outbox))
+
+    payloads = [json.loads(line) for line in outbox.read_text(encoding="utf-8").splitlines()]
+    assert len(result.sent) == 334 and result.batches == 4
+    assert [p["batch"] for p in payloads] == [1, 2, 3, 4]
+    assert sum(len(p["alerts"]) for p in payloads) == 334
+    assert payloads[0]["engine_version"] == "v0+deadbeef"
+    assert {a["type"] for p in payloads for a in p["alerts"]} == {"BUY", "SELL"}
+
+
+def test_rerun_does_not_realert_same_cross(tmp_path):
+    state_path = tmp_path / "state.json"
+    config = NotifyConfig()
+    now = datetime(2026, 2, 11, tzinfo=timezone.utc)
+
+    def run(bundle):
+        return dispatch(bundle, config, NotificationState.load(state_path), StreamSender(io.StringIO()), now=now)
+
+    first = run(_bundle({"AAA": "BUY", "BBB": "BUY"}))
+    rerun = run(_bundle({"AAA": "BUY", "BBB": "BUY"}))
+    next_day = run(_bundle({"AAA": "BUY"}, as_of="2026-02-12"))
+
+    assert len(first.sent) == 2
+    assert rerun.sent == [] and len(rerun.duplicates) == 2 and rerun.batches == 0
+    assert [a.symbol for a in next_day.sent] == ["AAA"]
+    assert json.loads(state_path.read_text())["last_sent"]["AAA"]["as_of"] == "2026-02-12"
+
+
+def test_failed_batch_is_retried_next_run(tmp_path):
+    class FlakySender:
+        def __init__(self):
+            self.calls = 0
+
+        def send(self, payload):
+            self.calls += 1
+            if self.calls == 2:
+                raise ConnectionError("push service down")
+
+    state_path = tmp_path / "state.json"
+    bundle = _bundle({f"S{i}": "BUY" for i in range(4)})
+    config = NotifyConfig(batch_size=2)
+
+    with pytest.raises(ConnectionError):
+        dispatch(bundle, config, NotificationState.load(state_path), FlakySender())
+    retry = dispatch(bundle, config, NotificationState.load(state_path), FlakySender())
+
+    assert [a.symbol for a in retry.sent] == ["S2", "S3"]
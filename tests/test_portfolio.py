@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.backtest import compute_strategy_returns, generate_positions_from_signals
+from quantlab.portfolio import (
+    apply_exposure_caps,
+    positions_from_signals,
+    run_portfolio_backtest,
+    vol_target_weights,
+)
+
+
+def _prices(n: int = 200, m: int = 4) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    idx = pd.date_range("2024-01-01", periods=n, freq="B")
+    steps = rng.normal(0, 0.01, (n, m))
+    return pd.DataFrame(100 * np.exp(np.cumsum(steps, axis=0)), index=idx, columns=list("ABCD")[:m])
+
+
+def test_single_asset_matches_compute_strategy_returns():
+    prices = _prices(m=1)
+    signals = pd.DataFrame({"A": np.where(np.arange(len(prices)) % 30 < 15, "BUY", "SELL")}, index=prices.index)
+    positions = positions_from_signals(signals)
+
+    result = run_portfolio_backtest(prices, positions)
+
+    df = prices.rename(columns={"A": "Close"}).assign(signal=signals["A"])
+    expected = compute_strategy_returns(df, generate_positions_from_signals(df))
+    pd.testing.assert_series_equal(result.returns, expected, check_names=False)
+    assert result.contribution_by_asset()["A"] == pytest.approx(expected.sum())
+
+
+def test_exposure_caps_scale_rows_uniformly():
+    weights = np.array([[0.8, 0.8, -0.4], [0.2, 0.1, 0.0], [1.0, 1.0, 0.0]])
+    capped = apply_exposure_caps(weights, gross_cap=1.0, net_cap=0.5)
+
+    assert np.all(np.abs(capped).sum(axis=1) <= 1.0 + 1e-12)
+    assert np.all(np.abs(capped.sum(axis=1)) <= 0.5 + 1e-12)
+    np.testing.assert_allclose(capped[1], weights[1])
+    np.testing.assert_allclose(capped[0] / capped[0, 0], weights[0] / weights[0, 0])
+
+
+def test_rebalance_threshold_cuts_turnover_and_costs():
+    prices = _prices()
+    targets = np.full(prices.shape, 0.25)
+
+    always = run_portfolio_backtest(prices, targets, cost_bps=10)
+    banded = run_portfolio_backtest(prices, targets, rebalance_threshold=0.02, cost_bps=10)
+
+    # Initial buy-in is the same; afterwards only drift beyond the band is traded.
+    assert always.turnover.iloc[0] == pytest.approx(1.0)
+    assert banded.turnover.iloc[0] == pytest.approx(1.0)
+    assert 0 < banded.turnover.iloc[1:].sum() < always.turnover.iloc[1:].sum()
+    assert banded.costs.sum() < always.costs.sum()
+    assert np.all(np.abs(banded.weights.to_numpy() - 0.25) <= 0.02 + 1e-12)
+    summary = banded.summary()
+    assert {"sharpe_like", "avg_turnover", "total_cost"} <= set(summary.index)
+
+
+def test_vol_target_weights_and_missing_prices():
+    prices = _prices()
+    prices.iloc[:50, 3] = np.nan  # late listing
+    vol = prices.pct_change().rolling(20).std()
+    weights = vol_target_weights(np.ones(prices.shape), vol, target_vol=0.005, max_weight=0.5)
+
+    assert np.nanmax(weights) <= 0.5
+    result = run_portfolio_backtest(prices, weights, gross_cap=1.0)
+    assert (result.weights["D"].iloc[:50] == 0).all()
+    assert np.isfinite(result.equity).all()
+    with pytest.raises(ValueError):
+        run_portfolio_backtest(prices, weights[:-1])
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from quantlab import profiling
+from quantlab.profiling import StageProfiler, activate
+
+
+def test_stages_are_noops_without_active_profiler() -> None:
+    assert profiling.get_profiler() is None
+    with profiling.stage("anything"):
+        profiling.count("rows", 10)
+
+
+def test_profiler_records_per_scope_stages_and_counters() -> None:
+    profiler = StageProfiler()
+    with activate(profiler):
+        for symbol in ["AAA", "BBB"]:
+            with profiling.scope(symbol), profiling.stage("fetch"):
+                with profiling.stage("fetch.download"):
+                    pass
+                profiling.count("fetch.rows", 5)
+
+    assert profiling.get_profiler() is None
+    rows = {row["scope"]: row for row in profiler.rows()}
+    assert set(rows) == {"AAA", "BBB"}
+    assert set(rows["AAA"]["stages"]) == {"fetch", "fetch.download"}
+    assert rows["BBB"]["counters"] == {"fetch.rows": 5}
+
+    summary = profiler.summary()
+    assert summary["fetch"]["calls"] == 2
+    assert summary["fetch"]["total_seconds"] >= summary["fetch.download"]["total_seconds"]
+    assert "TOTAL" in profiler.format_table()
+
+
+def test_profiler_tracks_peak_memory_when_enabled() -> None:
+    profiler = StageProfiler(trace_memory=True)
+    with activate(profiler), profiling.scope("AAA"):
+        blob = bytearray(1_000_000)
+        del blob
+
+    assert profiler.rows()[0]["peak_memory_bytes"] >= 1_000_000
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import pyplot as plt
+
+from quantlab.plot import plot_atr_regime, plot_cross_points, plot_price_ema
+from quantlab.render import lttb_indices, minmax_indices, render_symbol_charts, render_universe
+from quantlab.rules import RuleParams, make_signal
+
+
+def _ohlc(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2022-01-03", periods=n, freq="B")
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {"Open": close, "High": close + rng.random(n), "Low": close - rng.random(n), "Close": close},
+        index=idx,
+    )
+
+
+def test_minmax_keeps_extremes_and_endpoints():
+    y = np.sin(np.linspace(0, 20, 10_001))
+    y[1234] = 5.0
+    y[7777] = -5.0
+    y[50:60] = np.nan
+
+    idx = minmax_indices(y, 500)
+
+    assert len(idx) <= 502
+    assert np.all(np.diff(idx) > 0)
+    assert {0, 1234, 7777, 10_000} <= set(idx.tolist())
+    np.testing.assert_array_equal(minmax_indices(y[:100], 500), np.arange(100))
+
+
+def test_lttb_selects_one_point_per_bucket():
+    x = np.arange(5_000, dtype=float)
+    y = np.cumsum(np.random.default_rng(1).normal(size=5_000))
+    y[2500] = y.max() + 50  # a spike must survive
+
+    idx = lttb_indices(x, y, 300)
+
+    assert len(idx) == 300
+    assert idx[0] == 0 and idx[-1] == 4_999
+    assert np.all(np.diff(idx) > 0)
+    assert 2500 in idx
+
+
+def test_render_symbol_charts_writes_each_chart_and_format(tmp_path):
+    paths = render_symbol_charts(
+        _ohlc(3_000), tmp_path, symbol="^N225", formats=("png", "svg"), max_points=500, downsample="lttb"
+    )
+
+    assert [p.name for p in paths] == [
+        f"^N225_{chart}.{fmt}" for chart in ("price_ema", "atr_regime", "cross_points") for fmt in ("png", "svg")
+    ]
+    assert all(p.stat().st_size > 0 for p in paths)
+    with pytest.raises(ValueError):
+        render_symbol_charts(_ohlc(), tmp_path, symbol="X", charts=["candles"])
+
+
+def test_render_universe_pool_and_pyplot_helpers(tmp_path):
+    frames = {"AAA": _ohlc(seed=1), "BB/B": _ohlc(seed=2)}
+    out = render_universe(frames, tmp_path, n_jobs=2, charts=["cross_points"])
+
+    assert sorted(out) == ["AAA", "BB/B"]
+    assert out["BB/B"][0].name == "BB_B_cross_points.png"
+    assert all(p.exists() for paths in out.values() for p in paths)
+
+    # The pyplot entry points share the same draw helpers.
+    fig, ax = plot_price_ema(_ohlc())
+    assert [line.get_label() for line in ax.get_lines()] == ["Close", "EMA12", "EMA26"]
+    fig, ax = plot_cross_points(_ohlc())
+    assert ax.get_title() == "EMA Cross Points"
+    params = RuleParams(atr_threshold_quantile=0.75)
+    fig, ax = plot_atr_regime(_ohlc(), params)
+    thresh = ax.get_lines()[1]
+    assert thresh.get_label() == "Q0.75@60"
+    assert thresh.get_ydata()[-1] == pytest.approx(make_signal(_ohlc(), params)["metrics"]["atr_thresh"])
+    plt.close("all")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from quantlab.replay import StreamingRule, replay
+from quantlab.rules import RuleParams, make_signal
+
+
+def _bars(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    idx = pd.date_range("2024-01-02 09:00", periods=n, freq="min")
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * (1 + rng.random(n) * 0.003),
+            "Low": close * (1 - rng.random(n) * 0.003),
+            "Close": close,
+            "Volume": 1.0,
+        },
+        index=idx,
+    )
+
+
+def test_streaming_rule_matches_make_signal_on_prefixes():
+    df = _bars(400)
+    params = RuleParams(atr_threshold_quantile=0.7)
+    stream = StreamingRule(params)
+    for i, (h, lo, c) in enumerate(df[["High", "Low", "Close"]].itertuples(index=False)):
+        signal = stream.update(h, lo, c)
+        if i + 1 < params.min_rows:
+            assert signal is None
+        elif i % 37 == 0 or i == len(df) - 1:
+            ref = make_signal(df.iloc[: i + 1], params)
+            assert signal == ref["signal"]
+            assert stream.active == ref["active"]
+            np.testing.assert_allclose(
+                [stream.atr, stream.atr_thresh, stream.ema_diff],
+                [ref["metrics"][k] for k in ("atr", "atr_thresh", "ema_diff")],
+                rtol=1e-9,
+            )
+
+
+def test_replay_reports_parity_and_throughput():
+    result = replay(_bars(3_000, seed=1), spot_checks=4)
+
+    assert result.ok, result.mismatches
+    assert result.n_compared == 3_000 - 119
+    assert result.n_spot_checks == 4
+    assert result.bars_per_second > 0
+    summary = result.to_dict()
+    assert summary["n_mismatches"] == 0 and summary["mismatches"] == []
+
+
+def test_replay_flags_warmup_divergence():
+    # With min_rows below atr_period + atr_threshold_window - 1, make_signal already
+    # uses a partial ATR window while the historical rolling median is still NaN.
+    df = _bars(300)
+    result = replay(df, RuleParams(min_rows=40), spot_checks=0)
+
+    assert not result.ok
+    assert set(result.mismatches["source"]) == {"batch"}
+    assert result.mismatches.index.max() < df.index[(14 - 1) + (60 - 1)]  # first full rolling window
+    assert "atr_thresh" in set(result.mismatches["field"])
+    assert result.to_dict(max_mismatches=2)["mismatches"][0]["source"] == "batch"
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.report import ReportConfig, build_reports, merge_state, refresh_reports, split_state, update_reports
+from quantlab.rules import make_signal
+
+
+def _universe(n_symbols: int = 6, n_bars: int = 700) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(9)
+    frames = {}
+    for j in range(n_symbols):
+        n = n_bars - 40 * j  # staggered listing dates
+        idx = pd.bdate_range(end="2026-02-10", periods=n)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, n)))
+        spread = close * rng.uniform(0.002, 0.02, n)
+        frames[f"S{j}"] = pd.DataFrame(
+            {"Open": close, "High": close + spread, "Low": close - spread, "Close": close}, index=idx
+        )
+    return frames
+
+
+def _assert_close(a, b, path=""):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys(), path
+        for key in a:
+            _assert_close(a[key], b[key], f"{path}/{key}")
+    elif isinstance(a, list):
+        assert len(a) == len(b), path
+        for i, (x, y) in enumerate(zip(a, b)):
+            _assert_close(x, y, f"{path}[{i}]")
+    elif isinstance(a, float) and b is not None:
+        assert a == pytest.approx(b, rel=1e-8, abs=1e-10), path
+    else:
+        assert a == b, path
+
+
+def test_build_reports_matches_notebook_metrics_and_rule_signal():
+    frames = _universe()
+    reports = build_reports(frames, generated_at="2026-02-10T21:05:00Z")
+
+    df = frames["S2"]
+    close = df["Close"]
+    fast, slow = close.ewm(span=12, adjust=False).mean(), close.ewm(span=26, adjust=False).mean()
+    w = (fast > slow).astype(float)
+    dw = w.diff().abs().fillna(0.0)
+    net = w.shift(1).fillna(0.0) * close.pct_change().fillna(0.0) - 5e-4 * dw
+    equity = (1 + net).cumprod()
+
+    report = reports["S2"]
+    assert set(report) == {"meta", "signal", "risk", "performance", "regime", "alerts", "state"}
+    public, states = split_state(reports)
+    assert set(public["S2"]) == {"meta", "signal", "risk", "performance", "regime", "alerts"}
+    assert merge_state(public, states) == reports
+    assert report["performance"]["cum_return"] == pytest.approx(equity.iloc[-1] - 1)
+    assert report["performance"]["win_rate"] == pytest.approx((net > 0).mean())
+    assert report["risk"]["ann_vol"] == pytest.approx(net.std() * np.sqrt(252))
+    assert report["risk"]["max_drawdown"] == pytest.approx((equity / equity.cummax() - 1).min())
+    ytd_base = equity[equity.index.year < 2026].iloc[-1]
+    assert report["performance"]["ytd_return"] == pytest.approx(equity.iloc[-1] / ytd_base - 1)
+    assert report["risk"]["turnover_20d"] == pytest.approx(dw.tail(20).sum())
+    for symbol, rep in reports.items():
+        assert rep["signal"]["action"] == make_signal(frames[symbol])["signal"]
+
+
+def test_incremental_update_equals_full_rebuild():
+    frames = _universe()
+    previous = build_reports({s: df.iloc[:-30] for s, df in frames.items()})
+    public, states = json.loads(json.dumps(split_state(previous)))  # must survive a JSON round trip
+    previous = merge_state(public, states)
+
+    updated = update_reports(previous, frames)
+    _assert_close(build_reports(frames), updated)
+
+
+def test_refresh_falls_back_to_full_build_when_history_changes():
+    frames = _universe(3)
+    previous = build_reports({s: df.iloc[:-1] for s, df in frames.items()})
+    revised = dict(frames)
+    revised["S1"] = frames["S1"] * 1.01  # e.g. a dividend back-adjustment
+
+    _assert_close(build_reports(revised), refresh_reports(revised, previous))
+    with pytest.raises(ValueError):
+        update_reports(previous, frames, ReportConfig(cost_bps=1.0))
+    short = build_reports({"NEW": frames["S0"].iloc[:50]})
+    assert "error" in short["NEW"]
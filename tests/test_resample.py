@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.backtest import summarize_performance
+from quantlab.resample import BarAggregator, aggregate_timeframes, periods_per_year, signals_by_timeframe
+
+
+def _five_minute_bars(n: int = 1500) -> pd.DataFrame:
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="5min", tz="America/New_York")
+    rng = np.random.default_rng(11)
+    close = 100 + np.cumsum(rng.normal(0, 0.2, n))
+    return pd.DataFrame(
+        {
+            "Open": close - 0.05,
+            "High": close + rng.random(n),
+            "Low": close - rng.random(n),
+            "Close": close,
+            "Volume": rng.integers(100, 1_000, n).astype(float),
+        },
+        index=idx,
+    )
+
+
+def _resample_reference(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    return df.resample(rule).agg(agg).dropna()
+
+
+def test_streaming_chunks_match_one_shot_resample() -> None:
+    df = _five_minute_bars()
+    agg = BarAggregator(["1h", "1d"])
+    emitted_hours = 0
+    for chunk in np.array_split(np.arange(len(df)), 23):
+        emitted_hours += len(agg.update(df.iloc[chunk])["1h"])
+
+    open_hour = agg.partial("1h")
+    assert len(open_hour) == 1
+    agg.flush()
+
+    pd.testing.assert_frame_equal(agg.bars("1h"), _resample_reference(df, "1h"), check_freq=False)
+    pd.testing.assert_frame_equal(agg.bars("1d"), _resample_reference(df, "1D"), check_freq=False)
+    assert emitted_hours == len(agg.bars("1h")) - 1
+
+
+def test_aggregator_rejects_out_of_order_chunks() -> None:
+    df = _five_minute_bars(100)
+    agg = BarAggregator(["1h"])
+    agg.update(df.iloc[50:])
+    with pytest.raises(ValueError, match="time-ordered"):
+        agg.update(df.iloc[:50])
+
+
+def test_signals_by_timeframe_reports_annualization_and_short_history() -> None:
+    frames = aggregate_timeframes(_five_minute_bars(), ["1h", "1d"])
+    out = signals_by_timeframe(frames)
+
+    assert out["1h"]["signal"] in {"BUY", "SELL", "HOLD"}
+    assert out["1h"]["periods_per_year"] == pytest.approx(252 * 6.5)
+    assert "error" in out["1d"]
+
+
+def test_periods_per_year_scales_sharpe() -> None:
+    returns = pd.Series(np.random.default_rng(1).normal(0.001, 0.01, 500))
+    daily = summarize_performance(returns)["sharpe_like"]
+    hourly = summarize_performance(returns, periods_per_year=periods_per_year("1h"))["sharpe_like"]
+    assert hourly == pytest.approx(daily * np.sqrt(6.5))
+    assert periods_per_year("1d") == 252.0
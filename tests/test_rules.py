@@ -2,9 +2,23 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
+import pytest
 
-from quantlab.indicators import atr, ema
-from quantlab.rules import make_signal
+from quantlab.backtest import compute_strategy_returns, generate_positions_from_signals, summarize_performance
+from quantlab.indicators import atr, atr_array, ema, ema_array, true_range_array
+from quantlab import rules as rules_module
+from quantlab.rules import (
+    DEFAULT_ABLATIONS,
+    Ablation,
+    CompiledRule,
+    RuleParams,
+    ablation_study,
+    compile_rule,
+    evaluate_batch,
+    evaluate_rulesets,
+    make_signal,
+    rule_components,
+)
 
 
 def _synthetic_df(close: np.ndarray, spike_last: bool = True) -> pd.DataFrame:
@@ -41,6 +55,42 @@ def test_atr_is_non_negative() -> None:
     assert (out.dropna() >= 0).all()
 
 
+def test_ema_array_matches_pandas_for_1d_and_2d_with_leading_nans() -> None:
+    rng = np.random.default_rng(3)
+    prices = 100 + np.cumsum(rng.normal(size=(700, 3)), axis=0)
+    prices[:40, 1] = np.nan
+
+    expected = pd.DataFrame(prices).ewm(span=12, adjust=False).mean().to_numpy()
+    out = np.empty_like(prices)
+    got = ema_array(prices, 12, out=out)
+
+    assert got is out
+    np.testing.assert_allclose(got, expected, rtol=1e-12)
+    np.testing.assert_allclose(ema_array(prices[:, 0], 26), ema(pd.Series(prices[:, 0]), 26).to_numpy(), rtol=1e-12)
+
+
+def test_ema_wrapper_keeps_pandas_semantics_for_interior_gaps() -> None:
+    s = pd.Series([1.0, 2.0, np.nan, 4.0, 5.0], name="Close")
+    pd.testing.assert_series_equal(ema(s, 3), s.ewm(span=3, adjust=False).mean())
+
+
+def test_atr_array_matches_concat_reference() -> None:
+    rng = np.random.default_rng(5)
+    close = 100 + np.cumsum(rng.normal(size=300))
+    df = _synthetic_df(close, spike_last=False)
+    df["High"] += rng.random(300)
+    prev_close = df["Close"].shift(1)
+    tr = pd.concat(
+        [df["High"] - df["Low"], (df["High"] - prev_close).abs(), (df["Low"] - prev_close).abs()], axis=1
+    ).max(axis=1)
+
+    np.testing.assert_allclose(true_range_array(df["High"], df["Low"], df["Close"]), tr.to_numpy())
+    np.testing.assert_allclose(atr(df, 14).to_numpy(), tr.rolling(14).mean().to_numpy(), equal_nan=True)
+    high, low, close_2d = (np.column_stack([df[c], df[c]]) for c in ["High", "Low", "Close"])
+    two_symbols = atr_array(high, low, close_2d, 14)
+    np.testing.assert_allclose(two_symbols[:, 1], atr(df, 14).to_numpy(), equal_nan=True)
+
+
 def test_cross_detection_buy_on_synthetic_series() -> None:
     # Keep most history soft/downward, then jump to force EMA12 > EMA26 on the last bar.
     close = np.concatenate(
@@ -55,3 +105,107 @@ def test_cross_detection_buy_on_synthetic_series() -> None:
     assert signal["signal"] == "BUY"
     assert len(signal["reasons"]) == 3
     assert set(signal["metrics"].keys()) == {"atr", "atr_thresh", "ema_diff"}
+
+
+def test_compiled_rule_uses_configured_parameters() -> None:
+    close = np.concatenate([np.linspace(100, 90, 126), np.array([90.0, 90.0, 90.0, 150.0])])
+    df = _synthetic_df(close, spike_last=True)
+    rule = compile_rule(RuleParams(ema_fast=5, ema_slow=20, atr_period=10, atr_threshold_window=30))
+
+    signal = make_signal(df, rule)
+    assert signal["signal"] == "BUY"
+    assert signal["reasons"][0].startswith("ATR(10) above threshold")
+    assert signal["metrics"]["ema_diff"] == pytest.approx(float((ema(df["Close"], 5) - ema(df["Close"], 20)).iloc[-1]))
+    assert compile_rule(RuleParams(ema_fast=5, ema_slow=20, atr_period=10, atr_threshold_window=30)) is rule
+
+
+def test_evaluate_batch_over_symbols_and_parameter_sets() -> None:
+    close = np.concatenate([np.linspace(100, 90, 126), np.array([90.0, 90.0, 90.0, 150.0])])
+    frames = {"AAA": _synthetic_df(close.copy()), "BBB": _synthetic_df(close[::-1].copy())}
+    rules = [CompiledRule(name="base"), CompiledRule(RuleParams(ema_fast=5, ema_slow=20), name="fast")]
+
+    out = evaluate_batch(frames, rules)
+    assert set(out) == {"AAA", "BBB"}
+    assert set(out["AAA"]) == {"base", "fast"}
+    assert out["AAA"]["base"] == make_signal(frames["AAA"])
+
+    with pytest.raises(ValueError, match="unique"):
+        evaluate_batch(frames, [CompiledRule(), CompiledRule()])
+
+
+def test_rule_params_validation() -> None:
+    with pytest.raises(ValueError, match="ema_fast"):
+        RuleParams(ema_fast=26, ema_slow=12)
+
+
+def test_evaluate_rulesets_shares_indicators(monkeypatch) -> None:
+    close = np.concatenate([np.linspace(100, 90, 126), np.array([90.0, 90.0, 90.0, 150.0])])
+    df = _synthetic_df(close, spike_last=True)
+    rules = [
+        CompiledRule(name="base"),
+        CompiledRule(RuleParams(atr_threshold_quantile=0.75), name="q75"),
+        CompiledRule(RuleParams(ema_fast=8, ema_slow=26), name="fast8"),
+    ]
+    calls: list[tuple[str, int]] = []
+    real_ema = rules_module.ema_array
+    monkeypatch.setattr(rules_module, "ema_array", lambda x, span: calls.append(("ema", span)) or real_ema(x, span))
+
+    out = evaluate_rulesets(df, rules)
+
+    assert sorted(calls) == [("ema", 8), ("ema", 12), ("ema", 26)]
+    assert out["base"] == make_signal(df)
+    assert out["q75"]["metrics"]["atr_thresh"] >= out["base"]["metrics"]["atr_thresh"]
+
+
+def _random_walk(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    df = _synthetic_df(close, spike_last=False)
+    df["High"] = close * (1 + rng.random(n) * 0.02)
+    df["Low"] = close * (1 - rng.random(n) * 0.02)
+    return df
+
+
+def _notebook_variant(df: pd.DataFrame, ablation: Ablation) -> pd.Series:
+    """Notebook 07's one-variant-at-a-time pipeline."""
+    diff = ema(df["Close"], 12) - ema(df["Close"], 26)
+    atr14 = atr(df, 14)
+    gate = atr14 > atr14.rolling(60).median() if ablation.regime_filter else pd.Series(True, index=df.index)
+    prev = diff.shift(1)
+    signal = pd.Series("HOLD", index=df.index, dtype=object)
+    signal[(prev <= 0) & (diff > 0) & gate] = "BUY"
+    signal[(prev >= 0) & (diff < 0) & gate] = "SELL"
+    positions = generate_positions_from_signals(df.assign(signal=signal))
+    positions = positions.clip(lower=-1.0 if ablation.short else 0.0, upper=1.0 if ablation.long else 0.0)
+    summary = summarize_performance(compute_strategy_returns(df, positions))
+    summary["turnover"] = positions.diff().abs().fillna(0.0).mean()
+    return summary
+
+
+def test_ablation_study_matches_per_variant_pipeline() -> None:
+    frames = {"AAA": _random_walk(600, 1), "BBB": _random_walk(350, 2)}  # different lengths
+
+    table = ablation_study(frames)
+
+    assert list(table.index.names) == ["ablation", "symbol"]
+    assert len(table) == len(DEFAULT_ABLATIONS) * 2
+    for ablation in DEFAULT_ABLATIONS:
+        for symbol, df in frames.items():
+            expected = _notebook_variant(df, ablation)
+            np.testing.assert_allclose(table.loc[(ablation.name, symbol), expected.index], expected, rtol=1e-9)
+
+
+def test_rule_components_masks_combine_bitwise() -> None:
+    comp = rule_components({"AAA": _random_walk(400, 3)})
+    buy, sell = comp.masks(Ablation("x", regime_filter=True, min_trend_strength=0.1))
+
+    assert not (comp.crossed_up & comp.crossed_down).any()
+    np.testing.assert_array_equal(buy, comp.crossed_up & comp.active & (comp.trend_strength >= 0.1))
+    np.testing.assert_array_equal(sell, comp.crossed_down & comp.active & (comp.trend_strength >= 0.1))
+    # Reusing precomputed components gives the same table.
+    pd.testing.assert_frame_equal(ablation_study(comp), ablation_study({"AAA": _random_walk(400, 3)}))
+
+    with pytest.raises(ValueError, match="one side"):
+        Ablation("none", long=False, short=False)
+    with pytest.raises(ValueError, match="unique"):
+        ablation_study(comp, [Ablation("a"), Ablation("a")])
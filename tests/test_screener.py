@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.ml_bridge import build_feature_frame
+from quantlab.rules import make_signal
+from quantlab.screener import Screener
+
+
+def _universe() -> Screener:
+    screener = Screener(capacity=2)  # forces the table to grow
+    rows = {
+        "AAA": {"active": True, "signal": "BUY", "ema_diff": 3.0, "atr": 2.0},
+        "BBB": {"active": True, "signal": "HOLD", "ema_diff": 1.0, "atr": 4.0},
+        "CCC": {"active": False, "signal": "BUY", "ema_diff": 5.0, "atr": 1.0},
+        "DDD": {"active": True, "signal": "SELL", "ema_diff": -2.0, "atr": 1.0},
+        "EEE": {"signal": "HOLD", "ema_diff": 9.0},  # no ATR / regime yet
+    }
+    screener.upsert_many(rows)
+    return screener
+
+
+def test_screen_filters_ranks_and_limits():
+    screener = _universe()
+
+    top = screener.screen("active and ema_diff / atr > 0.1", rank_by="ema_diff / atr", top=5)
+    assert [r["symbol"] for r in top] == ["AAA", "BBB"]
+    assert top[0]["rank_value"] == pytest.approx(1.5)
+    assert top[0]["signal"] == "BUY" and top[0]["active"] is True
+
+    assert [r["symbol"] for r in screener.screen("signal == 'BUY'", rank_by="ema_diff", top=1)] == ["CCC"]
+    assert [r["symbol"] for r in screener.screen("not active")] == ["CCC"]  # EEE's regime is unknown
+    lowest = screener.screen(rank_by="ema_diff", ascending=True, top=2, columns=["ema_diff"])
+    assert lowest == [
+        {"symbol": "DDD", "rank_value": -2.0, "ema_diff": -2.0},
+        {"symbol": "BBB", "rank_value": 1.0, "ema_diff": 1.0},
+    ]
+    assert [r["symbol"] for r in screener.screen("0 < ema_diff < 4 or abs(ema_diff) > 8")] == ["AAA", "BBB", "EEE"]
+
+
+def test_incremental_upsert_remove_and_bundle_refresh():
+    screener = _universe()
+    screener.upsert("BBB", {"ema_diff": 40.0})  # other columns are kept
+    assert screener.row("BBB")["atr"] == 4.0
+    assert screener.screen("active", rank_by="ema_diff", top=1)[0]["symbol"] == "BBB"
+
+    screener.remove("AAA")
+    assert "AAA" not in screener and len(screener) == 4
+    assert screener.row("EEE")["ema_diff"] == 9.0  # moved into the freed row
+
+    bundle = {
+        "symbols": [
+            {"symbol": "EEE", "signal": "BUY", "active": True, "last_close": 10.0, "pct_change_1d": 1.0,
+             "metrics": {"atr": 3.0, "atr_thresh": 2.0, "ema_diff": 6.0}},
+            {"symbol": "FFF", "error": "download failed"},
+        ]
+    }
+    screener.update_from_bundle(bundle)
+    assert screener.row("EEE")["signal"] == "BUY"
+    assert "FFF" not in screener
+    frame = screener.to_frame()
+    assert frame.loc["EEE", "signal"] == "BUY" and not frame.loc["CCC", "active"]
+
+
+def test_update_from_frame_uses_features_and_rule():
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2024-01-01", periods=200, freq="B")
+    close = 100 + np.cumsum(rng.normal(size=200))
+    df = pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1e6 + rng.random(200)},
+        index=idx,
+    )
+    screener = Screener()
+    screener.update_from_frame("X", df)
+
+    row = screener.row("X")
+    assert row["ema_diff_over_atr"] == pytest.approx(build_feature_frame(df)["ema_diff_over_atr"].iloc[-1])
+    assert row["atr_thresh"] == pytest.approx(make_signal(df)["metrics"]["atr_thresh"])
+
+
+def test_expressions_are_whitelisted():
+    screener = _universe()
+    for bad in ["__import__('os').system('x')", "ema_diff.real", "unknown > 1", "[x for x in atr]", "'foo' == signal"]:
+        with pytest.raises(ValueError):
+            screener.screen(bad)
+    with pytest.raises(ValueError, match="Invalid"):
+        screener.screen("ema_diff >")
+    for wrong_arity in ["min(atr) > 1", "log() > 0", "abs(atr, ema_diff) > 1"]:
+        with pytest.raises(ValueError, match="takes"):
+            screener.screen(wrong_arity)
+
+
+def test_missing_values_never_pass_negated_filters():
+    screener = _universe()
+    screener.upsert("NAN", {})  # every column missing
+
+    assert "NAN" not in [r["symbol"] for r in screener.screen("ema_diff != 5")]
+    assert "NAN" not in [r["symbol"] for r in screener.screen("not (ema_diff > 5)")]
+    assert "NAN" not in [r["symbol"] for r in screener.screen("signal != 'BUY'")]
+    assert [r["symbol"] for r in screener.screen("not (atr > 1 and ema_diff > 0)")] == ["CCC", "DDD"]
+    assert "EEE" in [r["symbol"] for r in screener.screen("atr > 1 or ema_diff > 8")]  # true or unknown
+
+
+def test_constant_arithmetic_cannot_blow_up():
+    screener = _universe()
+    assert screener.screen("ema_diff < 9 ** 9 ** 8", top=None)  # inf, evaluated instantly
+    with pytest.raises(ValueError, match="out of range"):
+        screener.screen("ema_diff < " + "9" * 400)
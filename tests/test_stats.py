@@ -1,7 +1,9 @@
+import json
+
 import numpy as np
 import pandas as pd
 
-from quantlab.stats import autocorr, log_returns, rolling_volatility
+from quantlab.stats import MomentSketch, TDigest, autocorr, log_returns, rolling_volatility
 
 
 def test_log_returns_matches_manual_formula() -> None:
@@ -23,3 +25,59 @@ def test_autocorr_positive_lag1_for_ar_like_series() -> None:
     got = autocorr(series, max_lag=2)
     assert got.index.tolist() == [1, 2]
     assert got.iloc[0] > 0
+
+
+def _notebook_moments(x: np.ndarray) -> tuple[float, float, float, float]:
+    m, s = x.mean(), x.std(ddof=0)
+    return m, s, np.mean(((x - m) / s) ** 3), np.mean(((x - m) / s) ** 4)
+
+
+def test_moment_sketch_chunks_bars_and_merges_match_full_series() -> None:
+    rng = np.random.default_rng(0)
+    x = rng.standard_t(4, size=(3_000, 2)) * 0.01
+    x[:50, 1] = np.nan  # second stream starts later
+
+    left = MomentSketch(names=["A", "B"])
+    for chunk in np.array_split(x[:2_000], 3):
+        left.update(chunk)
+    right = MomentSketch(names=["A", "B"])
+    for row in x[2_000:]:
+        right.update(row)
+    got = left.merge(right).summary()
+
+    for j, name in enumerate(["A", "B"]):
+        values = x[~np.isnan(x[:, j]), j]
+        assert got.loc[name, "n"] == len(values)
+        np.testing.assert_allclose(got.loc[name, ["mean", "std", "skew", "kurtosis"]], _notebook_moments(values))
+    restored = MomentSketch.from_dict(json.loads(json.dumps(left.to_dict())))
+    pd.testing.assert_frame_equal(restored.summary(), got)
+
+    single = MomentSketch()
+    single.update(x[:100, 0])  # a 1-D series is a chunk of bars for one stream
+    single.update(x[100, 0])
+    values = x[:101, 0]
+    assert single.summary().iloc[0]["n"] == 101
+    np.testing.assert_allclose(single.summary().iloc[0][["mean", "std", "skew", "kurtosis"]], _notebook_moments(values))
+
+
+def test_tdigest_quantiles_stay_accurate_in_bounded_memory_and_merge() -> None:
+    rng = np.random.default_rng(1)
+    values = rng.standard_t(3, size=100_000)
+    qs = np.array([0.001, 0.01, 0.25, 0.5, 0.75, 0.99, 0.999])
+    ordered = np.sort(values)
+
+    parts = [TDigest(compression=100) for _ in range(4)]
+    for digest, chunk in zip(parts, np.array_split(values, 4)):
+        digest.update(chunk)
+    merged = parts[0]
+    for digest in parts[1:]:
+        merged.merge(digest)
+
+    assert merged.n == len(values)
+    state = merged.to_dict()
+    assert len(state["means"]) <= 50
+    rank_error = np.abs(np.searchsorted(ordered, merged.quantile(qs)) / len(values) - qs)
+    assert rank_error.max() < 0.005
+    assert merged.quantile(0.0) == ordered[0] and merged.quantile(1.0) == ordered[-1]
+    assert abs(merged.cdf(0.0) - (values <= 0).mean()) < 0.005
+    np.testing.assert_allclose(TDigest.from_dict(json.loads(json.dumps(state))).quantile(qs), merged.quantile(qs))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantlab.backtest import summarize_performance
+from quantlab.tracker import PerformanceTracker
+
+
+def _returns() -> np.ndarray:
+    r = np.random.default_rng(0).normal(0.0005, 0.01, size=(300, 4))
+    r[:50, 1] = np.nan  # starts later
+    r[100:110, 2] = np.nan  # gap
+    r[:, 3] = np.nan  # never traded
+    r[0, 0] = -0.2  # drawdown from the very first bar
+    return r
+
+
+def _expected(r: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame([summarize_performance(pd.Series(r[:, j])) for j in range(r.shape[1])])
+
+
+def test_per_bar_updates_match_summarize_performance():
+    r = _returns()
+    tracker = PerformanceTracker(r.shape[1])
+    for row in r:
+        tracker.update(row)
+
+    pd.testing.assert_frame_equal(tracker.summary(), _expected(r), check_dtype=False, rtol=1e-9)
+
+
+def test_block_updates_and_serialization_round_trip():
+    r = _returns()
+    tracker = PerformanceTracker(names=["a", "b", "c", "d"])
+    tracker.update(r[:37])
+    tracker.update(r[37])
+    restored = PerformanceTracker.from_dict(json.loads(json.dumps(tracker.to_dict())))
+    restored.update(r[38:])
+
+    out = restored.summary(periods_per_year=52)
+    assert list(out.index) == ["a", "b", "c", "d"]
+    expected = pd.DataFrame(
+        [summarize_performance(pd.Series(r[:, j]), periods_per_year=52) for j in range(4)], index=out.index
+    )
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_tracker_validation():
+    tracker = PerformanceTracker(3)
+    with pytest.raises(ValueError, match="shape"):
+        tracker.update([0.1, 0.2])
+    with pytest.raises(ValueError, match="unique"):
+        PerformanceTracker(names=["x", "x"])
+    with pytest.raises(ValueError, match="fields"):
+        PerformanceTracker.from_dict({"fields": ["n"], "state": [[1.0]]})